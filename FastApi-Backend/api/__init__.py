@@ -1,8 +1,12 @@
 # api/__init__.py
 from fastapi import APIRouter
-from api.endpoints import crops,modelPredict
+from api.endpoints import crops,modelPredict,admin,health,analytics,metrics,enrichment
 api_router = APIRouter()
 # Include all endpoint routers
-# api_router.include_router(health.router)
+api_router.include_router(health.router)
 api_router.include_router(crops.router)
-api_router.include_router(modelPredict.router)
\ No newline at end of file
+api_router.include_router(modelPredict.router)
+api_router.include_router(admin.router)
+api_router.include_router(analytics.router)
+api_router.include_router(enrichment.router)
+api_router.include_router(metrics.router)
\ No newline at end of file
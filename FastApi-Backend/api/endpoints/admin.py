@@ -0,0 +1,187 @@
+from fastapi import APIRouter, status, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import asyncio
+import logging
+from typing import Optional
+from core.db.mongo import check_yield_summary, get_index_report, rebuild_yield_summary
+from core.prediction.artifact import ModelArtifactError, get_active_bundle
+from core.prediction.registry import RegistryError, activate_model, get_model_registry
+from core.prediction.shadow import ShadowScorer, get_shadow_scorer, model_metrics, set_shadow_scorer
+from core.telemetry.profiler import profiler
+from config import settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+@router.get("/indexes", status_code=status.HTTP_200_OK)
+async def index_report_endpoint():
+    """
+    Compare the declared indexes with the collections and with the query
+    plans of the queries the API issues.
+    """
+    try:
+        report = await get_index_report()
+        return {"status": "success", **report}
+    except Exception as e:
+        logger.error(f"Error in index_report endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build index report: {str(e)}"
+        )
+
+
+
+@router.post("/yield-summary/rebuild", status_code=status.HTTP_200_OK)
+async def rebuild_yield_summary_endpoint():
+    """
+    Recompute the yield_summary collection from the crop records.
+    """
+    try:
+        groups = await rebuild_yield_summary()
+        return {"status": "success", "groups": groups}
+    except Exception as e:
+        logger.error(f"Error rebuilding yield summary: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild yield summary: {str(e)}"
+        )
+
+
+@router.get("/yield-summary/check", status_code=status.HTTP_200_OK)
+async def check_yield_summary_endpoint(tolerance: float = 1e-6):
+    """
+    Compare the yield_summary collection with one recomputed from the crop
+    records. Reads every crop, so it is as expensive as a rebuild.
+    """
+    try:
+        report = await check_yield_summary(tolerance=tolerance)
+        return {"status": "success", **report}
+    except Exception as e:
+        logger.error(f"Error checking yield summary: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to check yield summary: {str(e)}"
+        )
+
+def _require_registry():
+    registry = get_model_registry()
+    if registry is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No model registry configured (set MODEL_REGISTRY_DIR)"
+        )
+    return registry
+
+
+@router.get("/models", status_code=status.HTTP_200_OK)
+async def list_models():
+    """
+    Registered model versions, the one being served, any shadow candidate,
+    and per-version latency and shadow divergence seen by this worker.
+    """
+    registry = get_model_registry()
+    bundle = get_active_bundle()
+    shadow = get_shadow_scorer()
+    return {
+        "status": "success",
+        "active_version": bundle.version if bundle else None,
+        "registry_active_version": registry.active_version() if registry else None,
+        "models": [entry.to_dict() for entry in registry.entries()] if registry else [],
+        "shadow": shadow.stats() if shadow else None,
+        "metrics": model_metrics.snapshot(),
+    }
+
+
+@router.post("/models/{version}/activate", status_code=status.HTTP_200_OK)
+async def activate_model_endpoint(version: str):
+    """
+    Load a registered version and atomically make it the served model.
+    Other workers pick the change up from the registry on their next poll.
+    """
+    registry = _require_registry()
+    try:
+        bundle = await activate_model(registry, version)
+    except RegistryError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ModelArtifactError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    shadow = get_shadow_scorer()
+    if shadow is not None and shadow.version == bundle.version:
+        # The candidate is now live; shadowing it against itself is pointless
+        set_shadow_scorer(None)
+        await shadow.close()
+    return {"status": "success", "message": f"Model {bundle.version} is now active", "active_version": bundle.version}
+
+
+@router.post("/models/{version}/shadow", status_code=status.HTTP_200_OK)
+async def start_shadow(version: str):
+    """
+    Score a registered candidate in the background on live prediction traffic.
+    """
+    registry = _require_registry()
+    try:
+        bundle = await asyncio.to_thread(registry.load, version)
+    except RegistryError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ModelArtifactError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    previous = get_shadow_scorer()
+    set_shadow_scorer(ShadowScorer(bundle, max_pending=settings.SHADOW_MAX_PENDING))
+    if previous is not None:
+        await previous.close()
+    return {"status": "success", "message": f"Shadow scoring with model {version}", "shadow_version": version}
+
+
+@router.delete("/models/shadow", status_code=status.HTTP_200_OK)
+async def stop_shadow():
+    shadow = get_shadow_scorer()
+    if shadow is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No shadow model is running")
+    set_shadow_scorer(None)
+    await shadow.close()
+    return {"status": "success", "message": f"Stopped shadow scoring with model {shadow.version}"}
+
+
+@router.get("/profiler", status_code=status.HTTP_200_OK)
+async def profiler_status():
+    """
+    Whether the sampling profiler is running and how much it has collected.
+    """
+    return {"status": "success", "enabled": settings.PROFILER_ENABLED, **profiler.stats()}
+
+
+@router.post("/profiler/start", status_code=status.HTTP_200_OK)
+async def start_profiler(
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0, description="Time between stack samples"),
+    seconds: Optional[float] = Query(30.0, gt=0, le=3600, description="Stop automatically after this long")
+):
+    """
+    Start sampling this worker's thread stacks, replacing the previous
+    profile. Fetch the result from /profiler/collapsed.
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The profiler is disabled (set PROFILER_ENABLED)"
+        )
+    try:
+        profiler.start(interval=interval_ms / 1000.0, duration=seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"status": "success", **profiler.stats()}
+
+
+@router.post("/profiler/stop", status_code=status.HTTP_200_OK)
+async def stop_profiler():
+    await asyncio.to_thread(profiler.stop)
+    return {"status": "success", **profiler.stats()}
+
+
+@router.get("/profiler/collapsed", response_class=PlainTextResponse)
+async def profiler_collapsed():
+    """
+    Sampled stacks in folded format, one "frame;frame;... count" per line,
+    ready for flamegraph.pl, speedscope or inferno.
+    """
+    return PlainTextResponse(profiler.collapsed())
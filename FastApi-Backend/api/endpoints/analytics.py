@@ -0,0 +1,176 @@
+from fastapi import APIRouter, status, HTTPException, Query, Depends
+import logging
+from typing import Optional, Dict, Any
+from models.schemas import AnalyticsSeriesResponse, AnalyticsHistogramResponse, AnalyticsSummaryResponse
+from core.responses import FastJSONResponse
+from core.db.mongo import aggregate_crops, aggregate_yield_summary, build_crop_filter, yield_summary_available
+from core.db.analytics import (
+    YIELD_GROUP_FIELDS, FERTILIZER_FIELDS,
+    yield_by_pipeline, crop_counts_pipeline, yearly_inputs_pipeline, fertilizer_range_pipeline,
+    fertilizer_histogram_pipeline, histogram_boundaries, tag_rollup_pipeline, summary_pipeline,
+    summary_yield_by_pipeline, summary_crop_counts_pipeline, summary_yearly_inputs_pipeline,
+    summary_tag_rollup_pipeline, summary_summary_pipeline
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+
+def crop_filter(
+    tag: Optional[str] = Query(None, description="Only crops carrying this tag"),
+    crop_name: Optional[str] = Query(None, description="Only this crop (case-insensitive)"),
+    season: Optional[str] = Query(None, description="Only this season"),
+    year_from: Optional[int] = Query(None, description="Earliest crop_year"),
+    year_to: Optional[int] = Query(None, description="Latest crop_year")
+) -> Dict[str, Any]:
+    return build_crop_filter(tag, crop_name, season, year_from, year_to)
+
+
+def use_summary(
+    source: str = Query("auto", description="auto (the yield summary once built), summary or live")
+) -> bool:
+    """
+    Whether to read the precomputed yield_summary groups instead of crops.
+    """
+    if source not in ("auto", "summary", "live"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="source must be one of auto, summary, live"
+        )
+    available = yield_summary_available()
+    if source == "summary" and not available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The yield summary is disabled or still being built"
+        )
+    return source != "live" and available
+
+
+async def _aggregate(pipeline, what: str, from_summary: bool = False):
+    try:
+        if from_summary:
+            return await aggregate_yield_summary(pipeline)
+        return await aggregate_crops(pipeline)
+    except Exception as e:
+        logger.error(f"Error aggregating {what}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to aggregate {what}: {str(e)}"
+        )
+
+
+def _series(series) -> FastJSONResponse:
+    return FastJSONResponse({"status": "success", "message": None, "series": series, "count": len(series)})
+
+
+@router.get("/yield", status_code=status.HTTP_200_OK, response_model=AnalyticsSeriesResponse)
+async def yield_by_endpoint(
+    group_by: str = Query("crop_name", description="Comma-separated: crop_name, season, crop_year"),
+    match: Dict[str, Any] = Depends(crop_filter),
+    from_summary: bool = Depends(use_summary)
+):
+    """
+    Mean, min and max predicted yield per crop, season and/or year.
+    Crops without a prediction are left out.
+    """
+    keys = list(dict.fromkeys(key.strip() for key in group_by.split(",") if key.strip()))
+    unknown = [key for key in keys if key not in YIELD_GROUP_FIELDS]
+    if not keys or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be a subset of {', '.join(YIELD_GROUP_FIELDS)}"
+        )
+    pipeline = summary_yield_by_pipeline(match, keys) if from_summary else yield_by_pipeline(match, keys)
+    return _series(await _aggregate(pipeline, "yield by group", from_summary))
+
+
+@router.get("/crop-counts", status_code=status.HTTP_200_OK, response_model=AnalyticsSeriesResponse)
+async def crop_counts_endpoint(
+    limit: Optional[int] = Query(None, ge=1, description="Only the most common crops"),
+    match: Dict[str, Any] = Depends(crop_filter),
+    from_summary: bool = Depends(use_summary)
+):
+    """
+    Number of records per crop, most common first.
+    """
+    pipeline = summary_crop_counts_pipeline(match, limit) if from_summary else crop_counts_pipeline(match, limit)
+    return _series(await _aggregate(pipeline, "crop counts", from_summary))
+
+
+@router.get("/yearly-inputs", status_code=status.HTTP_200_OK, response_model=AnalyticsSeriesResponse)
+async def yearly_inputs_endpoint(
+    match: Dict[str, Any] = Depends(crop_filter),
+    from_summary: bool = Depends(use_summary)
+):
+    """
+    Per-year mean rainfall, fertilizer, pesticide and predicted yield.
+    """
+    pipeline = summary_yearly_inputs_pipeline(match) if from_summary else yearly_inputs_pipeline(match)
+    return _series(await _aggregate(pipeline, "yearly inputs", from_summary))
+
+
+@router.get("/fertilizer-histogram", status_code=status.HTTP_200_OK, response_model=AnalyticsHistogramResponse)
+async def fertilizer_histogram_endpoint(
+    field: str = Query("total", description="total, n, p or k"),
+    bins: int = Query(20, ge=1, le=200),
+    match: Dict[str, Any] = Depends(crop_filter)
+):
+    """
+    Equal-width fertilizer buckets with crop counts and mean predicted yield,
+    for fertilizer-vs-yield charts. Always computed from the crop records.
+    """
+    if field not in FERTILIZER_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"field must be one of {', '.join(FERTILIZER_FIELDS)}"
+        )
+    bounds = await _aggregate(fertilizer_range_pipeline(match, field), "fertilizer range")
+    if not bounds or bounds[0]["min"] is None:
+        return FastJSONResponse({
+            "status": "success", "message": None, "field": field, "boundaries": [], "series": [], "count": 0
+        })
+
+    boundaries = histogram_boundaries(bounds[0]["min"], bounds[0]["max"], bins)
+    buckets = await _aggregate(fertilizer_histogram_pipeline(match, field, boundaries), "fertilizer histogram")
+    upper = dict(zip(boundaries, boundaries[1:]))
+    series = [
+        {"lower": bucket["_id"], "upper": upper[bucket["_id"]],
+         **{k: v for k, v in bucket.items() if k != "_id"}}
+        for bucket in buckets if bucket["_id"] in upper
+    ]
+    return FastJSONResponse({
+        "status": "success", "message": None, "field": field,
+        "boundaries": boundaries, "series": series, "count": len(series)
+    })
+
+
+@router.get("/tags", status_code=status.HTTP_200_OK, response_model=AnalyticsSeriesResponse)
+async def tag_rollup_endpoint(
+    limit: int = Query(100, ge=1, le=1000),
+    match: Dict[str, Any] = Depends(crop_filter),
+    from_summary: bool = Depends(use_summary)
+):
+    """
+    Record count, total area and mean predicted yield per tag. Filtering by
+    tag (co-occurring tags) is always computed from the crop records.
+    """
+    if from_summary and "tags" not in match:
+        return _series(await _aggregate(summary_tag_rollup_pipeline(match, limit), "tag rollup", True))
+    return _series(await _aggregate(tag_rollup_pipeline(match, limit), "tag rollup"))
+
+
+@router.get("/summary", status_code=status.HTTP_200_OK, response_model=AnalyticsSummaryResponse)
+async def summary_endpoint(
+    match: Dict[str, Any] = Depends(crop_filter),
+    from_summary: bool = Depends(use_summary)
+):
+    """
+    Headline numbers for the dashboard cards.
+    """
+    pipeline = summary_summary_pipeline(match) if from_summary else summary_pipeline(match)
+    result = await _aggregate(pipeline, "summary", from_summary)
+    summary = result[0] if result else {
+        "count": 0, "predicted": 0, "mean_yield": None, "mean_rainfall": None,
+        "total_area": 0, "first_year": None, "last_year": None
+    }
+    return FastJSONResponse({"status": "success", "message": None, "summary": summary})
@@ -1,55 +1,112 @@
-from fastapi import APIRouter, status, HTTPException, Query
+from fastapi import APIRouter, status, HTTPException, Query, Request, Header
+from fastapi.responses import StreamingResponse
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Any
 from bson.errors import InvalidId
+from pydantic import ValidationError
 from models.schemas import (
-    CropCreateRequest, CropResponse, CropsListResponse, SuccessResponse
+    CropCreateRequest, CropResponse, CropsListResponse, SuccessResponse,
+    CropProjectionResponse, CropNameSearchResponse, BulkIngestResponse
 )
 from models.database import CropModel, CropUpdateModel
+from models.adapters import crop_response, crop_responses, crop_projection
+from core.responses import FastJSONResponse
 from core.db.mongo import (
-    get_all_crops, get_crop_by_id, get_crop_by_name,
-    create_crop, update_crop, delete_crop
+    get_all_crops, get_crop_by_id, get_crop_by_name, search_crop_names,
+    create_crop, update_crop, delete_crop, crop_document, insert_crops, VersionConflict,
+    encode_page_cursor, decode_page_cursor, build_crop_filter, iter_crop_batches
 )
+from core.ingest.stream import (
+    iter_csv_records, iter_ndjson_records, record_to_crop_request, describe_validation_error
+)
+from core.export.stream import (
+    EXPORT_FIELDS, MEDIA_TYPES, ndjson_chunks, csv_chunks, columnar_chunks, columnar_formats_available
+)
+from core.prediction.loader import ensure_model_loaded
+from core.prediction.executor import get_inference_executor, InferenceQueueFull
+from core.prediction.predict import crop_to_row, prediction_record
+from config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/crops", tags=["Crops"])
 
+# Fields that can be requested through `fields=` on the list endpoint
+PROJECTABLE_FIELDS = set(CropProjectionResponse.model_fields) - {"id"}
+
+def _etag(crop) -> str:
+    return f'"{crop.get("version", 0)}"'
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Expected record version from an If-Match header (None when absent or "*").
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid If-Match header: {if_match}"
+        )
+
+
+BULK_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
 @router.get("/list", status_code=status.HTTP_200_OK, response_model=CropsListResponse)
 async def list_crops_endpoint(
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(100, description="Maximum number of records to return"),
-    tag: Optional[str] = Query(None, description="Filter crops by tag")
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=settings.CROPS_LIST_MAX_LIMIT, description="Maximum number of records to return"),
+    tag: Optional[str] = Query(None, description="Filter crops by tag"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. crop_name,predicted_yield")
 ):
     """
     List stored crops from the database.
     """
     try:
-        crops = await get_all_crops(skip=skip, limit=limit, tag_filter=tag)
+        after = decode_page_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        return {
+    projection = None
+    if fields:
+        projection = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(projection) - PROJECTABLE_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+    try:
+        crops = await get_all_crops(
+            skip=skip, limit=limit, tag_filter=tag, after=after, fields=projection
+        )
+
+        if projection:
+            items = [crop_projection(crop, projection) for crop in crops]
+        else:
+            items = crop_responses(crops)
+
+        # Items are already in their API shape; skip per-row model validation
+        return FastJSONResponse({
             "status": "success",
-            "crops": [
-                {
-                    "id": str(crop["_id"]),
-                    "crop_name": crop["crop_name"],
-                    "crop_year": crop["crop_year"],
-                    "soil_type": crop["soil_type"],
-                    "season": crop["season"],
-                    "area": crop["area"],
-                    "annual_rainfall": crop["annual_rainfall"],
-                    "fertilizer_n": crop["fertilizer_n"],
-                    "fertilizer_p": crop["fertilizer_p"],
-                    "fertilizer_k": crop["fertilizer_k"],
-                    "pesticide": crop["pesticide"],
-                    "predicted_yield": crop.get("predicted_yield"),
-                    "created_at": crop["created_at"].isoformat(),
-                    "updated_at": crop.get("updated_at", "").isoformat() if crop.get("updated_at") else None,
-                    "tags": crop.get("tags", [])
-                }
-                for crop in crops
-            ],
-            "count": len(crops)
-        }
+            "message": None,
+            "crops": items,
+            "count": len(items),
+            "next_cursor": encode_page_cursor(crops[-1]) if len(crops) == limit else None
+        })
     except Exception as e:
         logger.error(f"Error in list_crops endpoint: {e}", exc_info=True)
         raise HTTPException(
@@ -57,6 +114,81 @@ async def list_crops_endpoint(
             detail=f"Failed to list crops: {str(e)}"
         )
 
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=CropNameSearchResponse)
+async def search_crop_names_endpoint(
+    prefix: str = Query(..., min_length=1, description="Beginning of the crop name"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of names to return")
+):
+    """
+    Suggest stored crop names starting with a prefix (case-insensitive).
+    """
+    try:
+        names = await search_crop_names(prefix, limit=limit)
+        return {"status": "success", "names": names, "count": len(names)}
+    except Exception as e:
+        logger.error(f"Error in search_crop_names endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search crop names: {str(e)}"
+        )
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_crops_endpoint(
+    format: str = Query("ndjson", description="ndjson, csv, arrow or parquet"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    tag: Optional[str] = Query(None, description="Filter crops by tag"),
+    crop_name: Optional[str] = Query(None, description="Filter by crop name (case-insensitive)"),
+    season: Optional[str] = Query(None, description="Filter by season"),
+    year_from: Optional[int] = Query(None, description="Earliest crop_year"),
+    year_to: Optional[int] = Query(None, description="Latest crop_year")
+):
+    """
+    Stream crop records and their predictions straight from a Mongo cursor.
+    """
+    fmt = format.lower()
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}', expected one of {', '.join(MEDIA_TYPES)}"
+        )
+    if fmt in ("arrow", "parquet") and not columnar_formats_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{fmt} export requires the optional pyarrow package"
+        )
+
+    export_fields = EXPORT_FIELDS
+    if fields:
+        export_fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(export_fields) - set(EXPORT_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+
+    filter_query = build_crop_filter(
+        tag=tag, crop_name=crop_name, season=season, year_from=year_from, year_to=year_to
+    )
+    batches = iter_crop_batches(
+        filter_query,
+        fields=[field for field in export_fields if field != "id"],
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+    if fmt == "ndjson":
+        body = ndjson_chunks(batches, export_fields)
+    elif fmt == "csv":
+        body = csv_chunks(batches, export_fields)
+    else:
+        body = columnar_chunks(batches, export_fields, fmt)
+
+    extension = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows", "parquet": "parquet"}[fmt]
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="crops.{extension}"'}
+    )
+
 @router.get("/{crop_id}", status_code=status.HTTP_200_OK, response_model=CropResponse)
 async def get_crop_endpoint(crop_id: str):
     """
@@ -70,24 +202,9 @@ async def get_crop_endpoint(crop_id: str):
                 detail=f"Crop with ID {crop_id} not found"
             )
 
-        return {
-            "status": "success",
-            "id": str(crop["_id"]),
-            "crop_name": crop["crop_name"],
-            "crop_year": crop["crop_year"],
-            "season": crop["season"],
-            "soil_type": crop["soil_type"],
-            "area": crop["area"],
-            "annual_rainfall": crop["annual_rainfall"],
-            "fertilizer_n": crop["fertilizer_n"],
-            "fertilizer_p": crop["fertilizer_p"],
-            "fertilizer_k": crop["fertilizer_k"],
-            "pesticide": crop["pesticide"],
-            "predicted_yield": crop.get("predicted_yield"),
-            "created_at": crop["created_at"].isoformat(),
-            "updated_at": crop.get("updated_at", "").isoformat() if crop.get("updated_at") else None,
-            "tags": crop.get("tags", [])
-        }
+        return FastJSONResponse(
+            crop_response(crop), status_code=status.HTTP_200_OK, headers={"ETag": _etag(crop)}
+        )
     except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,13 +225,6 @@ async def create_crop_endpoint(request: CropCreateRequest):
     Create a new crop record.
     """
     try:
-        existing_crop = await get_crop_by_name(request.crop_name)
-        # if existing_crop:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_400_BAD_REQUEST,
-        #         detail=f"Crop with name '{request.crop_name}' already exists"
-        #     )
-
         crop_model = CropModel(
             crop_name=request.crop_name,
             crop_year=request.crop_year,
@@ -136,23 +246,9 @@ async def create_crop_endpoint(request: CropCreateRequest):
                 detail="Failed to create crop record"
             )
 
-        return {
-            "status": "success",
-            "id": str(created_crop["_id"]),
-            "crop_name": created_crop["crop_name"],
-            "crop_year": created_crop["crop_year"],
-            "season": created_crop["season"],
-            "soil_type": created_crop["soil_type"],
-            "area": created_crop["area"],
-            "annual_rainfall": created_crop["annual_rainfall"],
-            "fertilizer_n": created_crop["fertilizer_n"],
-            "fertilizer_p": created_crop["fertilizer_p"],
-            "fertilizer_k": created_crop["fertilizer_k"],
-            "pesticide": created_crop["pesticide"],
-            "created_at": created_crop["created_at"].isoformat(),
-            "updated_at": created_crop.get("updated_at", "").isoformat() if created_crop.get("updated_at") else None,
-            "tags": created_crop.get("tags", [])
-        }
+        return FastJSONResponse(
+            crop_response(created_crop), status_code=status.HTTP_201_CREATED, headers={"ETag": _etag(created_crop)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -162,49 +258,137 @@ async def create_crop_endpoint(request: CropCreateRequest):
             detail=f"Failed to create crop: {str(e)}"
         )
 
+@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=BulkIngestResponse)
+async def bulk_create_crops_endpoint(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the Content-Type"),
+    soil_type: str = Query("Unknown", description="soil_type for rows that do not provide one"),
+    score: bool = Query(False, description="Predict and store yields while ingesting")
+):
+    """
+    Create crop records from a streamed CSV or NDJSON body.
+
+    Rows are validated one at a time and written with unordered insert_many
+    in chunks, so the upload is never held in memory. CSV may use
+    CropCreateRequest field names or the crop_yield.csv headers.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = (format or BULK_CONTENT_TYPES.get(content_type, "")).lower()
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+
+    executor = get_inference_executor() if score else None
+    if score and executor is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Model is not loaded")
+    bundle = None
+    if executor is not None:
+        # Waits for a lazy or still-running background load; rows are ingested unscored without a model
+        try:
+            bundle = await ensure_model_loaded()
+        except Exception as e:
+            logger.warning(f"Ingesting without scoring, the model failed to load: {e}")
+        if bundle is None:
+            executor = None
+
+    summary = {"received": 0, "inserted": 0, "scored": 0}
+    errors: List[Dict[str, Any]] = []
+    failed = 0
+
+    def add_error(row: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.BULK_INGEST_MAX_ERRORS:
+            errors.append({"row": row, "error": message})
+
+    async def flush(chunk: List[Tuple[int, Dict[str, Any]]]):
+        if not chunk:
+            return
+        documents = [document for _, document in chunk]
+        if executor is not None:
+            try:
+                predictions, version = await executor.predict(
+                    [crop_to_row(document) for document in documents],
+                    chunk_size=settings.PREDICT_BATCH_CHUNK_SIZE
+                )
+                for document, value in zip(documents, predictions.tolist()):
+                    document.update(prediction_record(document, value, version))
+                summary["scored"] += len(documents)
+            except InferenceQueueFull as e:
+                logger.warning(f"Skipping scoring for {len(documents)} ingested rows: {e}")
+        inserted, write_errors = await insert_crops(documents)
+        summary["inserted"] += inserted
+        for index, message in write_errors.items():
+            add_error(chunk[index][0], message)
+
+    records = iter_csv_records(request.stream()) if fmt == "csv" else iter_ndjson_records(request.stream())
+    defaults = {"soil_type": soil_type}
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    try:
+        async for row_number, record in records:
+            summary["received"] += 1
+            if isinstance(record, Exception):
+                add_error(row_number, str(record))
+                continue
+            try:
+                crop_request = record_to_crop_request(record, defaults)
+            except (ValidationError, ValueError) as e:
+                add_error(row_number, describe_validation_error(e))
+                continue
+            chunk.append((row_number, crop_document(CropModel(**crop_request.model_dump()))))
+            if len(chunk) >= settings.BULK_INGEST_CHUNK_SIZE:
+                await flush(chunk)
+                chunk = []
+        await flush(chunk)
+    except Exception as e:
+        logger.error(f"Error in bulk_create_crops endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Bulk ingestion failed after {summary['inserted']} rows: {str(e)}"
+        )
+
+    return {
+        "status": "success",
+        **summary,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
+
 @router.put("/{crop_id}", status_code=status.HTTP_200_OK, response_model=CropResponse)
-async def update_crop_endpoint(crop_id: str, request: CropUpdateModel):
+async def update_crop_endpoint(
+    crop_id: str,
+    request: CropUpdateModel,
+    if_match: Optional[str] = Header(None, description="Only update if the record is at this ETag")
+):
     """
     Update an existing crop record.
     """
+    expected_version = _parse_if_match(if_match)
     try:
-        existing_crop = await get_crop_by_id(crop_id)
-        if not existing_crop:
+        updated_crop = await update_crop(crop_id, request, expected_version=expected_version)
+        if not updated_crop:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Crop with ID {crop_id} not found"
             )
 
-        updated_crop = await update_crop(crop_id, request)
-        if not updated_crop:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update crop record"
-            )
-
-        return {
-            "status": "success",
-            "id": str(updated_crop["_id"]),
-            "crop_name": updated_crop["crop_name"],
-            "crop_year": updated_crop["crop_year"],
-            "season": updated_crop["season"],
-            "soil_type": updated_crop["soil_type"],
-            "area": updated_crop["area"],
-            "annual_rainfall": updated_crop["annual_rainfall"],
-            "fertilizer_n": updated_crop["fertilizer_n"],
-            "fertilizer_p": updated_crop["fertilizer_p"],
-            "fertilizer_k": updated_crop["fertilizer_k"],
-            "pesticide": updated_crop["pesticide"],
-            "predicted_yield": updated_crop.get("predicted_yield"),
-            "created_at": updated_crop["created_at"].isoformat(),
-            "updated_at": updated_crop.get("updated_at", "").isoformat() if updated_crop.get("updated_at") else None,
-            "tags": updated_crop.get("tags", [])
-        }
+        return FastJSONResponse(
+            crop_response(updated_crop), status_code=status.HTTP_200_OK, headers={"ETag": _etag(updated_crop)}
+        )
     except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid Crop ID format: {crop_id}"
         )
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{e}; reload it and retry",
+            headers={"ETag": f'"{e.current_version}"'}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -215,25 +399,22 @@ async def update_crop_endpoint(crop_id: str, request: CropUpdateModel):
         )
 
 @router.delete("/{crop_id}", status_code=status.HTTP_200_OK, response_model=SuccessResponse)
-async def delete_crop_endpoint(crop_id: str):
+async def delete_crop_endpoint(
+    crop_id: str,
+    if_match: Optional[str] = Header(None, description="Only delete if the record is at this ETag")
+):
     """
     Delete a crop record.
     """
+    expected_version = _parse_if_match(if_match)
     try:
-        existing_crop = await get_crop_by_id(crop_id)
-        if not existing_crop:
+        success = await delete_crop(crop_id, expected_version=expected_version)
+        if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Crop with ID {crop_id} not found"
             )
 
-        success = await delete_crop(crop_id)
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to delete crop record"
-            )
-
         return {
             "status": "success",
             "message": f"Crop with ID {crop_id} successfully deleted"
@@ -243,6 +424,12 @@ async def delete_crop_endpoint(crop_id: str):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid Crop ID format: {crop_id}"
         )
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{e}; reload it and retry",
+            headers={"ETag": f'"{e.current_version}"'}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -252,7 +439,7 @@ async def delete_crop_endpoint(crop_id: str):
             detail=f"Failed to delete crop: {str(e)}"
         )
 
-@router.get("/name/{crop_name}", status_code=status.HTTP_200_OK, response_model=List[CropResponse])
+@router.get("/name/{crop_name:path}", status_code=status.HTTP_200_OK, response_model=List[CropResponse])
 async def get_crop_name_endpoint(crop_name: str):
     """
     Get all crop records by crop name.
@@ -265,28 +452,10 @@ async def get_crop_name_endpoint(crop_name: str):
                 detail=f"No crops found with name '{crop_name}'"
             )
 
-        return [
-            {
-                "status": "success",
-                "id": str(crop["_id"]),
-                "crop_name": crop["crop_name"],
-                "crop_year": crop["crop_year"],
-                "season": crop["season"],
-                "soil_type": crop["soil_type"],
-                "area": crop["area"],
-                "annual_rainfall": crop["annual_rainfall"],
-                "fertilizer_n": crop["fertilizer_n"],
-                "fertilizer_p": crop["fertilizer_p"],
-                "fertilizer_k": crop["fertilizer_k"],
-                "pesticide": crop["pesticide"],
-                "predicted_yield": crop.get("predicted_yield"),
-                "created_at": crop["created_at"].isoformat(),
-                "updated_at": crop.get("updated_at", "").isoformat() if crop.get("updated_at") else None,
-                "tags": crop.get("tags", [])
-            }
-            for crop in crops
-        ]
+        return FastJSONResponse(crop_responses(crops))
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_crop_name_endpoint: {e}", exc_info=True)
         raise HTTPException(
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, status, HTTPException, Query
+import logging
+from models.schemas import RainfallBatchRequest, RainfallBatchResponse, RainfallResponse
+from core.enrichment.rainfall import get_rainfall_service, rainfall_key
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/enrichment", tags=["Enrichment"])
+
+
+def _require_service():
+    service = get_rainfall_service()
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Rainfall lookups are not configured (set RAINFALL_PROVIDER and RAINFALL_DATASET)"
+        )
+    return service
+
+
+@router.get("/rainfall", status_code=status.HTTP_200_OK, response_model=RainfallResponse)
+async def rainfall_endpoint(
+    state: str = Query(..., description="State name, e.g. Assam"),
+    year: int = Query(..., description="Crop year")
+):
+    """
+    Annual rainfall (mm) for a state and year, for filling in crop inputs.
+    """
+    service = _require_service()
+    try:
+        value = await service.get(state, year)
+    except Exception as e:
+        logger.error(f"Error in rainfall endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Rainfall provider failed: {str(e)}"
+        )
+    if value is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No rainfall data for {state} in {year}"
+        )
+    return {"status": "success", "state": state, "year": year, **value}
+
+
+@router.post("/rainfall/batch", status_code=status.HTTP_200_OK, response_model=RainfallBatchResponse)
+async def rainfall_batch_endpoint(request: RainfallBatchRequest):
+    """
+    Annual rainfall for many state/year pairs with one provider call for
+    everything not already cached. Unknown locations come back without a value.
+    """
+    service = _require_service()
+    try:
+        values = await service.get_many((location.state, location.year) for location in request.locations)
+    except Exception as e:
+        logger.error(f"Error in rainfall_batch endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Rainfall provider failed: {str(e)}"
+        )
+    results = []
+    for location in request.locations:
+        value = values.get(rainfall_key(location.state, location.year))
+        results.append({"state": location.state, "year": location.year, **(value or {})})
+    return {
+        "status": "success",
+        "results": results,
+        "count": len(results),
+        "resolved": sum(1 for result in results if "annual_rainfall" in result),
+    }
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def enrichment_stats():
+    """
+    Rainfall cache and provider statistics for this worker.
+    """
+    service = get_rainfall_service()
+    return {"status": "success", "rainfall": service.stats() if service else None}
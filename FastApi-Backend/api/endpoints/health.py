@@ -0,0 +1,48 @@
+from fastapi import APIRouter, status, HTTPException, Response
+import logging
+from core.db.mongo import get_db_health
+from core.prediction.artifact import get_active_bundle
+from core.prediction.loader import get_model_loader
+from core.startup import startup_profile
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/db", status_code=status.HTTP_200_OK)
+async def db_health():
+    """
+    Ping MongoDB and report latency plus connection pool usage for this worker.
+    """
+    try:
+        report = await get_db_health()
+        return {"status": "success", **report}
+    except Exception as e:
+        logger.error(f"Database health check failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {str(e)}"
+        )
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """
+    200 once the model is loaded and predictions can be served, 503 before that.
+    CRUD endpoints are available as soon as the process answers /health/db.
+    """
+    loader = get_model_loader()
+    ready = get_active_bundle() is not None
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "starting",
+        "model": loader.status() if loader else None,
+    }
+
+
+@router.get("/startup", status_code=status.HTTP_200_OK)
+async def startup_report():
+    """
+    Timings of each startup phase, in seconds since the app module was imported.
+    """
+    return {"status": "success", **startup_profile.report()}
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+import logging
+from config import settings
+from core.db import mongo
+from core.prediction.batcher import get_micro_batcher
+from core.prediction.cache import get_prediction_cache
+from core.prediction.executor import get_inference_executor
+from core.enrichment.rainfall import get_rainfall_service
+from core.telemetry.metrics import registry
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_stat(name):
+    def collect():
+        cache = get_prediction_cache()
+        return {(): cache.stats()[name]} if cache else {}
+    return collect
+
+
+def _batcher_stat(name):
+    def collect():
+        batcher = get_micro_batcher()
+        return {(): batcher.metrics.snapshot()[name]} if batcher else {}
+    return collect
+
+
+def _executor_stat(attribute):
+    def collect():
+        executor = get_inference_executor()
+        return {(): getattr(executor, attribute)} if executor else {}
+    return collect
+
+
+def _rainfall_stat(name):
+    def collect():
+        service = get_rainfall_service()
+        return {(): service.stats()[name]} if service else {}
+    return collect
+
+
+def _pool_connections():
+    servers = mongo.pool_monitor.snapshot()["servers"]
+    return {
+        (address, state): counters[state]
+        for address, counters in servers.items()
+        for state in ("open", "checked_out")
+    }
+
+
+def _pool_counter(name):
+    def collect():
+        return {(address,): counters[name] for address, counters in mongo.pool_monitor.snapshot()["servers"].items()}
+    return collect
+
+
+# State other components already track, read on every scrape
+registry.gauge("prediction_cache_hits_total", "Prediction cache hits", _cache_stat("hits"), kind="counter")
+registry.gauge("prediction_cache_misses_total", "Prediction cache misses", _cache_stat("misses"), kind="counter")
+registry.gauge("prediction_cache_hit_ratio", "Share of prediction cache lookups that hit", _cache_stat("hit_rate"))
+registry.gauge("prediction_cache_entries", "Entries in the in-memory prediction cache", _cache_stat("entries"))
+registry.gauge("microbatch_batches_total", "Micro-batches flushed to the inference pool",
+               _batcher_stat("batches"), kind="counter")
+registry.gauge("microbatch_rows_total", "Rows predicted through the micro-batcher", _batcher_stat("rows"), kind="counter")
+registry.gauge("microbatch_mean_batch_size", "Mean rows per micro-batch", _batcher_stat("mean_batch_size"))
+registry.gauge("inference_in_flight", "Inference jobs running or queued", _executor_stat("in_flight"))
+registry.gauge("inference_capacity", "Inference jobs admitted before requests are rejected", _executor_stat("capacity"))
+registry.gauge("rainfall_cache_hit_ratio", "Share of rainfall lookups served from cache or an in-flight request",
+               _rainfall_stat("hit_rate"))
+registry.gauge("rainfall_provider_calls_total", "Requests made to the rainfall provider",
+               _rainfall_stat("provider_calls"), kind="counter")
+registry.gauge("rainfall_coalesced_total", "Rainfall lookups that joined an identical in-flight request",
+               _rainfall_stat("coalesced"), kind="counter")
+registry.gauge("mongo_pool_connections", "MongoDB pool connections by server and state",
+               _pool_connections, ("server", "state"))
+registry.gauge("mongo_pool_max_size", "MongoDB maxPoolSize per server",
+               lambda: {(): settings.MONGODB_MAX_POOL_SIZE})
+registry.gauge("mongo_pool_checkouts_total", "Connections checked out of the MongoDB pool",
+               _pool_counter("checkouts"), ("server",), kind="counter")
+registry.gauge("mongo_pool_checkout_failures_total", "Failed MongoDB pool checkouts",
+               _pool_counter("checkout_failures"), ("server",), kind="counter")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text exposition of this worker's metrics: request latency
+    per route, span timings, inference batch sizes, prediction cache and
+    MongoDB pool usage. Each uvicorn worker reports its own numbers.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,51 +1,359 @@
 from fastapi import APIRouter, HTTPException
 from bson import ObjectId
-from core.db.mongo import get_crop_by_id  # import your async helper
-from models.schemas import CropPredictionRequest
-from core.prediction.predict import transform_user_input
-import pickle
-import pandas as pd
+from datetime import datetime
+import logging
+from core.db.mongo import (  # import your async helpers
+    get_crop_by_id, get_crops_by_ids, iter_crops_by_tag,
+    set_crop_prediction, bulk_set_predictions, encode_page_cursor, decode_page_cursor
+)
+from models.schemas import (
+    CropPredictionRequest, BatchPredictionRequest, BatchPredictionResponse
+)
+from core.prediction.executor import get_inference_executor, InferenceQueueFull
+from core.prediction.batcher import get_micro_batcher
+from core.prediction.artifact import get_active_bundle
+from core.prediction.loader import ensure_model_loaded
+from core.prediction.shadow import get_shadow_scorer
+from core.prediction.cache import get_prediction_cache, prediction_key
+from core.prediction.predict import crop_to_row, prediction_record, stored_prediction
+from core.baselines.index import get_baseline_index
+from core.enrichment.rainfall import get_rainfall_service, rainfall_key
+from core.telemetry.spans import span
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/model", tags=["Model"])
 
-# Load model and dataset
-model_path = settings.MODEL
-dataset_path = settings.DATASET
+QUEUE_FULL_HEADERS = {"Retry-After": "1"}
+
+
+def _prediction_fields(crop, value, model_version):
+    return {**prediction_record(crop, value, model_version), "updated_at": datetime.utcnow()}
+
+
+async def _loaded_bundle():
+    """
+    Active model bundle, loading it on first use; 503 while it cannot be served.
+    """
+    try:
+        bundle = await ensure_model_loaded()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Model failed to load: {e}")
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded")
+    return bundle
+
+
+def _baselines(crops, predictions, state=None):
+    """
+    Historical context for each prediction, from the in-memory baseline index.
+    """
+    index = get_baseline_index()
+    if index is None or not crops:
+        return [None] * len(crops)
+    return index.context_many(
+        [crop.get("crop_name", "") for crop in crops], [crop.get("season", "") for crop in crops],
+        predictions, state
+    )
 
-with open(model_path, 'rb') as f:
-    model = pickle.load(f)
 
-def load_expected_columns(path: str):
-    df = pd.read_csv(path)
-    return list(df.columns)
+def _shadow_score(rows, predictions):
+    shadow = get_shadow_scorer()
+    if shadow is not None:
+        shadow.submit(rows, predictions)
+
+
+async def _predict_rows_cached(executor, rows, chunk_size=None):
+    """
+    Predict rows, serving repeats from the prediction cache and only sending misses to the model.
+    Returns the predictions and the version of the model they all came from.
+    """
+    if not rows:
+        return [], None
+    cache = get_prediction_cache()
+    bundle = get_active_bundle()
+    if cache is None or bundle is None:
+        predicted, version = await executor.predict(rows, chunk_size=chunk_size)
+        _shadow_score(rows, predicted)
+        return predicted.tolist(), version
+
+    keys = [prediction_key(encoded, bundle.version) for encoded in bundle.encoder.encode_many(rows)]
+    cached = await cache.get_many(keys)
+    misses = [i for i, key in enumerate(keys) if key not in cached]
+    if not misses:
+        return [cached[key] for key in keys], bundle.version
+
+    miss_rows = [rows[i] for i in misses]
+    predicted, version = await executor.predict(miss_rows, chunk_size=chunk_size)
+    _shadow_score(miss_rows, predicted)
+    if version != bundle.version:
+        # Swapped while predicting: the keys and any hits belong to the old model, so
+        # cache nothing and rescore the hits too rather than mixing the two models
+        if len(misses) < len(rows):
+            predicted, version = await executor.predict(rows, chunk_size=chunk_size)
+        return predicted.tolist(), version
+    fresh = {keys[i]: value for i, value in zip(misses, predicted.tolist())}
+    await cache.put_many(fresh, version)
+    cached.update(fresh)
+    return [cached[key] for key in keys], version
+
 
 @router.post("/predict")
 async def predict(request: CropPredictionRequest):  # ✅ async def
+    executor = get_inference_executor()
+    if executor is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded")
+
     try:
         # ✅ Use your helper function that uses `motor`
         crop_data = await get_crop_by_id(request.crop_id)
         if not crop_data:
             raise HTTPException(status_code=404, detail="Crop not found in the database")
 
-        user_input = [
-            crop_data["crop_name"],
-            crop_data["crop_year"],
-            crop_data["season"],
-            crop_data['soil_type'],
-            crop_data["area"],
-            crop_data["annual_rainfall"],
-            crop_data["fertilizer_n"],
-            crop_data["fertilizer_p"],
-            crop_data["fertilizer_k"],
-            crop_data["pesticide"]
-        ]
-
-        expected_columns = load_expected_columns(dataset_path)
-        transformed_input = transform_user_input(user_input, expected_columns)
-        prediction = model.predict(transformed_input)
-
-        return {"predicted_yield": float(prediction[0])}
+        bundle = await _loaded_bundle()
+        # Inputs unchanged since the last prediction with this model: reuse it
+        stored = stored_prediction(crop_data, bundle.version)
+        if stored is not None:
+            return {"predicted_yield": stored, "model_version": bundle.version,
+                    "baseline": _baselines([crop_data], [stored], request.state)[0]}
+
+        user_input = crop_to_row(crop_data)
+
+        cache = get_prediction_cache()
+        cache_key = None
+        prediction = None
+        version = bundle.version
+        if cache is not None:
+            with span("encode"):
+                cache_key = prediction_key(bundle.encoder.encode(user_input), bundle.version)
+            cached = await cache.get_many([cache_key])
+            prediction = cached.get(cache_key)
+
+        if prediction is None:
+            # The model that actually scored the row, which a hot-swap may have changed
+            batcher = get_micro_batcher()
+            if batcher is not None:
+                prediction, version = await batcher.predict(user_input)
+            else:
+                predicted, version = await executor.predict([user_input])
+                prediction = predicted[0]
+            prediction = float(prediction)
+            _shadow_score([user_input], [prediction])
+            if cache_key is not None and version == bundle.version:
+                await cache.put_many({cache_key: prediction}, version)
 
+        # Skipped if the record changed while predicting: the value belongs to the old inputs
+        await set_crop_prediction(
+            crop_data["_id"], _prediction_fields(crop_data, prediction, version),
+            crop_data.get("version", 0)
+        )
+
+        return {"predicted_yield": prediction, "model_version": version,
+                "baseline": _baselines([crop_data], [prediction], request.state)[0]}
+
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=QUEUE_FULL_HEADERS)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
+
+async def _predict_chunk(executor, request, requested, crops, errors, rainfall_service):
+    """
+    Score one chunk of a batch: `requested` IDs in response order, the crops
+    found for them and any per-ID errors already known. Returns the result
+    items, how many predictions were written back and the model version.
+    """
+    bundle = await _loaded_bundle()
+    found = {str(crop["_id"]): crop for crop in crops}
+    rainfall = {}
+    if rainfall_service is not None:
+        # One provider call for every state-year not already cached
+        try:
+            rainfall = await rainfall_service.get_many(
+                (request.state, crop["crop_year"]) for crop in crops if crop.get("crop_year") is not None
+            )
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Rainfall provider failed: {e}")
+    predictions = {}
+    used_rainfall = {}
+    rows, scored_ids = [], []
+    for crop_id in requested:
+        if crop_id in errors:
+            continue
+        crop = found.get(crop_id)
+        if crop is None:
+            errors[crop_id] = "Crop not found in the database"
+            continue
+        if rainfall_service is not None:
+            value = rainfall.get(rainfall_key(request.state, crop["crop_year"])) if "crop_year" in crop else None
+            if value is None:
+                errors[crop_id] = f"No rainfall data for {request.state} in {crop.get('crop_year')}"
+                continue
+            crop = {**crop, "annual_rainfall": value["annual_rainfall"]}
+            used_rainfall[crop_id] = value["annual_rainfall"]
+        else:
+            stored = stored_prediction(crop, bundle.version)
+            if stored is not None:
+                predictions[crop_id] = stored
+                continue
+        try:
+            rows.append(crop_to_row(crop))
+            scored_ids.append(crop_id)
+        except KeyError as e:
+            errors[crop_id] = f"Crop is missing field {e}"
+
+    fresh_values, fresh_version = await _predict_rows_cached(
+        executor, rows, chunk_size=settings.PREDICT_BATCH_CHUNK_SIZE
+    )
+    fresh = dict(zip(scored_ids, fresh_values))
+    predictions.update(fresh)
+
+    updated = 0
+    if request.write_back and fresh:
+        updated = await bulk_set_predictions(
+            {
+                found[crop_id]["_id"]: _prediction_fields(found[crop_id], value, fresh_version)
+                for crop_id, value in fresh.items()
+            },
+            {found[crop_id]["_id"]: found[crop_id].get("version", 0) for crop_id in fresh}
+        )
+
+    scored = [crop_id for crop_id in requested if crop_id in predictions]
+    baselines = dict(zip(scored, _baselines(
+        [found[crop_id] for crop_id in scored], [predictions[crop_id] for crop_id in scored], request.state
+    )))
+    results = [
+        {"crop_id": crop_id, "predicted_yield": predictions[crop_id], "baseline": baselines[crop_id],
+         "annual_rainfall": used_rainfall.get(crop_id),
+         "model_version": fresh_version if crop_id in fresh else bundle.version}
+        if crop_id in predictions else
+        {"crop_id": crop_id, "error": errors[crop_id]}
+        for crop_id in requested
+    ]
+    return results, updated, fresh_version or bundle.version
+
+
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Score many stored crops, reading, predicting and writing back one chunk at a time.
+
+    A tag batch stops after PREDICT_BATCH_MAX_ITEMS crops; the response is
+    then marked truncated and its next_cursor continues the batch.
+    """
+    executor = get_inference_executor()
+    if executor is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded")
+    if not request.crop_ids and not request.tag:
+        raise HTTPException(status_code=400, detail="Provide crop_ids or tag")
+    if request.crop_ids and len(request.crop_ids) > settings.PREDICT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PREDICT_BATCH_MAX_ITEMS} crop IDs per batch"
+        )
+    if request.cursor and not request.tag:
+        raise HTTPException(status_code=400, detail="cursor only continues a tag batch")
+    after = None
+    if request.cursor:
+        try:
+            after = decode_page_cursor(request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    rainfall_service = None
+    if request.historical_rainfall:
+        if not request.state:
+            raise HTTPException(status_code=400, detail="historical_rainfall needs a state")
+        if request.write_back:
+            # The stored record keeps its own rainfall, so the prediction would not match it
+            raise HTTPException(status_code=400, detail="historical_rainfall cannot be combined with write_back")
+        rainfall_service = get_rainfall_service()
+        if rainfall_service is None:
+            raise HTTPException(status_code=503, detail="Rainfall lookups are not configured")
+
+    try:
+        await _loaded_bundle()
+        chunk_size = settings.PREDICT_BATCH_CHUNK_SIZE
+        results, failed, updated = [], 0, 0
+        model_version = None
+        truncated, next_cursor = False, None
+
+        async def run(requested, crops, errors):
+            nonlocal failed, updated, model_version
+            items, written, model_version = await _predict_chunk(
+                executor, request, requested, crops, errors, rainfall_service
+            )
+            results.extend(items)
+            failed += len(errors)
+            updated += written
+
+        if request.crop_ids:
+            # Keep the caller's order and report bad IDs per item
+            requested = list(dict.fromkeys(request.crop_ids))
+            for start in range(0, len(requested), chunk_size):
+                chunk_ids = requested[start:start + chunk_size]
+                errors = {
+                    crop_id: f"Invalid Crop ID format: {crop_id}"
+                    for crop_id in chunk_ids if not ObjectId.is_valid(crop_id)
+                }
+                crops = await get_crops_by_ids([ObjectId(crop_id) for crop_id in chunk_ids if crop_id not in errors])
+                await run(chunk_ids, crops, errors)
+        else:
+            remaining, last = settings.PREDICT_BATCH_MAX_ITEMS, None
+            async for crops in iter_crops_by_tag(request.tag, after, chunk_size):
+                if remaining == 0:
+                    # More tagged crops than one batch may score
+                    truncated = True
+                    break
+                if len(crops) > remaining:
+                    crops, truncated = crops[:remaining], True
+                await run([str(crop["_id"]) for crop in crops], crops, {})
+                remaining -= len(crops)
+                last = crops[-1]
+                if truncated:
+                    break
+            if truncated:
+                next_cursor = encode_page_cursor(last)
+
+        return {
+            "status": "success",
+            "results": results,
+            "count": len(results),
+            "failed": failed,
+            "updated": updated,
+            "model_version": model_version or (await _loaded_bundle()).version,
+            "truncated": truncated,
+            "next_cursor": next_cursor
+        }
+    except HTTPException:
+        raise
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers=QUEUE_FULL_HEADERS)
+    except Exception as e:
+        logger.error(f"Error in predict_batch endpoint: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {e}")
+
+
+@router.get("/stats")
+async def model_stats():
+    """
+    Report inference pool load, micro-batching, cache and baseline index statistics.
+    """
+    executor = get_inference_executor()
+    batcher = get_micro_batcher()
+    cache = get_prediction_cache()
+    baselines = get_baseline_index()
+    return {
+        "status": "success",
+        "executor": {
+            "mode": executor.mode,
+            "workers": executor.max_workers,
+            "queue_depth": executor.queue_depth,
+            "in_flight": executor.in_flight
+        } if executor else None,
+        "micro_batching": batcher.metrics.snapshot() if batcher else None,
+        "cache": cache.stats() if cache else None,
+        "baselines": baselines.stats() if baselines else None
+    }
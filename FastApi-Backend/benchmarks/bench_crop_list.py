@@ -0,0 +1,135 @@
+"""
+Compare the cost of turning crop documents into API responses before and
+after the shared document adapter.
+
+    python -m benchmarks.bench_crop_list [--rows 1000] [--repeat 50]
+
+"list" renders all rows as one /api/crops/list response. "before"
+reproduces the old path: a hand-built dict per row, validation against
+CropsListResponse, then jsonable_encoder + json.dumps. "after" is the
+current path: models.adapters.crop_responses rendered by FastJSONResponse
+without re-validation.
+
+"single" renders each row as its own single-record response, as GET, POST
+and PUT /api/crops return them: validated against CropResponse before,
+crop_response rendered by FastJSONResponse after.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from core.responses import FastJSONResponse
+from models.adapters import crop_response, crop_responses
+from models.schemas import CropResponse, CropsListResponse
+
+
+def make_documents(rows: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "crop_name": "Rice",
+            "crop_name_lower": "rice",
+            "crop_year": 1997 + i % 24,
+            "season": "Kharif",
+            "soil_type": "Loamy",
+            "area": 1000.0 + i,
+            "annual_rainfall": 1200.5,
+            "fertilizer_n": 10.0,
+            "fertilizer_p": 5.0,
+            "fertilizer_k": 2.5,
+            "pesticide": 1.25,
+            "predicted_yield": 2.5 if i % 2 else None,
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now if i % 3 else None,
+            "tags": ["north", "kharif"],
+            "version": 1,
+        }
+        for i in range(rows)
+    ]
+
+
+def before(crops):
+    items = [
+        {
+            "id": str(crop["_id"]),
+            "crop_name": crop["crop_name"],
+            "crop_year": crop["crop_year"],
+            "soil_type": crop["soil_type"],
+            "season": crop["season"],
+            "area": crop["area"],
+            "annual_rainfall": crop["annual_rainfall"],
+            "fertilizer_n": crop["fertilizer_n"],
+            "fertilizer_p": crop["fertilizer_p"],
+            "fertilizer_k": crop["fertilizer_k"],
+            "pesticide": crop["pesticide"],
+            "predicted_yield": crop.get("predicted_yield"),
+            "created_at": crop["created_at"].isoformat(),
+            "updated_at": crop.get("updated_at", "").isoformat() if crop.get("updated_at") else None,
+            "tags": crop.get("tags", []),
+            "version": crop.get("version", 0)
+        }
+        for crop in crops
+    ]
+    payload = {"status": "success", "crops": items, "count": len(items)}
+    validated = CropsListResponse.model_validate(payload)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def after(crops):
+    items = crop_responses(crops)
+    return FastJSONResponse({
+        "status": "success", "message": None, "crops": items, "count": len(items), "next_cursor": None
+    }).body
+
+
+def before_single(crops):
+    return [
+        json.dumps(jsonable_encoder(CropResponse.model_validate(crop_response(crop)))).encode("utf-8")
+        for crop in crops
+    ]
+
+
+def after_single(crops):
+    return [FastJSONResponse(crop_response(crop)).body for crop in crops]
+
+
+def measure(fn, crops, repeat: int):
+    fn(crops)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(crops)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    crops = make_documents(args.rows)
+    assert json.loads(before(crops))["crops"] == json.loads(after(crops))["crops"]
+    assert [json.loads(body) for body in before_single(crops[:10])] == \
+        [json.loads(body) for body in after_single(crops[:10])]
+
+    report = {"rows": args.rows, "repeat": args.repeat}
+    for scenario, paths in (("list", (before, after)), ("single", (before_single, after_single))):
+        results = {name: measure(fn, crops, args.repeat) for name, fn in zip(("before", "after"), paths)}
+        results["speedup"] = results["before"]["median_ms"] / results["after"]["median_ms"]
+        report[scenario] = results
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Microbenchmarks for feature encoding and model inference.
+
+    python -m benchmarks.bench_inference MODEL [--batch-sizes 1 10 100 1000 10000] [--seconds 1] [--output FILE]
+
+Covers transform_user_input (the per-row path), FeatureEncoder.encode_many,
+the estimator's predict on encoded matrices and ModelBundle.predict_rows
+(encode + predict, as the API calls it) at each batch size. MODEL may be a
+pickle or a flat forest directory.
+"""
+import argparse
+import random
+import time
+import warnings
+
+from benchmarks.common import latency_summary, print_table, save_results
+from core.prediction.artifact import load_model_bundle
+from core.prediction.predict import transform_user_input
+
+CROPS = ["Rice", "Wheat", "Maize", "Arhar/Tur", "Coconut ", "Sugarcane", "Unknown crop"]
+SEASONS = ["Kharif     ", "Rabi", "Whole Year ", "Summer", "Winter"]
+
+
+def make_rows(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        [
+            rng.choice(CROPS), rng.randint(1997, 2020), rng.choice(SEASONS), "Loamy",
+            rng.uniform(10, 1e5), rng.uniform(300, 3000), rng.uniform(1e3, 1e7),
+            rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(10, 1e5),
+        ]
+        for _ in range(count)
+    ]
+
+
+def run(fn, min_seconds: float, min_calls: int = 5):
+    fn()  # warm-up
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_calls or time.perf_counter() - started < min_seconds:
+        call_started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("model", help="model artifact (pickle or flat forest directory)")
+    parser.add_argument("--schema", help="schema manifest, if not next to the model")
+    parser.add_argument("--dataset", help="training CSV, last-resort schema source")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum time per case")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/)")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    bundle = load_model_bundle(args.model, schema_path=args.schema, dataset_path=args.dataset)
+    results = {"model": args.model, "model_version": bundle.version, "cases": {}}
+
+    for size in args.batch_sizes:
+        rows = make_rows(size)
+        matrix = bundle.encoder.encode_many(rows)
+        cases = {
+            "transform_user_input": lambda: [transform_user_input(row, bundle.columns) for row in rows],
+            "encode_many": lambda: bundle.encoder.encode_many(rows),
+            "estimator.predict": lambda: bundle.estimator.predict(matrix),
+            "predict_rows": lambda: bundle.predict_rows(rows),
+        }
+        for name, fn in cases.items():
+            results["cases"][f"{name}[{size}]"] = latency_summary(run(fn, args.seconds), rows_per_call=size)
+
+    print_table(f"Model {bundle.version} ({args.model})", results["cases"])
+    print(f"\nSaved {save_results('inference', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-worker memory of serving a model from a pickle versus a memory-mapped
+flat forest (see core/prediction/convert.py).
+
+    python -m benchmarks.bench_model_rss MODEL.pkl MODEL_DIR [--workers 4] [--json out.json]
+
+Each worker is a fresh process that loads one artifact, scores a row, and
+reports RSS and PSS from /proc (Linux only). PSS splits shared pages between
+the processes mapping them, so mapped forests show up as a lower total PSS
+as workers are added, while every pickle worker pays for its own copy.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import warnings
+
+
+def _memory_kb() -> dict:
+    usage = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                usage["rss_kb"] = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    usage["pss_kb"] = int(line.split()[1])
+    except OSError:
+        pass
+    return usage
+
+
+def _worker(model_path: str, ready, done) -> None:
+    warnings.filterwarnings("ignore")
+    from core.prediction.artifact import load_model_bundle
+
+    baseline = _memory_kb()
+    bundle = load_model_bundle(model_path)
+    bundle.predict_rows([["Rice", 2000, "Kharif", "Loamy", 1.0, 1200.0, 10.0, 5.0, 2.5, 1.25]])
+    loaded = _memory_kb()
+    # Measure while all workers are alive so shared pages are split between them
+    ready.put(None)
+    done.wait()
+    final = _memory_kb()
+    ready.put({
+        "pid": os.getpid(),
+        "baseline_rss_kb": baseline["rss_kb"],
+        "model_rss_kb": loaded["rss_kb"] - baseline["rss_kb"],
+        "rss_kb": final["rss_kb"],
+        "pss_kb": final.get("pss_kb"),
+    })
+
+
+def measure(model_path: str, workers: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    ready, done = ctx.Queue(), ctx.Event()
+    processes = [ctx.Process(target=_worker, args=(model_path, ready, done)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    done.set()
+    results = [ready.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "model": model_path,
+        "workers": workers,
+        "per_worker": results,
+        "total_rss_kb": sum(r["rss_kb"] for r in results),
+        "total_pss_kb": sum(r["pss_kb"] or 0 for r in results),
+        "mean_model_rss_kb": sum(r["model_rss_kb"] for r in results) / workers,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("artifacts", nargs="+", help="model artifacts to compare")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", help="write the full results to this file")
+    args = parser.parse_args()
+
+    results = [measure(path, args.workers) for path in args.artifacts]
+    print(f"{'artifact':40} {'model RSS/worker':>18} {'total RSS':>12} {'total PSS':>12}")
+    for result in results:
+        print(f"{os.path.basename(result['model'].rstrip('/')):40} "
+              f"{result['mean_model_rss_kb'] / 1024:>15.1f} MB "
+              f"{result['total_rss_kb'] / 1024:>9.1f} MB "
+              f"{result['total_pss_kb'] / 1024:>9.1f} MB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
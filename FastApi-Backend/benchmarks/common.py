@@ -0,0 +1,77 @@
+"""
+Shared helpers for the benchmark scripts: latency summaries and JSON result
+files that can be diffed between commits.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def latency_summary(seconds: Sequence[float], rows_per_call: int = 1, wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Percentiles in milliseconds plus throughput. Throughput uses the wall
+    time of the whole run when given (concurrent load), else the sum of calls.
+    """
+    samples = np.asarray(seconds, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    elapsed = wall_seconds if wall_seconds is not None else float(samples.sum() / 1000)
+    return {
+        "calls": int(len(samples)),
+        "rows_per_call": rows_per_call,
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(samples.max()),
+        "calls_per_s": len(samples) / elapsed if elapsed else 0.0,
+        "rows_per_s": len(samples) * rows_per_call / elapsed if elapsed else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(name: str, results: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Write results with the commit and environment they were measured on.
+    Defaults to benchmarks/results/<name>-<commit>.json.
+    """
+    commit = _git_commit()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{commit or 'nocommit'}.json")
+    payload = {
+        "benchmark": name,
+        "commit": commit,
+        "measured_at": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    print(f"{'case':28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'calls/s':>10} {'rows/s':>12}")
+    for case, stats in rows.items():
+        print(f"{case:28} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+              f"{stats['calls_per_s']:>10.1f} {stats['rows_per_s']:>12.1f}")
@@ -0,0 +1,143 @@
+"""
+In-process ASGI load test of the prediction and CRUD endpoints.
+
+    python -m benchmarks.load_api MODEL [--crops 5000] [--concurrency 1 8 32] [--requests 2000] [--output FILE]
+
+The app runs with its real lifespan inside this process, driven by
+httpx.AsyncClient over ASGITransport, against mongomock-motor instead of a
+MongoDB server. Numbers therefore measure the application stack (routing,
+validation, encoding, inference pool, micro-batching, serialization), not
+the network or the database. Requires the dev-only mongomock-motor package.
+
+Scenarios:
+  predict        POST /api/model/predict on random seeded crops (first hits
+                 compute, repeats are served from the stored prediction)
+  predict_fresh  the same, after clearing stored predictions and the cache
+  list           GET /api/crops/list?limit=50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import warnings
+
+
+def _configure_env(model_path: str) -> None:
+    os.environ.setdefault("MONGODB_CONNECTION_STRING", "mongodb://benchmark.invalid")
+    os.environ["MODEL"] = model_path
+    os.environ.setdefault("MODEL_LOADING", "eager")
+    os.environ.setdefault("MODEL_REGISTRY_DIR", "")
+
+
+def seed_documents(count: int, seed: int = 0):
+    from core.db.mongo import crop_document
+    from models.database import CropModel
+
+    rng = random.Random(seed)
+    crops = ["Rice", "Wheat", "Maize", "Arhar/Tur", "Sugarcane", "Cotton(lint)"]
+    seasons = ["Kharif", "Rabi", "Whole Year", "Summer"]
+    return [
+        crop_document(CropModel(
+            crop_name=rng.choice(crops), crop_year=rng.randint(1997, 2020), season=rng.choice(seasons),
+            soil_type="Loamy", area=rng.uniform(10, 1e5), annual_rainfall=rng.uniform(300, 3000),
+            fertilizer_n=rng.uniform(1e3, 1e6), fertilizer_p=rng.uniform(0, 100),
+            fertilizer_k=rng.uniform(0, 100), pesticide=rng.uniform(10, 1e4), tags=["benchmark"],
+        ))
+        for _ in range(count)
+    ]
+
+
+async def _drive(client, make_request, total: int, concurrency: int):
+    timings, failures = [], 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal failures
+        for _ in remaining:
+            method, url, body = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, failures, time.perf_counter() - started
+
+
+async def run(args) -> dict:
+    import httpx
+    from mongomock_motor import AsyncMongoMockClient
+
+    import core.db.mongo as mongo
+    from benchmarks.common import latency_summary
+    from core.prediction.cache import get_prediction_cache
+    from main import app
+
+    # Stand-in database: every connect_mongo() call gets the in-memory client
+    memory_client = AsyncMongoMockClient()
+    mongo.create_client = lambda: memory_client
+
+    results = {"model": args.model, "crops": args.crops, "scenarios": {}}
+    async with app.router.lifespan_context(app):
+        await mongo.crop_collection.insert_many(seed_documents(args.crops))
+        ids = [str(doc["_id"]) async for doc in mongo.crop_collection.find({}, {"_id": 1})]
+        rng = random.Random(1)
+
+        def predict_request():
+            return "POST", "/api/model/predict", {"crop_id": rng.choice(ids)}
+
+        def list_request():
+            return "GET", "/api/crops/list?limit=50", None
+
+        async def clear_predictions():
+            await mongo.crop_collection.update_many({}, {"$unset": {"predicted_yield": "", "prediction_fingerprint": "",
+                                                                  "prediction_model_version": ""}})
+            cache = get_prediction_cache()
+            if cache is not None:
+                cache.invalidate()
+
+        scenarios = {
+            "predict": (predict_request, None),
+            "predict_fresh": (predict_request, clear_predictions),
+            "list": (list_request, None),
+        }
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in args.scenarios:
+                make_request, before_each = scenarios[name]
+                for concurrency in args.concurrency:
+                    if before_each is not None:
+                        await before_each()
+                    timings, failures, wall = await _drive(client, make_request, args.requests, concurrency)
+                    key = f"{name}[c={concurrency}]"
+                    results["scenarios"][key] = {**latency_summary(timings, wall_seconds=wall), "failures": failures}
+                    print(f"{key} done", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("model", help="model artifact (pickle or flat forest directory)")
+    parser.add_argument("--crops", type=int, default=5000, help="documents seeded into the stand-in database")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario and concurrency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--scenarios", nargs="+", default=["predict", "predict_fresh", "list"],
+                        choices=["predict", "predict_fresh", "list"])
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/)")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    _configure_env(args.model)
+    from benchmarks.common import print_table, save_results
+
+    results = asyncio.run(run(args))
+    print_table(f"ASGI load test ({args.crops} crops, {args.requests} requests per run)", results["scenarios"])
+    print(f"\nSaved {save_results('load_api', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,8 +7,96 @@ class Settings(BaseSettings):
     API_VERSION: str = "1.0.0"
 
     MONGODB_CONNECTION_STRING: str 
+    MONGODB_DATABASE: str = "FarmSight"
+    # Connection pool, per process (each uvicorn worker gets its own pool)
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    MONGODB_READ_PREFERENCE: str = "primary"
+    # Comma-separated wire compressors, e.g. "zstd,snappy,zlib"
+    MONGODB_COMPRESSORS: Optional[str] = None
+    # Pickled model, or a flat forest directory written by core.prediction.convert
     MODEL: str
-    DATASET: str
+    # Optional JSON schema manifest; defaults to <MODEL>.schema.json when present
+    MODEL_SCHEMA: Optional[str] = None
+    # When to load the model: "eager" (before serving, so a model that does not
+    # match its schema aborts startup), or opt in to a faster start with
+    # "background" (at startup, without blocking CRUD traffic) or "lazy" (on
+    # first prediction); both only report a bad model once it is loaded
+    MODEL_LOADING: str = "eager"
+    # Versioned model registry (see core/prediction/registry.py); when it has
+    # an ACTIVE version that is served instead of MODEL
+    MODEL_REGISTRY_DIR: Optional[str] = None
+    # How often each worker checks the registry for a model activated elsewhere (0 = never)
+    MODEL_REGISTRY_POLL_SECONDS: float = 10.0
+    # Shadow-scoring batches allowed to queue before new ones are dropped
+    SHADOW_MAX_PENDING: int = 4
+    # Training dataset, only read at startup as a last-resort schema source
+    DATASET: Optional[str] = None
+    # Historical crop_yield.csv; when set, predictions report where they fall
+    # among past yields of the same crop and season (see core/baselines)
+    BASELINE_DATASET: Optional[str] = None
+    # Annual rainfall lookups (see core/enrichment/rainfall.py): "dataset",
+    # "stub" or "package.module:factory". Off when unset, or for "dataset"
+    # when neither RAINFALL_DATASET nor BASELINE_DATASET is set
+    RAINFALL_PROVIDER: Optional[str] = "dataset"
+    # crop_yield.csv-style file for the dataset provider; defaults to BASELINE_DATASET
+    RAINFALL_DATASET: Optional[str] = None
+    RAINFALL_CACHE_SIZE: int = 10000
+    RAINFALL_CACHE_TTL_SECONDS: float = 86400.0
+
+    # Maintain the yield_summary rollup on every crop write and serve
+    # /api/analytics from it. After running with this off, rebuild it with
+    # `python -m core.db.summary rebuild` before turning it back on.
+    YIELD_SUMMARY_ENABLED: bool = True
+
+    # Largest page /api/crops/list will return
+    CROPS_LIST_MAX_LIMIT: int = 1000
+
+    # Documents fetched per cursor batch by /api/crops/export
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Bulk ingestion: rows per insert_many and per-row errors reported
+    BULK_INGEST_CHUNK_SIZE: int = 1000
+    BULK_INGEST_MAX_ERRORS: int = 1000
+
+    # Batch prediction limits
+    PREDICT_BATCH_MAX_ITEMS: int = 10000
+    PREDICT_BATCH_CHUNK_SIZE: int = 1024
+
+    # Inference pool: "thread" (one model shared by the threads) or "process"
+    # (model preloaded in each worker; the API process loads it once to
+    # validate it, then keeps only the schema). Process mode holds one copy
+    # per worker, so pair it with a flat forest (core/prediction/convert.py),
+    # whose memory-mapped arrays the workers share through the page cache.
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_WORKERS: int = 2
+    # Jobs allowed to wait for a worker before requests are rejected with 503
+    INFERENCE_QUEUE_DEPTH: int = 32
+
+    # Micro-batching of concurrent /api/model/predict calls
+    MICROBATCH_ENABLED: bool = True
+    MICROBATCH_MAX_SIZE: int = 64
+    MICROBATCH_MAX_WAIT_MS: float = 5.0
+
+    # Prediction cache keyed by encoded feature vector + model version
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_SIZE: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 3600.0
+    # Write cache entries through to Mongo so they survive restarts
+    PREDICTION_CACHE_PERSIST: bool = False
+
+    # Request timing middleware and the Prometheus-style /metrics endpoint
+    METRICS_ENABLED: bool = True
+    # Add a Server-Timing header with the spans (Mongo calls, inference) of each response
+    METRICS_SERVER_TIMING: bool = True
+    # Allow the sampling profiler to be started from /api/admin/profiler
+    PROFILER_ENABLED: bool = False
 
     ALLOW_ORIGINS: list[str] = ["*"]
     ALLOW_CREDENTIALS: bool = True
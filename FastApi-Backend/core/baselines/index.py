@@ -0,0 +1,171 @@
+import csv
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.prediction.predict import normalize_category
+
+logger = logging.getLogger(__name__)
+
+# (crop, season, state) after normalize_category; state None is every state
+GroupKey = Tuple[str, str, Optional[str]]
+
+
+def _group_bounds(sorted_codes: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end offsets of the runs of equal keys in lexsorted code columns.
+    """
+    size = len(sorted_codes[0])
+    changed = np.zeros(size, dtype=bool)
+    changed[0] = True
+    for codes in sorted_codes:
+        changed[1:] |= codes[1:] != codes[:-1]
+    starts = np.flatnonzero(changed)
+    ends = np.append(starts[1:], size)
+    return starts, ends
+
+
+class BaselineIndex:
+    """
+    Historical yields from crop_yield.csv, grouped by crop + season + state
+    and by crop + season over all states.
+
+    Every group is a contiguous ascending slice of one float64 array, so the
+    share of history below a predicted yield is a binary search, and group
+    means and medians are precomputed when the index is built.
+    """
+
+    def __init__(self, crops: Sequence[str], seasons: Sequence[str], states: Sequence[str], yields: Sequence[float]):
+        crop_labels, crop_codes = np.unique([normalize_category(crop) for crop in crops], return_inverse=True)
+        season_labels, season_codes = np.unique([normalize_category(season) for season in seasons], return_inverse=True)
+        state_labels, state_codes = np.unique([normalize_category(state) for state in states], return_inverse=True)
+        yields = np.asarray(yields, dtype=np.float64)
+        self.records = len(yields)
+
+        slices, keys = [], []
+        # Per-state groups first, then the same records grouped over all states
+        for codes in ((crop_codes, season_codes, state_codes), (crop_codes, season_codes)):
+            order = np.lexsort((yields,) + tuple(reversed(codes)))
+            sorted_codes = [column[order] for column in codes]
+            starts, ends = _group_bounds(sorted_codes)
+            offset = sum(len(part) for part in slices)
+            slices.append(yields[order])
+            for start, end in zip(starts, ends):
+                crop, season = crop_labels[sorted_codes[0][start]], season_labels[sorted_codes[1][start]]
+                state = state_labels[sorted_codes[2][start]] if len(codes) == 3 else None
+                keys.append(((str(crop), str(season), None if state is None else str(state)),
+                             offset + start, offset + end))
+
+        self.values = np.concatenate(slices) if slices else np.empty(0)
+        self.starts = np.array([start for _, start, _ in keys], dtype=np.int64)
+        self.ends = np.array([end for _, _, end in keys], dtype=np.int64)
+        counts = self.ends - self.starts
+        self.means = np.add.reduceat(self.values, self.starts) / counts if len(keys) else np.empty(0)
+        self.medians = (self.values[self.starts + (counts - 1) // 2] + self.values[self.starts + counts // 2]) / 2
+        self.keys: List[GroupKey] = [key for key, _, _ in keys]
+        self.groups: Dict[GroupKey, int] = {key: i for i, key in enumerate(self.keys)}
+        # Reported with each context: the state as spelled in the file
+        self.state_names = {normalize_category(state): state.strip() for state in states}
+
+    @classmethod
+    def from_csv(cls, path: str) -> "BaselineIndex":
+        """
+        Read Crop, Season, State and Yield from crop_yield.csv; rows without a
+        finite yield are skipped.
+        """
+        crops, seasons, states, yields = [], [], [], []
+        skipped = 0
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for record in csv.DictReader(f):
+                try:
+                    value = float(record["Yield"])
+                    crop, season, state = record["Crop"], record["Season"], record["State"]
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if not np.isfinite(value) or crop is None or season is None or state is None:
+                    skipped += 1
+                    continue
+                crops.append(crop)
+                seasons.append(season)
+                states.append(state)
+                yields.append(value)
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable rows in {path}")
+        if not yields:
+            raise ValueError(f"No usable rows in {path}")
+        index = cls(crops, seasons, states, yields)
+        logger.info(f"Loaded {index.records} historical yields in {len(index.groups)} baseline groups from {path}")
+        return index
+
+    def find(self, crop: str, season: str, state: Optional[str] = None) -> Optional[int]:
+        """
+        Group for a crop and season, narrowed to the state when it has history
+        there. None if the crop was never grown in that season.
+        """
+        crop, season = normalize_category(crop), normalize_category(season)
+        if state:
+            group = self.groups.get((crop, season, normalize_category(state)))
+            if group is not None:
+                return group
+        return self.groups.get((crop, season, None))
+
+    def percentiles(self, group: int, predicted: np.ndarray) -> np.ndarray:
+        """
+        Percent of the group's history below each predicted yield, with ties
+        counting half.
+        """
+        history = self.values[self.starts[group]:self.ends[group]]
+        below = np.searchsorted(history, predicted, side="left")
+        at_or_below = np.searchsorted(history, predicted, side="right")
+        return (below + at_or_below) * 50.0 / len(history)
+
+    def context_many(
+        self,
+        crops: Sequence[str],
+        seasons: Sequence[str],
+        predicted: Sequence[float],
+        state: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Historical context for many predictions: one binary search per group
+        over all the predictions that fall in it.
+        """
+        predicted = np.asarray(predicted, dtype=np.float64)
+        by_group: Dict[int, List[int]] = {}
+        for position, (crop, season) in enumerate(zip(crops, seasons)):
+            group = self.find(crop, season, state)
+            if group is not None:
+                by_group.setdefault(group, []).append(position)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(predicted)
+        for group, positions in by_group.items():
+            group_state = self.keys[group][2]
+            shared = {
+                "state": self.state_names.get(group_state) if group_state else None,
+                "records": int(self.ends[group] - self.starts[group]),
+                "mean_yield": float(self.means[group]),
+                "median_yield": float(self.medians[group]),
+            }
+            for position, percentile in zip(positions, self.percentiles(group, predicted[positions])):
+                results[position] = {"percentile": float(percentile), **shared}
+        return results
+
+    def context(self, crop: str, season: str, predicted: float, state: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self.context_many([crop], [season], [predicted], state)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"records": self.records, "groups": len(self.groups)}
+
+
+_index: Optional[BaselineIndex] = None
+
+
+def set_baseline_index(index: Optional[BaselineIndex]) -> None:
+    global _index
+    _index = index
+
+
+def get_baseline_index() -> Optional[BaselineIndex]:
+    return _index
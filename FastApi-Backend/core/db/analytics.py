@@ -0,0 +1,290 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+# Fields the yield rollup can group by, and the document field each one groups on.
+# crop_name groups on the normalized name so "Rice" and "rice " fall together.
+YIELD_GROUP_FIELDS = {
+    "crop_name": "$crop_name_lower",
+    "season": "$season",
+    "crop_year": "$crop_year",
+}
+
+FERTILIZER_FIELDS = {
+    "total": {"$add": ["$fertilizer_n", "$fertilizer_p", "$fertilizer_k"]},
+    "n": "$fertilizer_n",
+    "p": "$fertilizer_p",
+    "k": "$fertilizer_k",
+}
+
+INPUT_FIELDS = ("annual_rainfall", "fertilizer_n", "fertilizer_p", "fertilizer_k", "pesticide")
+
+HAS_PREDICTION = {"$gt": ["$predicted_yield", None]}
+
+
+def _flatten_group(keys: Sequence[str]) -> Dict[str, Any]:
+    """
+    $project stage that lifts compound _id keys to top-level fields.
+    """
+    projection: Dict[str, Any] = {"_id": 0}
+    for key in keys:
+        projection[key] = f"$_id.{key}"
+    return projection
+
+
+def yield_by_pipeline(match: Dict[str, Any], group_by: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Mean/min/max predicted yield per combination of ``group_by`` fields.
+    """
+    group: Dict[str, Any] = {
+        "_id": {key: YIELD_GROUP_FIELDS[key] for key in group_by},
+        "count": {"$sum": 1},
+        "mean_yield": {"$avg": "$predicted_yield"},
+        "min_yield": {"$min": "$predicted_yield"},
+        "max_yield": {"$max": "$predicted_yield"},
+    }
+    if "crop_name" in group_by:
+        group["display_name"] = {"$first": "$crop_name"}
+
+    projection = _flatten_group(group_by)
+    if "crop_name" in group_by:
+        projection["crop_name"] = "$display_name"
+    projection.update({"count": 1, "mean_yield": 1, "min_yield": 1, "max_yield": 1})
+
+    return [
+        {"$match": {**match, "predicted_yield": {"$ne": None}}},
+        {"$group": group},
+        {"$sort": {f"_id.{key}": 1 for key in group_by}},
+        {"$project": projection},
+    ]
+
+
+def crop_counts_pipeline(match: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": match},
+        {"$group": {"_id": "$crop_name_lower", "crop_name": {"$first": "$crop_name"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "crop_name": 1, "count": 1}},
+    ]
+    if limit:
+        pipeline.insert(3, {"$limit": limit})
+    return pipeline
+
+
+def yearly_inputs_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Per-year means of the model inputs, plus mean predicted yield where present.
+    """
+    group: Dict[str, Any] = {"_id": "$crop_year", "count": {"$sum": 1}}
+    for field in INPUT_FIELDS:
+        group[field] = {"$avg": f"${field}"}
+    group["mean_yield"] = {"$avg": "$predicted_yield"}
+    return [
+        {"$match": match},
+        {"$group": group},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "crop_year": "$_id", "count": 1, "mean_yield": 1,
+                      **{field: 1 for field in INPUT_FIELDS}}},
+    ]
+
+
+def fertilizer_range_pipeline(match: Dict[str, Any], field: str) -> List[Dict[str, Any]]:
+    value = FERTILIZER_FIELDS[field]
+    return [
+        {"$match": match},
+        {"$group": {"_id": None, "min": {"$min": value}, "max": {"$max": value}}},
+    ]
+
+
+def histogram_boundaries(minimum: float, maximum: float, bins: int) -> List[float]:
+    """
+    ``bins`` equal-width buckets covering [minimum, maximum]; $bucket upper
+    bounds are exclusive, so the last edge is nudged past the maximum.
+    """
+    if maximum <= minimum:
+        return [minimum, minimum + 1]
+    width = (maximum - minimum) / bins
+    edges = [minimum + i * width for i in range(bins)]
+    edges.append(maximum + max(abs(maximum) * 1e-9, 1e-9))
+    return edges
+
+
+def fertilizer_histogram_pipeline(match: Dict[str, Any], field: str, boundaries: List[float]) -> List[Dict[str, Any]]:
+    """
+    Crop count, mean fertilizer and mean predicted yield per fertilizer bucket.
+    """
+    value = FERTILIZER_FIELDS[field]
+    return [
+        {"$match": match},
+        {"$bucket": {
+            "groupBy": value,
+            "boundaries": boundaries,
+            "default": "out_of_range",
+            "output": {
+                "count": {"$sum": 1},
+                "mean_fertilizer": {"$avg": value},
+                "mean_yield": {"$avg": "$predicted_yield"},
+                "predicted": {"$sum": {"$cond": [HAS_PREDICTION, 1, 0]}},
+            },
+        }},
+    ]
+
+
+def tag_rollup_pipeline(match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    return [
+        {"$match": {**match, "tags.0": {"$exists": True}}},
+        {"$unwind": "$tags"},
+        {"$group": {
+            "_id": "$tags",
+            "count": {"$sum": 1},
+            "total_area": {"$sum": "$area"},
+            "mean_yield": {"$avg": "$predicted_yield"},
+            "predicted": {"$sum": {"$cond": [HAS_PREDICTION, 1, 0]}},
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "tag": "$_id", "count": 1, "total_area": 1, "mean_yield": 1, "predicted": 1}},
+    ]
+
+
+def summary_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": 1},
+            "predicted": {"$sum": {"$cond": [HAS_PREDICTION, 1, 0]}},
+            "mean_yield": {"$avg": "$predicted_yield"},
+            "mean_rainfall": {"$avg": "$annual_rainfall"},
+            "total_area": {"$sum": "$area"},
+            "first_year": {"$min": "$crop_year"},
+            "last_year": {"$max": "$crop_year"},
+        }},
+        {"$project": {"_id": 0}},
+    ]
+
+
+# The same rollups computed from the yield_summary groups (see core/db/summary.py)
+# instead of the crop records. Crop filter fields map onto the group key:
+SUMMARY_KEYS = {
+    "tags": "_id.tag",
+    "crop_name_lower": "_id.crop",
+    "season": "_id.season",
+    "crop_year": "_id.year",
+}
+
+SUMMARY_GROUP_FIELDS = {
+    "crop_name": "$_id.crop",
+    "season": "$_id.season",
+    "crop_year": "$_id.year",
+}
+
+
+def summary_match(match: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    yield_summary filter equivalent to a build_crop_filter result. Without a
+    tag only the all-records groups (tag null) match, so no crop counts twice.
+    """
+    translated = {SUMMARY_KEYS[field]: value for field, value in match.items()}
+    translated.setdefault("_id.tag", None)
+    return translated
+
+
+def _mean(total: str, count: str) -> Dict[str, Any]:
+    return {"$cond": [{"$gt": [count, 0]}, {"$divide": [total, count]}, None]}
+
+
+def summary_yield_by_pipeline(match: Dict[str, Any], group_by: Sequence[str]) -> List[Dict[str, Any]]:
+    group: Dict[str, Any] = {
+        "_id": {key: SUMMARY_GROUP_FIELDS[key] for key in group_by},
+        "count": {"$sum": "$n.predicted_yield"},
+        "total_yield": {"$sum": "$sum.predicted_yield"},
+        "min_yield": {"$min": "$min.predicted_yield"},
+        "max_yield": {"$max": "$max.predicted_yield"},
+    }
+    if "crop_name" in group_by:
+        group["display_name"] = {"$first": "$crop_name"}
+
+    projection = _flatten_group(group_by)
+    if "crop_name" in group_by:
+        projection["crop_name"] = "$display_name"
+    projection.update({"count": 1, "mean_yield": _mean("$total_yield", "$count"), "min_yield": 1, "max_yield": 1})
+
+    return [
+        {"$match": {**summary_match(match), "n.predicted_yield": {"$gt": 0}}},
+        {"$group": group},
+        {"$sort": {f"_id.{key}": 1 for key in group_by}},
+        {"$project": projection},
+    ]
+
+
+def summary_crop_counts_pipeline(match: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": summary_match(match)},
+        {"$group": {"_id": "$_id.crop", "crop_name": {"$first": "$crop_name"}, "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "crop_name": 1, "count": 1}},
+    ]
+    if limit:
+        pipeline.insert(3, {"$limit": limit})
+    return pipeline
+
+
+def summary_yearly_inputs_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    group: Dict[str, Any] = {"_id": "$_id.year", "count": {"$sum": "$count"}}
+    projection: Dict[str, Any] = {"_id": 0, "crop_year": "$_id", "count": 1}
+    for field in INPUT_FIELDS + ("predicted_yield",):
+        group[f"{field}_sum"] = {"$sum": f"$sum.{field}"}
+        group[f"{field}_n"] = {"$sum": f"$n.{field}"}
+    for field in INPUT_FIELDS:
+        projection[field] = _mean(f"${field}_sum", f"${field}_n")
+    projection["mean_yield"] = _mean("$predicted_yield_sum", "$predicted_yield_n")
+    return [
+        {"$match": summary_match(match)},
+        {"$group": group},
+        {"$sort": {"_id": 1}},
+        {"$project": projection},
+    ]
+
+
+def summary_tag_rollup_pipeline(match: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """
+    Per-tag rollup from the tagged groups. ``match`` must not filter on a tag:
+    the live rollup then reports the other tags of the matching records,
+    which the groups cannot reproduce.
+    """
+    return [
+        {"$match": {**summary_match(match), "_id.tag": {"$ne": None}}},
+        {"$group": {
+            "_id": "$_id.tag",
+            "count": {"$sum": "$count"},
+            "total_area": {"$sum": "$sum.area"},
+            "yield_sum": {"$sum": "$sum.predicted_yield"},
+            "predicted": {"$sum": "$n.predicted_yield"},
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "tag": "$_id", "count": 1, "total_area": 1,
+                      "mean_yield": _mean("$yield_sum", "$predicted"), "predicted": 1}},
+    ]
+
+
+def summary_summary_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"$match": summary_match(match)},
+        {"$group": {
+            "_id": None,
+            "count": {"$sum": "$count"},
+            "predicted": {"$sum": "$n.predicted_yield"},
+            "yield_sum": {"$sum": "$sum.predicted_yield"},
+            "rainfall_sum": {"$sum": "$sum.annual_rainfall"},
+            "rainfall_n": {"$sum": "$n.annual_rainfall"},
+            "total_area": {"$sum": "$sum.area"},
+            "first_year": {"$min": "$_id.year"},
+            "last_year": {"$max": "$_id.year"},
+        }},
+        {"$project": {
+            "_id": 0, "count": 1, "predicted": 1,
+            "mean_yield": _mean("$yield_sum", "$predicted"),
+            "mean_rainfall": _mean("$rainfall_sum", "$rainfall_n"),
+            "total_area": 1, "first_year": 1, "last_year": 1,
+        }},
+    ]
@@ -0,0 +1,137 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """An index the application relies on."""
+    collection: str
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(list(self.keys), name=self.name, **self.options)
+
+
+@dataclass(frozen=True)
+class QueryPattern:
+    """A query shape the application issues, with representative values."""
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[Tuple[Tuple[str, int], ...]] = None
+
+
+INDEXES: List[IndexSpec] = [
+    IndexSpec("crops", "created_at_id", (("created_at", -1), ("_id", -1))),
+    IndexSpec("crops", "tags_created_at_id", (("tags", 1), ("created_at", -1), ("_id", -1))),
+    # Also serves name-only lookups and prefix searches through its crop_name_lower prefix
+    IndexSpec("crops", "crop_name_lower_season_year", (("crop_name_lower", 1), ("season", 1), ("crop_year", -1))),
+    IndexSpec("crops", "season_year", (("season", 1), ("crop_year", -1))),
+    # Year-range filters without a season, used by /api/analytics
+    IndexSpec("crops", "crop_year", (("crop_year", 1),)),
+    # Analytics read either the all-records groups (tag null) or one tag's groups
+    IndexSpec("yield_summary", "tag_year", (("_id.tag", 1), ("_id.year", 1))),
+    IndexSpec("prediction_cache", "expires_at_ttl", (("expires_at", 1),), {"expireAfterSeconds": 0}),
+]
+
+QUERY_PATTERNS: List[QueryPattern] = [
+    QueryPattern("list_newest", "crops", {}, (("created_at", -1), ("_id", -1))),
+    QueryPattern("list_by_tag", "crops", {"tags": "sample"}, (("created_at", -1), ("_id", -1))),
+    QueryPattern("tag_batch", "crops", {"tags": "sample"}),
+    # Served by the crop_name_lower prefix of crop_name_lower_season_year
+    QueryPattern("name_lookup", "crops", {"crop_name_lower": "rice"}),
+    QueryPattern("name_prefix_search", "crops", {"crop_name_lower": {"$regex": "^ri"}}),
+    QueryPattern("name_season_lookup", "crops", {"crop_name_lower": "rice", "season": "Kharif"},
+                 (("crop_year", -1),)),
+    QueryPattern("analytics_year_range", "crops", {"crop_year": {"$gte": 2000, "$lte": 2010}}),
+    QueryPattern("analytics_season_years", "crops", {"season": "Kharif", "crop_year": {"$gte": 2000}}),
+    QueryPattern("summary_groups", "yield_summary", {"_id.tag": None, "_id.year": {"$gte": 2000}}),
+]
+
+
+async def apply_indexes(db, specs: List[IndexSpec] = INDEXES) -> None:
+    """
+    Create every declared index. create_indexes is a no-op for indexes that
+    already exist with the same definition, so this is safe on every startup.
+    """
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    for collection, collection_specs in by_collection.items():
+        names = await db[collection].create_indexes([spec.to_model() for spec in collection_specs])
+        logger.info(f"Ensured indexes on {collection}: {', '.join(names)}")
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    stages = [plan]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def _explain_pattern(db, pattern: QueryPattern) -> Dict[str, Any]:
+    cursor = db[pattern.collection].find(pattern.filter)
+    if pattern.sort:
+        cursor = cursor.sort(list(pattern.sort))
+    try:
+        explanation = await cursor.explain()
+    except Exception as e:
+        return {"name": pattern.name, "collection": pattern.collection, "error": str(e)}
+
+    stages = _plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+    index_names = [stage["indexName"] for stage in stages if "indexName" in stage]
+    stage_names = [stage.get("stage") for stage in stages]
+    return {
+        "name": pattern.name,
+        "collection": pattern.collection,
+        "indexes_used": index_names,
+        "collection_scan": "COLLSCAN" in stage_names,
+        "in_memory_sort": "SORT" in stage_names,
+    }
+
+
+async def index_report(db) -> Dict[str, Any]:
+    """
+    Compare declared indexes with what exists and how it is used, and
+    explain each known query pattern to spot collection scans.
+    """
+    collections: Dict[str, Any] = {}
+    for name in sorted({spec.collection for spec in INDEXES} | {p.collection for p in QUERY_PATTERNS}):
+        declared = {spec.name for spec in INDEXES if spec.collection == name}
+        existing = set((await db[name].index_information()).keys()) - {"_id_"}
+
+        usage: Dict[str, Any] = {}
+        try:
+            async for stat in db[name].aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = {
+                    "ops": stat["accesses"]["ops"],
+                    "since": stat["accesses"]["since"].isoformat(),
+                }
+        except Exception as e:
+            logger.warning(f"$indexStats unavailable for {name}: {e}")
+
+        collections[name] = {
+            "declared": sorted(declared),
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "usage": usage,
+            "unused": sorted(index for index in declared & existing if usage.get(index, {}).get("ops") == 0),
+        }
+
+    queries = [await _explain_pattern(db, pattern) for pattern in QUERY_PATTERNS]
+    return {
+        "collections": collections,
+        "queries": queries,
+        "collection_scans": [q["name"] for q in queries if q.get("collection_scan")],
+    }
@@ -1,34 +1,327 @@
+import asyncio
 import motor.motor_asyncio
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator, Sequence
+import base64
+import json
 import logging
+import re
+import time
 from bson import ObjectId
-from datetime import datetime
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta
 
 from config import settings
 from models.database import CropModel, CropUpdateModel  
+from core.db.indexes import INDEXES, apply_indexes, index_report
+from core.db.pool import PoolMonitor
+from core.telemetry.spans import traced
+from core.db.summary import (
+    SOURCE_FIELDS, SUMMARY_COLLECTION, SummaryDelta, apply_delta, check_summary, rebuild_summary
+)
+from core.prediction.predict import MODEL_INPUT_FIELDS, normalize_category
 
 logger = logging.getLogger(__name__)
 
-# MONGO_URI=settings.mongo_
-# MongoDB setup
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING)
-db = client["FarmSight"]
-crop_collection = db["crops"]  # collection renamed
+class VersionConflict(Exception):
+    """Raised when a conditional write finds the record at a different version."""
 
-async def get_all_crops(skip: int = 0, limit: int = 100, tag_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    def __init__(self, crop_id: str, current_version: int):
+        super().__init__(f"Crop {crop_id} is at version {current_version}")
+        self.current_version = current_version
+
+
+# Stored alongside predicted_yield so repeat predictions can be skipped
+PREDICTION_STATE_FIELDS = ("prediction_fingerprint", "prediction_model_version")
+# Conditional prediction writes in flight at once when yield_summary needs each record's prior state
+PREDICTION_WRITE_CONCURRENCY = 32
+
+# MongoDB setup: populated by connect_mongo() from the app lifespan
+client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+db = None
+crop_collection = None
+prediction_cache_collection = None
+yield_summary_collection = None
+pool_monitor = PoolMonitor()
+# Set once yield_summary is known to cover every crop (see ensure_yield_summary)
+yield_summary_ready = False
+
+# Projection loading just what a record contributes to yield_summary
+SUMMARY_PROJECTION = {field: 1 for field in SOURCE_FIELDS}
+
+
+def client_options() -> Dict[str, Any]:
     """
-    Retrieve all crop prediction records.
+    Motor client keyword arguments built from Settings. Pool limits apply per
+    process, so each uvicorn worker opens up to MONGODB_MAX_POOL_SIZE connections.
+    """
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+        "event_listeners": [pool_monitor],
+    }
+    optional = {
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "compressors": settings.MONGODB_COMPRESSORS,
+    }
+    options.update({key: value for key, value in optional.items() if value is not None})
+    return options
+
+
+def create_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    return motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_CONNECTION_STRING, **client_options())
+
+
+def connect_mongo() -> None:
+    """
+    Create the shared client and bind the collection handles. Connections are
+    opened lazily by the driver, so this does not block on the server.
+    """
+    global client, db, crop_collection, prediction_cache_collection, yield_summary_collection
+    client = create_client()
+    db = client[settings.MONGODB_DATABASE]
+    crop_collection = db["crops"]  # collection renamed
+    prediction_cache_collection = db["prediction_cache"]
+    yield_summary_collection = db[SUMMARY_COLLECTION]
+    logger.info(f"MongoDB client created (maxPoolSize={settings.MONGODB_MAX_POOL_SIZE}, "
+                f"minPoolSize={settings.MONGODB_MIN_POOL_SIZE})")
+
+
+def close_mongo() -> None:
+    global client, db, crop_collection, prediction_cache_collection, yield_summary_collection, yield_summary_ready
+    if client is not None:
+        client.close()
+    client = db = crop_collection = prediction_cache_collection = yield_summary_collection = None
+    yield_summary_ready = False
+
+
+@traced()
+async def get_db_health() -> Dict[str, Any]:
+    """
+    Ping the server and report round-trip latency alongside pool occupancy.
+    """
+    if db is None:
+        raise RuntimeError("MongoDB client is not connected")
+    started = time.perf_counter()
+    await db.command("ping")
+    latency_ms = (time.perf_counter() - started) * 1000
+    return {
+        "ping_ms": round(latency_ms, 3),
+        "pool": {
+            "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+            **pool_monitor.snapshot(),
+        },
+        "read_preference": settings.MONGODB_READ_PREFERENCE,
+        "compressors": settings.MONGODB_COMPRESSORS,
+    }
+
+def encode_page_cursor(doc: Dict[str, Any]) -> str:
+    """
+    Opaque token pointing just past `doc` in (created_at, _id) descending order.
+    """
+    payload = json.dumps({"c": doc["created_at"].isoformat(), "i": str(doc["_id"])})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decode a token from encode_page_cursor; raises ValueError if it is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except Exception as e:
+        raise ValueError(f"Invalid page cursor: {token}") from e
+
+
+@traced()
+async def get_all_crops(
+    skip: int = 0,
+    limit: int = 100,
+    tag_filter: Optional[str] = None,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    fields: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve crop records newest first.
+
+    Pass `after` (from decode_page_cursor) for keyset pagination on
+    (created_at, _id), which costs the same for every page, and `fields`
+    to only load those fields from Mongo.
     """
     filter_query = {}
     if tag_filter:
         filter_query["tags"] = tag_filter
+    if after:
+        created_at, last_id = after
+        filter_query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    projection = None
+    if fields:
+        # The sort keys are always needed to build the next cursor
+        projection = {field: 1 for field in fields}
+        projection["created_at"] = 1
     try:
-        cursor = crop_collection.find(filter_query).skip(skip).limit(limit).sort("created_at", -1)
+        cursor = crop_collection.find(filter_query, projection).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).skip(skip).limit(limit)
         return [doc async for doc in cursor]
     except Exception as e:
         logger.error(f"Database query failed: {e}")
         return []
 
+def build_crop_filter(
+    tag: Optional[str] = None,
+    crop_name: Optional[str] = None,
+    season: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Mongo filter for the common crop filters.
+    """
+    filter_query: Dict[str, Any] = {}
+    if tag:
+        filter_query["tags"] = tag
+    if crop_name:
+        filter_query["crop_name_lower"] = normalize_crop_name(crop_name)
+    if season:
+        filter_query["season"] = season
+    if year_from is not None or year_to is not None:
+        filter_query["crop_year"] = {}
+        if year_from is not None:
+            filter_query["crop_year"]["$gte"] = year_from
+        if year_to is not None:
+            filter_query["crop_year"]["$lte"] = year_to
+    return filter_query
+
+
+async def iter_crop_batches(
+    filter_query: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield matching crop records in lists of up to `batch_size`, streaming from one cursor.
+    """
+    projection = {field: 1 for field in fields} if fields else None
+    cursor = crop_collection.find(filter_query, projection).sort("_id", 1).batch_size(batch_size)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@traced()
+async def aggregate_crops(pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run an aggregation over crops and return its (pre-aggregated, small) result.
+    """
+    return await crop_collection.aggregate(pipeline).to_list(length=None)
+
+
+@traced()
+async def aggregate_yield_summary(pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run an aggregation over the yield_summary groups.
+    """
+    return await yield_summary_collection.aggregate(pipeline).to_list(length=None)
+
+
+def yield_summary_available() -> bool:
+    return settings.YIELD_SUMMARY_ENABLED and yield_summary_ready
+
+
+@traced()
+async def _update_yield_summary(
+    removed: Sequence[Dict[str, Any]] = (),
+    added: Sequence[Dict[str, Any]] = ()
+) -> None:
+    """
+    Fold crop writes into yield_summary: `removed` as the records were before
+    the write, `added` as they are after it. The crop write has already
+    happened, so a failure here is logged for check_yield_summary to find
+    rather than failing the request.
+    """
+    if not settings.YIELD_SUMMARY_ENABLED:
+        return
+    delta = SummaryDelta()
+    for doc in removed:
+        delta.remove(doc)
+    for doc in added:
+        delta.add(doc)
+    try:
+        await apply_delta(crop_collection, yield_summary_collection, delta)
+    except Exception as e:
+        logger.error(f"Failed to update {SUMMARY_COLLECTION}: {e}", exc_info=True)
+
+
+@traced()
+async def rebuild_yield_summary() -> int:
+    """
+    Recompute yield_summary from crops; returns the number of groups.
+    """
+    global yield_summary_ready
+    groups = await rebuild_summary(db, batch_size=settings.EXPORT_BATCH_SIZE)
+    # The rename replaced the collection and its indexes
+    await apply_indexes(db, [spec for spec in INDEXES if spec.collection == SUMMARY_COLLECTION])
+    yield_summary_ready = True
+    return groups
+
+
+@traced()
+async def check_yield_summary(tolerance: float = 1e-6) -> Dict[str, Any]:
+    """
+    Compare yield_summary with a fresh recomputation from crops.
+    """
+    return await check_summary(db, tolerance=tolerance, batch_size=settings.EXPORT_BATCH_SIZE)
+
+
+@traced()
+async def ensure_yield_summary() -> None:
+    """
+    Build yield_summary if it has never been built (crops but no groups).
+    Until this finishes, analytics read crops directly.
+    """
+    global yield_summary_ready
+    try:
+        if (await yield_summary_collection.estimated_document_count() == 0
+                and await crop_collection.estimated_document_count() > 0):
+            logger.info(f"{SUMMARY_COLLECTION} is empty, rebuilding from crops")
+            await rebuild_yield_summary()
+        yield_summary_ready = True
+    except Exception as e:
+        logger.error(f"Could not build {SUMMARY_COLLECTION}, analytics will read crops: {e}", exc_info=True)
+
+
+@traced()
+async def ensure_indexes() -> None:
+    """
+    Apply the declared index registry (see core/db/indexes.py).
+    """
+    await apply_indexes(db)
+
+
+@traced()
+async def get_index_report() -> Dict[str, Any]:
+    """
+    Report declared vs existing indexes, their usage and query plans.
+    """
+    return await index_report(db)
+
+@traced()
 async def get_crop_by_id(crop_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a crop record by its MongoDB ID.
@@ -39,51 +332,316 @@ async def get_crop_by_id(crop_id: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Error retrieving crop by ID: {e}")
         return None
 
-async def get_crop_by_name(name: str):
+@traced()
+async def get_crops_by_ids(crop_ids: List[ObjectId]) -> List[Dict[str, Any]]:
     """
-    Get a crop record by name.
+    Get many crop records in a single round trip.
     """
-    crops_cursor = crop_collection.find({
-        "crop_name": {"$regex": f"^{name}$", "$options": "i"}
-    })
-    return await crops_cursor.to_list(length=100)
+    if not crop_ids:
+        return []
+    cursor = crop_collection.find({"_id": {"$in": crop_ids}})
+    return await cursor.to_list(length=len(crop_ids))
 
 
-async def create_crop(crop_data: CropModel) -> Dict[str, Any]:
+async def iter_crops_by_tag(
+    tag: str,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[List[Dict[str, Any]]]:
     """
-    Create a new crop record.
+    Yield crop records carrying the given tag newest first, in lists of up
+    to `batch_size`, streaming from one cursor. Pass `after` (from
+    decode_page_cursor) to resume just past a previous record.
+    """
+    filter_query: Dict[str, Any] = {"tags": tag}
+    if after:
+        created_at, last_id = after
+        filter_query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    cursor = crop_collection.find(filter_query).sort(
+        [("created_at", -1), ("_id", -1)]
+    ).batch_size(batch_size)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def normalize_crop_name(name: str) -> str:
+    """
+    Value stored in crop_name_lower; lookups compare against this exactly.
+    """
+    return normalize_category(name)
+
+
+@traced()
+async def get_crop_by_name(name: str, limit: int = 100):
+    """
+    Get crop records by name (case-insensitive exact match on crop_name_lower).
+    """
+    crops_cursor = crop_collection.find({"crop_name_lower": normalize_crop_name(name)})
+    return await crops_cursor.to_list(length=limit)
+
+
+@traced()
+async def search_crop_names(prefix: str, limit: int = 20) -> List[str]:
+    """
+    Distinct crop names starting with `prefix`, for autocomplete.
+    """
+    # An anchored, case-sensitive regex on the normalized field is an index range scan
+    pattern = "^" + re.escape(normalize_crop_name(prefix))
+    cursor = crop_collection.aggregate([
+        {"$match": {"crop_name_lower": {"$regex": pattern}}},
+        {"$group": {"_id": "$crop_name_lower", "crop_name": {"$first": "$crop_name"}}},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit}
+    ])
+    return [doc["crop_name"] async for doc in cursor]
+
+
+@traced()
+async def backfill_crop_name_lower(batch_size: int = 1000) -> int:
+    """
+    Populate crop_name_lower on records created before it existed.
+    """
+    updated = 0
+    operations = []
+    cursor = crop_collection.find({"crop_name_lower": {"$exists": False}}, {"crop_name": 1})
+    async for doc in cursor:
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"crop_name_lower": normalize_crop_name(doc.get("crop_name", ""))}}
+        ))
+        if len(operations) >= batch_size:
+            updated += (await crop_collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await crop_collection.bulk_write(operations, ordered=False)).modified_count
+    if updated:
+        logger.info(f"Backfilled crop_name_lower on {updated} crops")
+    return updated
+
+
+def crop_document(crop_data: CropModel) -> Dict[str, Any]:
+    """
+    Build the document stored for a new crop record.
     """
     crop_dict = {k: v for k, v in crop_data.dict(by_alias=True).items() if v is not None}
+    crop_dict["crop_name_lower"] = normalize_crop_name(crop_dict["crop_name"])
     crop_dict["created_at"] = datetime.utcnow()
-    result = await crop_collection.insert_one(crop_dict)
-    return await get_crop_by_id(result.inserted_id)
+    crop_dict["version"] = 1
+    return crop_dict
+
+
+@traced()
+async def create_crop(crop_data: CropModel) -> Dict[str, Any]:
+    """
+    Create a new crop record.
+    """
+    crop_dict = crop_document(crop_data)
+    await crop_collection.insert_one(crop_dict)
+    await _update_yield_summary(added=[crop_dict])
+    # The inserted document is exactly what we built; no need to read it back
+    return crop_dict
 
 
-async def update_crop(crop_id: str, update_data: CropUpdateModel) -> Optional[Dict[str, Any]]:
+@traced()
+async def insert_crops(documents: List[Dict[str, Any]]) -> Tuple[int, Dict[int, str]]:
     """
-    Update an existing crop record.
+    Insert prepared crop documents with one unordered insert_many.
+
+    Returns the number inserted and a mapping of failed positions to errors.
     """
+    if not documents:
+        return 0, {}
     try:
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updated_at"] = datetime.utcnow()
+        result = await crop_collection.insert_many(documents, ordered=False)
+        inserted, errors = len(result.inserted_ids), {}
+    except BulkWriteError as e:
+        details = e.details or {}
+        errors = {err["index"]: err.get("errmsg", "write error") for err in details.get("writeErrors", [])}
+        inserted = details.get("nInserted", len(documents) - len(errors))
+    await _update_yield_summary(added=[doc for i, doc in enumerate(documents) if i not in errors])
+    return inserted, errors
 
-        if update_dict:
-            await crop_collection.update_one(
-                {"_id": ObjectId(crop_id)},
-                {"$set": update_dict}
-            )
-        return await get_crop_by_id(crop_id)
-    except Exception as e:
-        logger.error(f"Error updating crop: {e}")
+
+def _version_filter(crop_id: ObjectId, expected_version: Optional[int]) -> Dict[str, Any]:
+    filter_query: Dict[str, Any] = {"_id": crop_id}
+    if expected_version is not None:
+        # Records created before versioning have no version field and count as 0
+        filter_query["version"] = expected_version if expected_version else {"$in": [0, None]}
+    return filter_query
+
+
+@traced()
+async def _raise_if_conflict(crop_id: ObjectId, expected_version: Optional[int]) -> None:
+    # Only reached when a conditional write matched nothing: tell 404 from 412
+    if expected_version is None:
+        return
+    current = await crop_collection.find_one({"_id": crop_id}, {"version": 1})
+    if current is not None:
+        raise VersionConflict(str(crop_id), current.get("version", 0))
+
+
+@traced()
+async def update_crop(
+    crop_id: str,
+    update_data: CropUpdateModel,
+    expected_version: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Update an existing crop record in one round trip and return it.
+
+    Returns None if the record does not exist. With `expected_version` the
+    update only applies at that version, otherwise VersionConflict is raised.
+    Raises InvalidId for a malformed ID.
+    """
+    object_id = ObjectId(crop_id)
+    update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
+    update_dict["updated_at"] = datetime.utcnow()
+    if "crop_name" in update_dict:
+        update_dict["crop_name_lower"] = normalize_crop_name(update_dict["crop_name"])
+
+    # A stored prediction is stale once any model input changes
+    unset_fields = {}
+    if "predicted_yield" in update_dict:
+        unset_fields = {field: "" for field in PREDICTION_STATE_FIELDS}
+    elif any(field in update_dict for field in MODEL_INPUT_FIELDS):
+        unset_fields = {field: "" for field in ("predicted_yield",) + PREDICTION_STATE_FIELDS}
+
+    update_ops = {"$set": update_dict, "$inc": {"version": 1}}
+    if unset_fields:
+        update_ops["$unset"] = unset_fields
+
+    # Read the record as it was so yield_summary can move it between groups;
+    # applying the same operators to it gives the stored result
+    previous = await crop_collection.find_one_and_update(
+        _version_filter(object_id, expected_version),
+        update_ops,
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        await _raise_if_conflict(object_id, expected_version)
         return None
+    updated = {**previous, **update_dict, "version": previous.get("version", 0) + 1}
+    for field in unset_fields:
+        updated.pop(field, None)
+    await _update_yield_summary(removed=[previous], added=[updated])
+    return updated
 
-async def delete_crop(crop_id: str) -> bool:
+@traced()
+async def delete_crop(crop_id: str, expected_version: Optional[int] = None) -> bool:
     """
-    Delete a crop record.
+    Delete a crop record; returns False if it does not exist.
+
+    With `expected_version` the delete only applies at that version,
+    otherwise VersionConflict is raised. Raises InvalidId for a malformed ID.
     """
-    try:
-        result = await crop_collection.delete_one({"_id": ObjectId(crop_id)})
-        return result.deleted_count > 0
-    except Exception as e:
-        logger.error(f"Error deleting crop: {e}")
+    object_id = ObjectId(crop_id)
+    deleted = await crop_collection.find_one_and_delete(
+        _version_filter(object_id, expected_version), projection=SUMMARY_PROJECTION
+    )
+    if deleted is None:
+        await _raise_if_conflict(object_id, expected_version)
+        return False
+    await _update_yield_summary(removed=[deleted])
+    return True
+
+@traced()
+async def set_crop_prediction(crop_id: ObjectId, prediction: Dict[str, Any], expected_version: int) -> bool:
+    """
+    Store a prediction (value, input fingerprint, model version) on a crop record.
+
+    Only applies while the record is still at `expected_version`, the version
+    the prediction was computed from; returns False when it was changed or
+    deleted in the meantime and nothing was stored. The stored representation
+    changes, so the version (and ETag) is bumped like any other write.
+    """
+    previous = await crop_collection.find_one_and_update(
+        _version_filter(crop_id, expected_version), {"$set": prediction, "$inc": {"version": 1}},
+        projection=SUMMARY_PROJECTION, return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
         return False
+    await _update_yield_summary(removed=[previous], added=[{**previous, **prediction}])
+    return True
+
+
+@traced()
+async def bulk_set_predictions(
+    predictions: Dict[ObjectId, Dict[str, Any]],
+    expected_versions: Dict[ObjectId, int]
+) -> int:
+    """
+    Store predictions on many crop records with one unordered bulk write.
+
+    Each write only applies while its record is still at the version in
+    `expected_versions`, and bumps it; returns how many were stored.
+
+    A bulk write cannot say which records it matched, so while yield_summary
+    is maintained each record is written with its own find_one_and_update,
+    which returns exactly what that write replaced, a bounded number at a time.
+    """
+    if not predictions:
+        return 0
+    if not settings.YIELD_SUMMARY_ENABLED:
+        operations = [
+            UpdateOne(_version_filter(crop_id, expected_versions[crop_id]),
+                      {"$set": prediction, "$inc": {"version": 1}})
+            for crop_id, prediction in predictions.items()
+        ]
+        result = await crop_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    semaphore = asyncio.Semaphore(PREDICTION_WRITE_CONCURRENCY)
+
+    async def write(crop_id: ObjectId, prediction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await crop_collection.find_one_and_update(
+                _version_filter(crop_id, expected_versions[crop_id]),
+                {"$set": prediction, "$inc": {"version": 1}},
+                projection=SUMMARY_PROJECTION, return_document=ReturnDocument.BEFORE
+            )
+
+    written = await asyncio.gather(*(write(crop_id, prediction) for crop_id, prediction in predictions.items()))
+    previous = [doc for doc in written if doc is not None]
+    await _update_yield_summary(
+        removed=previous, added=[{**doc, **predictions[doc["_id"]]} for doc in previous]
+    )
+    return len(previous)
+
+
+@traced()
+async def get_cached_predictions(keys: List[str]) -> Dict[str, float]:
+    """
+    Fetch unexpired persisted predictions for the given cache keys.
+    """
+    cursor = prediction_cache_collection.find(
+        {"_id": {"$in": keys}, "expires_at": {"$gt": datetime.utcnow()}},
+        {"value": 1}
+    )
+    return {doc["_id"]: doc["value"] async for doc in cursor}
+
+
+@traced()
+async def store_cached_predictions(values: Dict[str, float], model_version: str, ttl_seconds: float) -> None:
+    """
+    Upsert persisted predictions keyed by their cache key.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    operations = [
+        UpdateOne(
+            {"_id": key},
+            {"$set": {"value": value, "model_version": model_version,
+                      "created_at": now, "expires_at": expires_at}},
+            upsert=True
+        )
+        for key, value in values.items()
+    ]
+    await prediction_cache_collection.bulk_write(operations, ordered=False)
@@ -0,0 +1,75 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool activity per server from pymongo's CMAP events.
+
+    pymongo does not expose pool occupancy directly, so the counters are
+    maintained here and read back by /health/db.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            "open": 0,
+            "checked_out": 0,
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        })
+
+    def _bump(self, address, **deltas: int) -> None:
+        key = "%s:%s" % address if isinstance(address, tuple) else str(address)
+        with self._lock:
+            counters = self._servers[key]
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def pool_created(self, event):
+        self._bump(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, pool_clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event.address, open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, checked_out=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, checked_out=-1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            servers = {address: dict(counters) for address, counters in self._servers.items()}
+        return {
+            "open": sum(s["open"] for s in servers.values()),
+            "checked_out": sum(s["checked_out"] for s in servers.values()),
+            "servers": servers,
+        }
@@ -0,0 +1,397 @@
+"""
+yield_summary: a materialized rollup of the crops collection keyed by crop,
+season, year and tag, kept current by the write paths in core/db/mongo.py so
+dashboard reads cost O(groups) instead of O(documents).
+
+Every crop contributes to one group with tag None (all records) and to one
+group per tag it carries. A group holds the record count and, for each of
+SUMMARY_FIELDS, the number of numeric values with their sum, min and max:
+
+    {"_id": {"crop": "rice", "season": "Kharif", "year": 2004, "tag": None},
+     "crop_name": "Rice", "count": 12,
+     "n": {"area": 12, ...}, "sum": {...}, "min": {...}, "max": {...}}
+
+Counts and sums move with $inc. $min/$max can only widen a range, so when a
+value that may have been a group's extreme leaves it, that group's extremes
+are recomputed from its crops.
+
+    python -m core.db.summary rebuild
+    python -m core.db.summary check [--repair]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from core.prediction.predict import normalize_category
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLLECTION = "yield_summary"
+# Rebuilds are written here and renamed over SUMMARY_COLLECTION
+STAGING_COLLECTION = "yield_summary_rebuild"
+
+SUMMARY_FIELDS = (
+    "area", "annual_rainfall", "fertilizer_n", "fertilizer_p", "fertilizer_k", "pesticide", "predicted_yield",
+)
+# Crop fields a record's contribution depends on
+SOURCE_FIELDS = ("crop_name", "crop_name_lower", "season", "crop_year", "tags") + SUMMARY_FIELDS
+
+# (crop, season, year, tag)
+GroupKey = Tuple[Any, Any, Any, Any]
+
+
+def group_id(key: GroupKey) -> Dict[str, Any]:
+    # Always built in this key order: embedded _id documents compare field by field
+    crop, season, year, tag = key
+    return {"crop": crop, "season": season, "year": year, "tag": tag}
+
+
+def group_key(_id: Dict[str, Any]) -> GroupKey:
+    return _id.get("crop"), _id.get("season"), _id.get("year"), _id.get("tag")
+
+
+def group_keys(doc: Dict[str, Any]) -> List[GroupKey]:
+    """
+    The groups a crop record counts towards.
+    """
+    crop = doc.get("crop_name_lower")
+    if crop is None and doc.get("crop_name") is not None:
+        crop = normalize_category(doc["crop_name"])
+    base = (crop, doc.get("season"), doc.get("crop_year"))
+    tags = [tag for tag in dict.fromkeys(doc.get("tags") or []) if tag is not None]
+    return [base + (None,)] + [base + (tag,) for tag in tags]
+
+
+def field_values(doc: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Numeric SUMMARY_FIELDS of a record; missing and null values are skipped,
+    as $sum/$avg/$min/$max skip them.
+    """
+    values = {}
+    for field in SUMMARY_FIELDS:
+        value = doc.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value):
+            values[field] = float(value)
+    return values
+
+
+class _Group:
+    __slots__ = ("crop_name", "count", "n", "sum", "min", "max")
+
+    def __init__(self, crop_name: Optional[str]):
+        self.crop_name = crop_name
+        self.count = 0
+        self.n: Dict[str, int] = {}
+        self.sum: Dict[str, float] = {}
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+
+    def add(self, values: Dict[str, float]) -> None:
+        self.count += 1
+        for field, value in values.items():
+            self.n[field] = self.n.get(field, 0) + 1
+            self.sum[field] = self.sum.get(field, 0.0) + value
+            self.min[field] = min(self.min.get(field, value), value)
+            self.max[field] = max(self.max.get(field, value), value)
+
+
+class SummaryBuilder:
+    """
+    Summary groups computed from scratch, for rebuilds and consistency checks.
+    """
+
+    def __init__(self):
+        self.groups: Dict[GroupKey, _Group] = {}
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        values = field_values(doc)
+        for key in group_keys(doc):
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = _Group(doc.get("crop_name"))
+            group.add(values)
+
+    def documents(self) -> List[Dict[str, Any]]:
+        return [
+            {"_id": group_id(key), "crop_name": group.crop_name, "count": group.count,
+             "n": group.n, "sum": group.sum, "min": group.min, "max": group.max}
+            for key, group in self.groups.items()
+        ]
+
+
+class _Change:
+    __slots__ = ("crop_name", "count", "added", "removed")
+
+    def __init__(self, crop_name: Optional[str]):
+        self.crop_name = crop_name
+        self.count = 0
+        self.added: Dict[str, List[float]] = {}
+        self.removed: Dict[str, List[float]] = {}
+
+    def net(self, field: str) -> Tuple[List[float], List[float]]:
+        # A value removed and re-added (an update that left it alone) cancels out
+        added, removed = Counter(self.added.get(field, ())), Counter(self.removed.get(field, ()))
+        return list((added - removed).elements()), list((removed - added).elements())
+
+
+class SummaryDelta:
+    """
+    Net effect of a set of crop writes on the summary: remove() the records
+    as they were before the write, add() them as they are after it.
+    """
+
+    def __init__(self):
+        self.changes: Dict[GroupKey, _Change] = {}
+
+    def _record(self, doc: Dict[str, Any], sign: int) -> None:
+        values = field_values(doc)
+        for key in group_keys(doc):
+            change = self.changes.get(key)
+            if change is None:
+                change = self.changes[key] = _Change(doc.get("crop_name"))
+            if sign > 0 and doc.get("crop_name") is not None:
+                change.crop_name = doc["crop_name"]
+            change.count += sign
+            target = change.added if sign > 0 else change.removed
+            for field, value in values.items():
+                target.setdefault(field, []).append(value)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        self._record(doc, 1)
+
+    def remove(self, doc: Dict[str, Any]) -> None:
+        self._record(doc, -1)
+
+    def plan(self) -> Tuple[List[UpdateOne], Dict[GroupKey, Dict[str, List[float]]]]:
+        """
+        Upserts applying the delta, and per group the values that left it
+        (which may have been its min or max).
+        """
+        operations, departed = [], {}
+        for key, change in self.changes.items():
+            inc: Dict[str, Any] = {}
+            lowest: Dict[str, float] = {}
+            highest: Dict[str, float] = {}
+            gone: Dict[str, List[float]] = {}
+            if change.count:
+                inc["count"] = change.count
+            for field in set(change.added) | set(change.removed):
+                added, removed = change.net(field)
+                if len(added) != len(removed):
+                    inc[f"n.{field}"] = len(added) - len(removed)
+                total = math.fsum(added) - math.fsum(removed)
+                if total:
+                    inc[f"sum.{field}"] = total
+                if added:
+                    lowest[f"min.{field}"] = min(added)
+                    highest[f"max.{field}"] = max(added)
+                if removed:
+                    gone[field] = removed
+            if not (inc or lowest or gone):
+                continue
+            update: Dict[str, Any] = {"$setOnInsert": {"crop_name": change.crop_name}}
+            if inc:
+                update["$inc"] = inc
+            if lowest:
+                update["$min"] = lowest
+                update["$max"] = highest
+            operations.append(UpdateOne({"_id": group_id(key)}, update, upsert=True))
+            if gone or change.count < 0:
+                departed[key] = gone
+        return operations, departed
+
+
+def crop_filter_for(key: GroupKey) -> Dict[str, Any]:
+    """
+    The crops belonging to a summary group.
+    """
+    crop, season, year, tag = key
+    filter_query = {"crop_name_lower": crop, "season": season, "crop_year": year}
+    if tag is not None:
+        filter_query["tags"] = tag
+    return filter_query
+
+
+async def _refresh_extrema(crops, summary, key: GroupKey, fields: List[str]) -> None:
+    group: Dict[str, Any] = {"_id": None}
+    for field in fields:
+        group[f"min_{field}"] = {"$min": f"${field}"}
+        group[f"max_{field}"] = {"$max": f"${field}"}
+    result = await crops.aggregate([{"$match": crop_filter_for(key)}, {"$group": group}]).to_list(length=1)
+    row = result[0] if result else {}
+    set_fields, unset_fields = {}, {}
+    for field in fields:
+        for bound in ("min", "max"):
+            value = row.get(f"{bound}_{field}")
+            if value is None:
+                unset_fields[f"{bound}.{field}"] = ""
+            else:
+                set_fields[f"{bound}.{field}"] = value
+    update: Dict[str, Any] = {}
+    if set_fields:
+        update["$set"] = set_fields
+    if unset_fields:
+        update["$unset"] = unset_fields
+    if update:
+        await summary.update_one({"_id": group_id(key)}, update)
+
+
+async def apply_delta(crops, summary, delta: SummaryDelta) -> None:
+    """
+    Apply a SummaryDelta: one bulk upsert, then for groups that lost values
+    one read to drop emptied groups and find extremes that need recomputing.
+    """
+    operations, departed = delta.plan()
+    if not operations:
+        return
+    await summary.bulk_write(operations, ordered=False)
+    if not departed:
+        return
+
+    emptied, stale = [], []
+    cursor = summary.find({"_id": {"$in": [group_id(key) for key in departed]}}, {"count": 1, "min": 1, "max": 1})
+    async for doc in cursor:
+        key = group_key(doc["_id"])
+        if doc.get("count", 0) <= 0:
+            emptied.append(doc["_id"])
+            continue
+        # A departed value strictly inside the stored range was not an extreme
+        mins, maxs = doc.get("min") or {}, doc.get("max") or {}
+        fields = [
+            field for field, values in departed[key].items()
+            if any(value <= mins.get(field, value) or value >= maxs.get(field, value) for value in values)
+        ]
+        if fields:
+            stale.append((key, fields))
+
+    if emptied:
+        await summary.delete_many({"_id": {"$in": emptied}, "count": {"$lte": 0}})
+    for key, fields in stale:
+        await _refresh_extrema(crops, summary, key, fields)
+
+
+async def compute_summary(crops, batch_size: int = 1000) -> SummaryBuilder:
+    builder = SummaryBuilder()
+    cursor = crops.find({}, {field: 1 for field in SOURCE_FIELDS}).batch_size(batch_size)
+    async for doc in cursor:
+        builder.add(doc)
+    return builder
+
+
+async def rebuild_summary(db, batch_size: int = 1000) -> int:
+    """
+    Recompute every group from crops into a staging collection and swap it in.
+    Returns the number of groups. Incremental updates that land while the
+    rebuild runs are lost with the old collection; run check afterwards if
+    writes were not paused.
+    """
+    documents = (await compute_summary(db["crops"], batch_size)).documents()
+    if not documents:
+        await db[SUMMARY_COLLECTION].delete_many({})
+        return 0
+    staging = db[STAGING_COLLECTION]
+    await staging.drop()
+    for start in range(0, len(documents), batch_size):
+        await staging.insert_many(documents[start:start + batch_size], ordered=False)
+    await staging.rename(SUMMARY_COLLECTION, dropTarget=True)
+    logger.info(f"Rebuilt {SUMMARY_COLLECTION} with {len(documents)} groups")
+    return len(documents)
+
+
+def _close(stored: Any, expected: Any, tolerance: float) -> bool:
+    if isinstance(stored, (int, float)) and isinstance(expected, (int, float)):
+        return math.isclose(stored, expected, rel_tol=tolerance, abs_tol=tolerance)
+    return stored == expected
+
+
+def _diff(stored: Dict[str, Any], expected: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    differences = {}
+    if stored.get("count") != expected["count"]:
+        differences["count"] = {"stored": stored.get("count"), "expected": expected["count"]}
+    for stat in ("n", "sum", "min", "max"):
+        stored_values, expected_values = stored.get(stat) or {}, expected[stat]
+        for field in set(stored_values) | set(expected_values):
+            # A sum that cancelled out to 0 may be absent on one side
+            default = 0 if stat in ("n", "sum") else None
+            have, want = stored_values.get(field, default), expected_values.get(field, default)
+            if not _close(have, want, tolerance):
+                differences[f"{stat}.{field}"] = {"stored": have, "expected": want}
+    return differences
+
+
+async def check_summary(db, tolerance: float = 1e-6, max_examples: int = 20, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Compare the stored summary with one recomputed from crops.
+    """
+    expected = {
+        group_key(doc["_id"]): doc
+        for doc in (await compute_summary(db["crops"], batch_size)).documents()
+    }
+    stored = {}
+    async for doc in db[SUMMARY_COLLECTION].find({}):
+        stored[group_key(doc["_id"])] = doc
+
+    missing = [key for key in expected if key not in stored]
+    unexpected = [key for key in stored if key not in expected]
+    mismatched = []
+    for key, doc in expected.items():
+        if key in stored:
+            differences = _diff(stored[key], doc, tolerance)
+            if differences:
+                mismatched.append((key, differences))
+
+    examples = (
+        [{"group": group_id(key), "problem": "missing"} for key in missing]
+        + [{"group": group_id(key), "problem": "unexpected"} for key in unexpected]
+        + [{"group": group_id(key), "problem": "mismatched", "fields": diff} for key, diff in mismatched]
+    )
+    return {
+        "consistent": not (missing or unexpected or mismatched),
+        "groups": len(expected),
+        "stored_groups": len(stored),
+        "missing": len(missing),
+        "unexpected": len(unexpected),
+        "mismatched": len(mismatched),
+        "examples": examples[:max_examples],
+    }
+
+
+async def _run(args) -> int:
+    from core.db import mongo
+
+    mongo.connect_mongo()
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt {await mongo.rebuild_yield_summary()} groups")
+            return 0
+        report = await mongo.check_yield_summary(tolerance=args.tolerance)
+        print(json.dumps(report, indent=2, default=str))
+        if not report["consistent"] and args.repair:
+            print(f"Repaired: rebuilt {await mongo.rebuild_yield_summary()} groups")
+            return 0
+        return 0 if report["consistent"] else 1
+    finally:
+        mongo.close_mongo()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the yield_summary collection")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recompute the summary from crops")
+    check = commands.add_parser("check", help="compare the summary with one recomputed from crops")
+    check.add_argument("--tolerance", type=float, default=1e-6, help="relative tolerance for sums and extremes")
+    check.add_argument("--repair", action="store_true", help="rebuild if the check finds differences")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import asyncio
+import csv
+import importlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.prediction.predict import normalize_category
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("dataset", "stub")
+
+# (state after normalize_category, year)
+RainfallKey = Tuple[str, int]
+# {"annual_rainfall": mm, "source": ...}, or None when the provider has no value
+Rainfall = Optional[Dict[str, Any]]
+
+
+def rainfall_key(state: str, year: int) -> RainfallKey:
+    return normalize_category(state), int(year)
+
+
+class RainfallProvider(ABC):
+    """
+    Source of annual rainfall per state and year. Implementations answer a
+    whole list of keys per call so a batch costs one upstream request.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def lookup_many(self, keys: Sequence[RainfallKey]) -> Dict[RainfallKey, Rainfall]:
+        """
+        Rainfall for each key, None where the provider has no value.
+        """
+
+
+class DatasetRainfallProvider(RainfallProvider):
+    """
+    Historical per-state rainfall from crop_yield.csv (Annual_Rainfall is
+    recorded per state and year). Years outside the data fall back to the
+    state's long-run mean, reported with source "state_mean".
+    """
+    name = "dataset"
+
+    def __init__(self, observed: Dict[RainfallKey, float]):
+        self.observed = observed
+        by_state: Dict[str, List[float]] = {}
+        for (state, _), value in observed.items():
+            by_state.setdefault(state, []).append(value)
+        self.state_means = {state: float(np.mean(values)) for state, values in by_state.items()}
+
+    @classmethod
+    def from_csv(cls, path: str) -> "DatasetRainfallProvider":
+        readings: Dict[RainfallKey, List[float]] = {}
+        skipped = 0
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for record in csv.DictReader(f):
+                try:
+                    key = rainfall_key(record["State"], int(record["Crop_Year"]))
+                    value = float(record["Annual_Rainfall"])
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if np.isfinite(value):
+                    readings.setdefault(key, []).append(value)
+        if skipped:
+            logger.warning(f"Skipped {skipped} unreadable rows in {path}")
+        if not readings:
+            raise ValueError(f"No usable rainfall rows in {path}")
+        # Every crop row of a state-year repeats the same figure; the median ignores stray ones
+        provider = cls({key: float(np.median(values)) for key, values in readings.items()})
+        logger.info(f"Loaded rainfall for {len(provider.observed)} state-years "
+                    f"({len(provider.state_means)} states) from {path}")
+        return provider
+
+    async def lookup_many(self, keys: Sequence[RainfallKey]) -> Dict[RainfallKey, Rainfall]:
+        results: Dict[RainfallKey, Rainfall] = {}
+        for key in keys:
+            if key in self.observed:
+                results[key] = {"annual_rainfall": self.observed[key], "source": "observed"}
+            elif key[0] in self.state_means:
+                results[key] = {"annual_rainfall": self.state_means[key[0]], "source": "state_mean"}
+            else:
+                results[key] = None
+        return results
+
+
+class StubRainfallProvider(RainfallProvider):
+    """
+    Fixed value for every location, for development without a dataset or
+    provider account.
+    """
+    name = "stub"
+
+    def __init__(self, annual_rainfall: float = 1200.0):
+        self.annual_rainfall = annual_rainfall
+
+    async def lookup_many(self, keys: Sequence[RainfallKey]) -> Dict[RainfallKey, Rainfall]:
+        return {key: {"annual_rainfall": self.annual_rainfall, "source": "stub"} for key in keys}
+
+
+def create_provider(spec: str, dataset_path: Optional[str] = None) -> RainfallProvider:
+    """
+    Build the provider named by RAINFALL_PROVIDER: "dataset", "stub", or
+    "package.module:factory" for a custom provider (called with no arguments).
+    """
+    if spec == "dataset":
+        if not dataset_path:
+            raise ValueError("The dataset rainfall provider needs RAINFALL_DATASET or BASELINE_DATASET")
+        return DatasetRainfallProvider.from_csv(dataset_path)
+    if spec == "stub":
+        return StubRainfallProvider()
+    if ":" in spec:
+        module_name, _, attribute = spec.partition(":")
+        provider = getattr(importlib.import_module(module_name), attribute)()
+        if not isinstance(provider, RainfallProvider):
+            raise TypeError(f"{spec} did not return a RainfallProvider")
+        return provider
+    raise ValueError(f"Unknown RAINFALL_PROVIDER '{spec}', expected one of {PROVIDERS} or module:factory")
+
+
+_MISSING = object()
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Keeps asyncio quiet when every waiter went away before a failure landed
+    if not future.cancelled():
+        future.exception()
+
+
+class RainfallService:
+    """
+    Rainfall lookups in front of a provider.
+
+    Results, including "no value", are kept in a bounded LRU cache with a
+    per-entry TTL. Concurrent lookups of the same key share one in-flight
+    provider request, and ``get_many`` sends all of its misses in a single
+    ``lookup_many`` call. Provider failures are not cached.
+    """
+
+    def __init__(self, provider: RainfallProvider, max_entries: int = 10000, ttl_seconds: float = 86400.0):
+        self.provider = provider
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[RainfallKey, Tuple[Rainfall, float]]" = OrderedDict()
+        self._in_flight: Dict[RainfallKey, asyncio.Future] = {}
+        self._tasks: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.provider_calls = 0
+        self.provider_keys = 0
+        self.provider_errors = 0
+
+    def _cached(self, key: RainfallKey):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: RainfallKey, value: Rainfall) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def _fetch(self, futures: Dict[RainfallKey, asyncio.Future]) -> None:
+        self.provider_calls += 1
+        self.provider_keys += len(futures)
+        try:
+            fetched = await self.provider.lookup_many(list(futures))
+        except Exception as e:
+            self.provider_errors += 1
+            logger.error(f"Rainfall provider {self.provider.name} failed for {len(futures)} keys: {e}")
+            for future in futures.values():
+                future.set_exception(e)
+            return
+        finally:
+            for key in futures:
+                self._in_flight.pop(key, None)
+        for key, future in futures.items():
+            value = fetched.get(key)
+            self._put(key, value)
+            future.set_result(value)
+
+    async def get_many(self, locations: Iterable[Tuple[str, int]]) -> Dict[RainfallKey, Rainfall]:
+        """
+        Rainfall for many (state, year) pairs, keyed by rainfall_key().
+        """
+        results: Dict[RainfallKey, Rainfall] = {}
+        waiting: Dict[RainfallKey, asyncio.Future] = {}
+        fetch: Dict[RainfallKey, asyncio.Future] = {}
+        loop = asyncio.get_running_loop()
+        for key in dict.fromkeys(rainfall_key(state, year) for state, year in locations):
+            value = self._cached(key)
+            if value is not _MISSING:
+                self.hits += 1
+                results[key] = value
+            elif key in self._in_flight:
+                self.coalesced += 1
+                waiting[key] = self._in_flight[key]
+            else:
+                self.misses += 1
+                future = loop.create_future()
+                future.add_done_callback(_consume_exception)
+                fetch[key] = waiting[key] = self._in_flight[key] = future
+
+        if fetch:
+            # Its own task, so a caller that goes away does not fail the others waiting on it
+            task = loop.create_task(self._fetch(fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    async def get(self, state: str, year: int) -> Rainfall:
+        return (await self.get_many([(state, year)]))[rainfall_key(state, year)]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "provider": self.provider.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "provider_calls": self.provider_calls,
+            "provider_keys": self.provider_keys,
+            "provider_errors": self.provider_errors,
+        }
+
+
+_service: Optional[RainfallService] = None
+
+
+def set_rainfall_service(service: Optional[RainfallService]) -> None:
+    global _service
+    _service = service
+
+
+def get_rainfall_service() -> Optional[RainfallService]:
+    return _service
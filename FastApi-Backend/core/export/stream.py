@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+# Exported columns, in output order
+EXPORT_FIELDS = [
+    "id", "crop_name", "crop_year", "season", "soil_type", "area", "annual_rainfall",
+    "fertilizer_n", "fertilizer_p", "fertilizer_k", "pesticide", "predicted_yield",
+    "created_at", "updated_at", "tags",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+TAG_SEPARATOR = ";"
+
+
+def export_row(doc: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    row = {}
+    for field in fields:
+        if field == "id":
+            row["id"] = str(doc["_id"])
+        elif field == "tags":
+            row["tags"] = doc.get("tags", [])
+        else:
+            row[field] = doc.get(field)
+    return row
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[Dict[str, Any]]], fields: Sequence[str]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(export_row(doc, fields), default=_json_default) + "\n" for doc in batch
+        ).encode("utf-8")
+
+
+async def csv_chunks(batches: AsyncIterator[List[Dict[str, Any]]], fields: Sequence[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for batch in batches:
+        for doc in batch:
+            row = export_row(doc, fields)
+            writer.writerow([
+                TAG_SEPARATOR.join(value) if field == "tags"
+                else value.isoformat() if isinstance(value, datetime)
+                else "" if value is None
+                else value
+                for field, value in row.items()
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in pieces."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema(pa, fields: Sequence[str]):
+    types = {
+        "id": pa.string(), "crop_name": pa.string(), "crop_year": pa.int64(),
+        "season": pa.string(), "soil_type": pa.string(), "area": pa.float64(),
+        "annual_rainfall": pa.float64(), "fertilizer_n": pa.float64(),
+        "fertilizer_p": pa.float64(), "fertilizer_k": pa.float64(),
+        "pesticide": pa.float64(), "predicted_yield": pa.float64(),
+        "created_at": pa.timestamp("ms"), "updated_at": pa.timestamp("ms"),
+        "tags": pa.list_(pa.string()),
+    }
+    return pa.schema([(field, types[field]) for field in fields])
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Arrow and Parquet export require the optional pyarrow package") from e
+    return pyarrow
+
+
+def columnar_formats_available() -> bool:
+    try:
+        _import_pyarrow()
+        return True
+    except RuntimeError:
+        return False
+
+
+async def columnar_chunks(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    fields: Sequence[str],
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    """
+    Stream an Arrow IPC stream or a Parquet file, one record batch / row group per Mongo batch.
+    """
+    pa = _import_pyarrow()
+    schema = _arrow_schema(pa, fields)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+
+    try:
+        async for batch in batches:
+            rows = [export_row(doc, fields) for doc in batch]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,123 @@
+import codecs
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models.schemas import CropCreateRequest
+
+# crop_yield.csv headers and their CropCreateRequest fields
+CROP_YIELD_ALIASES = {
+    "Crop": "crop_name",
+    "Crop_Year": "crop_year",
+    "Season": "season",
+    "Area": "area",
+    "Annual_Rainfall": "annual_rainfall",
+    "Fertilizer": "fertilizer_n",
+    "Pesticide": "pesticide",
+}
+
+# crop_yield.csv only has total fertilizer; the model sums N, P and K anyway
+ROW_DEFAULTS = {"fertilizer_p": 0.0, "fertilizer_k": 0.0}
+
+TAG_SEPARATOR = ";"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decode a byte stream into lines without buffering more than one partial line.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row_number, record dict) from a streamed CSV with a header row.
+    Quoted fields may span lines.
+    """
+    header: Optional[List[str]] = None
+    record_text = ""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        record_text += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record_text.count('"') % 2:
+            continue
+        text, record_text = record_text, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield row_number, dict(zip(header, values))
+    if record_text.strip():
+        yield row_number + 1, ValueError("Unterminated quoted field at end of input")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row_number, record dict) from a streamed newline-delimited JSON body.
+    """
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, ValueError("Each line must be a JSON object")
+            continue
+        yield row_number, record
+
+
+def record_to_crop_request(record: Dict[str, Any], defaults: Dict[str, Any]) -> CropCreateRequest:
+    """
+    Validate one ingested record, accepting CropCreateRequest field names or
+    crop_yield.csv headers. The crop_yield State column becomes a tag.
+    """
+    data = dict(ROW_DEFAULTS)
+    data.update(defaults)
+    tags: List[str] = []
+    for key, value in record.items():
+        if value is None or value == "":
+            continue
+        if key == "State":
+            tags.append(str(value).strip())
+            continue
+        if key == "tags":
+            tags.extend(value if isinstance(value, list) else
+                        [tag.strip() for tag in str(value).split(TAG_SEPARATOR) if tag.strip()])
+            continue
+        field = CROP_YIELD_ALIASES.get(key, key)
+        if field in CropCreateRequest.model_fields:
+            data[field] = value.strip() if isinstance(value, str) else value
+    data["tags"] = tags
+    return CropCreateRequest(**data)
+
+
+def describe_validation_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+        )
+    return str(error)
@@ -0,0 +1,211 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+from core.prediction.flat_forest import FlatForest, is_flat_forest
+from core.prediction.predict import FeatureEncoder
+from core.telemetry.spans import span
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = ".schema.json"
+
+
+class ModelArtifactError(RuntimeError):
+    """Raised when a model artifact cannot be loaded or disagrees with its schema."""
+
+
+@dataclass
+class ModelBundle:
+    """A fitted estimator together with the feature schema it was trained on."""
+    estimator: Any
+    columns: List[str]
+    version: str
+    encoder: FeatureEncoder = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.encoder = FeatureEncoder(self.columns)
+
+    def schema_only(self) -> "ModelBundle":
+        """
+        The same schema, encoder and version without the estimator, for a
+        process that only encodes rows and leaves predicting to its workers.
+        """
+        return ModelBundle(estimator=None, columns=self.columns, version=self.version)
+
+    def predict_rows(self, rows: Sequence[Sequence[Any]], chunk_size: Optional[int] = None) -> np.ndarray:
+        """
+        Encode rows into one matrix and predict it in chunks of ``chunk_size``.
+        """
+        if self.estimator is None:
+            raise ModelArtifactError(f"Model {self.version} is loaded without its estimator")
+        with span("encode"):
+            matrix = self.encoder.encode_many(rows)
+        if len(matrix) == 0:
+            return np.empty(0, dtype=np.float64)
+        step = chunk_size or len(matrix)
+        with span("model.predict"):
+            return np.concatenate([
+                np.asarray(self.estimator.predict(matrix[start:start + step]), dtype=np.float64).ravel()
+                for start in range(0, len(matrix), step)
+            ])
+
+
+def manifest_path_for(model_path: str) -> str:
+    root, _ = os.path.splitext(model_path)
+    return root + MANIFEST_SUFFIX
+
+
+def _file_version(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _read_manifest(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest.get("columns"), list):
+        raise ModelArtifactError(f"Schema manifest {path} has no 'columns' list")
+    return manifest
+
+
+def _read_csv_header(path: str) -> List[str]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+
+def write_manifest(bundle: ModelBundle, path: str) -> None:
+    """
+    Write the sidecar JSON schema manifest for a bundle.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": bundle.version, "columns": bundle.columns}, f, indent=2)
+
+
+def validate_bundle(bundle: ModelBundle) -> None:
+    """
+    Check that the estimator and the feature schema agree.
+    """
+    estimator = bundle.estimator
+    if not hasattr(estimator, "predict"):
+        raise ModelArtifactError(f"Model artifact {type(estimator).__name__} has no predict()")
+
+    n_features = getattr(estimator, "n_features_in_", None)
+    if n_features is not None and n_features != len(bundle.columns):
+        raise ModelArtifactError(
+            f"Model expects {n_features} features but schema has {len(bundle.columns)} columns"
+        )
+
+    fitted_names = getattr(estimator, "feature_names_in_", None)
+    if fitted_names is not None and list(fitted_names) != bundle.columns:
+        mismatched = [
+            (i, a, b) for i, (a, b) in enumerate(zip(fitted_names, bundle.columns)) if a != b
+        ]
+        raise ModelArtifactError(
+            f"Model feature names disagree with schema at positions {mismatched[:5]}"
+        )
+
+
+def load_model_bundle(
+    model_path: str,
+    schema_path: Optional[str] = None,
+    dataset_path: Optional[str] = None,
+) -> ModelBundle:
+    """
+    Load a model artifact and resolve its feature schema.
+
+    The artifact may be a plain pickled estimator, a dict with
+    ``estimator``, ``columns`` and ``version`` keys, or a flat forest
+    directory (see convert.py) whose arrays are memory-mapped. The schema is
+    taken, in order, from the artifact itself, an explicit or sidecar JSON
+    manifest, the estimator's ``feature_names_in_``, and finally the header
+    row of the training dataset.
+    """
+    try:
+        if is_flat_forest(model_path):
+            estimator, meta = FlatForest.load(model_path)
+            artifact = {"estimator": estimator, "columns": meta.get("columns"), "version": meta.get("version")}
+        else:
+            with open(model_path, "rb") as f:
+                artifact = pickle.load(f)
+    except ModelArtifactError:
+        raise
+    except Exception as e:
+        # Truncated or foreign pickles surface as EOFError, AttributeError, ImportError, TypeError...
+        raise ModelArtifactError(f"Failed to load model artifact {model_path}: {e}") from e
+
+    columns = None
+    version = None
+    if isinstance(artifact, dict):
+        estimator = artifact.get("estimator")
+        columns = artifact.get("columns")
+        version = artifact.get("version")
+    else:
+        estimator = artifact
+
+    manifest_path = schema_path or manifest_path_for(model_path)
+    if columns is None and os.path.exists(manifest_path):
+        manifest = _read_manifest(manifest_path)
+        columns = manifest["columns"]
+        version = version or manifest.get("version")
+    elif schema_path and not os.path.exists(schema_path):
+        raise ModelArtifactError(f"Schema manifest {schema_path} does not exist")
+
+    if columns is None and getattr(estimator, "feature_names_in_", None) is not None:
+        columns = list(estimator.feature_names_in_)
+
+    if columns is None and dataset_path:
+        logger.warning(f"Model has no stored schema, falling back to header of {dataset_path}")
+        columns = _read_csv_header(dataset_path)
+
+    if columns is None:
+        raise ModelArtifactError(f"No feature schema found for model {model_path}")
+
+    try:
+        bundle = ModelBundle(
+            estimator=estimator,
+            columns=list(columns),
+            version=version or _file_version(model_path),
+        )
+    except ValueError as e:
+        raise ModelArtifactError(f"Invalid feature schema for model {model_path}: {e}") from e
+
+    validate_bundle(bundle)
+    if "feature_names_in_" in getattr(estimator, "__dict__", {}):
+        # Names are checked once above; rows are encoded as plain arrays in this
+        # column order, which scikit-learn would otherwise warn about on every predict
+        del estimator.feature_names_in_
+    logger.info(f"Loaded model {model_path} (version {bundle.version}, {len(bundle.columns)} features)")
+    return bundle
+
+
+_active_bundle: Optional[ModelBundle] = None
+_bundle_listeners: List[Callable[[Optional[ModelBundle]], None]] = []
+
+
+def on_bundle_change(listener: Callable[[Optional[ModelBundle]], None]) -> None:
+    """
+    Register a callback run whenever the active bundle is replaced.
+    """
+    _bundle_listeners.append(listener)
+
+
+def set_active_bundle(bundle: Optional[ModelBundle]) -> None:
+    global _active_bundle
+    _active_bundle = bundle
+    for listener in _bundle_listeners:
+        listener(bundle)
+
+
+def get_active_bundle() -> Optional[ModelBundle]:
+    return _active_bundle
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from core.prediction.executor import InferenceExecutor, InferenceQueueFull
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatcherMetrics:
+    """Running totals for the micro-batcher."""
+    batches: int = 0
+    rows: int = 0
+    max_batch_size: int = 0
+    total_queue_wait: float = 0.0
+    max_queue_wait: float = 0.0
+
+    def record(self, size: int, waits: Sequence[float]) -> None:
+        self.batches += 1
+        self.rows += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.total_queue_wait += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def snapshot(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_queue_wait_ms": 1000 * self.total_queue_wait / self.rows if self.rows else 0.0,
+            "max_queue_wait_ms": 1000 * self.max_queue_wait,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one matrix prediction.
+
+    Callers await ``predict(row)``. The first row of a batch opens a window of
+    ``max_wait_ms``; the batch is flushed when the window closes or as soon as
+    ``max_batch_size`` rows have arrived, and each caller's future is resolved
+    with its own value and the version of the model that produced the batch.
+    If the batch fails, its rows are retried one at a time so each caller gets
+    its own result or error.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = BatcherMetrics()
+        self._pending: List[Tuple[Sequence[Any], asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def predict(self, row: Sequence[Any]) -> Tuple[float, str]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Sequence[Any], asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        self.metrics.record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+        try:
+            predictions, version = await self.executor.predict([row for row, _, _ in batch])
+        except InferenceQueueFull as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                _, future, _ = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # One bad row fails the whole matrix; score rows one at a time so
+            # only the callers whose rows cannot be predicted see the error
+            logger.warning(f"Micro-batch of {len(batch)} rows failed, predicting rows separately: {e}")
+            for item in batch:
+                await self._run_one(item)
+            return
+
+        for (_, future, _), value in zip(batch, predictions.tolist()):
+            if not future.done():
+                future.set_result((value, version))
+
+    async def _run_one(self, item: Tuple[Sequence[Any], asyncio.Future, float]) -> None:
+        row, future, _ = item
+        if future.done():
+            return
+        try:
+            predictions, version = await self.executor.predict([row])
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result((predictions.tolist()[0], version))
+
+    async def close(self) -> None:
+        """
+        Flush anything still queued and wait for in-flight batches.
+        """
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+_batcher: Optional[MicroBatcher] = None
+
+
+def set_micro_batcher(batcher: Optional[MicroBatcher]) -> None:
+    global _batcher
+    _batcher = batcher
+
+
+def get_micro_batcher() -> Optional[MicroBatcher]:
+    return _batcher
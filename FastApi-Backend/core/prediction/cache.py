@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from core.db.mongo import get_cached_predictions, store_cached_predictions
+from core.prediction.artifact import on_bundle_change
+
+logger = logging.getLogger(__name__)
+
+
+def prediction_key(encoded_row: np.ndarray, model_version: str) -> str:
+    """
+    Canonical cache key for one encoded feature vector under a model version.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_version.encode("utf-8"))
+    digest.update(np.ascontiguousarray(encoded_row, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of model outputs with a per-entry TTL.
+
+    Keys come from ``prediction_key`` so they already include the model
+    version; the cache is also cleared whenever a new model bundle becomes
+    active. When ``persistent`` is set, entries are written through to Mongo
+    and misses fall back to it, so warm entries survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0, persistent: bool = False):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[float]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: float) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        """
+        Look keys up in memory, then in the persistent store for the rest.
+        """
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if self.persistent and missing:
+            try:
+                stored = await get_cached_predictions(missing)
+            except Exception as e:
+                logger.error(f"Prediction cache lookup failed: {e}")
+                stored = {}
+            for key, value in stored.items():
+                # These were counted as misses above but were served from Mongo
+                self.misses -= 1
+                self.hits += 1
+                self.put(key, value)
+                found[key] = value
+        return found
+
+    async def put_many(self, values: Dict[str, float], model_version: str) -> None:
+        for key, value in values.items():
+            self.put(key, value)
+
+        if self.persistent and values:
+            try:
+                await store_cached_predictions(values, model_version, self.ttl_seconds)
+            except Exception as e:
+                logger.error(f"Prediction cache write-through failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self.persistent,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[PredictionCache] = None
+
+
+def set_prediction_cache(cache: Optional[PredictionCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_prediction_cache() -> Optional[PredictionCache]:
+    return _cache
+
+
+def _invalidate_on_model_change(_bundle) -> None:
+    if _cache is not None:
+        _cache.invalidate()
+
+
+on_bundle_change(_invalidate_on_model_change)
@@ -0,0 +1,72 @@
+"""
+Convert a pickled tree-ensemble model into a memory-mappable flat forest.
+
+    python -m core.prediction.convert MODEL.pkl OUTPUT_DIR [--schema PATH] [--dataset PATH]
+
+The output directory holds one .npy file per node array plus meta.json with
+the feature columns and model version. Point MODEL at the directory to serve
+it. The version is carried over from the pickle, so cached and stored
+predictions stay valid. The conversion is checked by scoring random rows
+with both models.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from core.prediction.artifact import ModelArtifactError, load_model_bundle
+from core.prediction.flat_forest import FlatForest
+
+
+def convert(model_path: str, output_dir: str, schema_path=None, dataset_path=None, check_rows: int = 1000) -> dict:
+    bundle = load_model_bundle(model_path, schema_path=schema_path, dataset_path=dataset_path)
+    forest = FlatForest.from_estimator(bundle.estimator)
+    forest.save(output_dir, {
+        "columns": bundle.columns,
+        "version": bundle.version,
+        "source": os.path.basename(model_path),
+    })
+
+    # Random rows in the numeric range of the inputs plus one-hot columns
+    rng = np.random.default_rng(0)
+    sample = rng.uniform(0, 2000, size=(check_rows, len(bundle.columns)))
+    sample[:, rng.random(len(bundle.columns)) < 0.9] = rng.integers(0, 2, size=(check_rows, 1))
+    expected = np.asarray(bundle.estimator.predict(sample), dtype=np.float64).ravel()
+    loaded, _ = FlatForest.load(output_dir)
+    max_diff = float(np.max(np.abs(loaded.predict(sample) - expected))) if check_rows else 0.0
+
+    return {
+        "source": model_path,
+        "output": output_dir,
+        "version": bundle.version,
+        "trees": forest.n_trees,
+        "nodes": forest.n_nodes,
+        "max_depth": forest.max_depth,
+        "pickle_bytes": os.path.getsize(model_path),
+        "array_bytes": forest.nbytes,
+        "max_abs_diff": max_diff,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("model", help="pickled model artifact")
+    parser.add_argument("output", help="directory to write the flat forest into")
+    parser.add_argument("--schema", help="schema manifest, if not next to the model")
+    parser.add_argument("--dataset", help="training CSV used as a last-resort schema source")
+    parser.add_argument("--check-rows", type=int, default=1000, help="random rows scored to verify the conversion")
+    args = parser.parse_args(argv)
+
+    try:
+        report = convert(args.model, args.output, args.schema, args.dataset, args.check_rows)
+    except (ModelArtifactError, ValueError) as e:
+        print(f"Conversion failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0 if report["max_abs_diff"] <= 1e-9 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.prediction.artifact import ModelBundle, get_active_bundle, load_model_bundle
+from core.prediction.shadow import model_metrics
+from core.telemetry.metrics import inference_batch_rows
+from core.telemetry.spans import record_span
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when the inference pool and its queue are saturated."""
+
+
+# Per-process model used by "process" mode workers
+_worker_bundle: Optional[ModelBundle] = None
+
+
+def _init_process_worker(
+    model_path: str, schema_path: Optional[str], dataset_path: Optional[str], version: Optional[str] = None
+) -> None:
+    global _worker_bundle
+    _worker_bundle = load_model_bundle(model_path, schema_path=schema_path, dataset_path=dataset_path)
+    if version:
+        _worker_bundle.version = version
+
+
+def _process_predict(rows: Sequence[Sequence[Any]], chunk_size: Optional[int]) -> Tuple[np.ndarray, str]:
+    return _worker_bundle.predict_rows(rows, chunk_size=chunk_size), _worker_bundle.version
+
+
+def _thread_predict(
+    bundle: ModelBundle, rows: Sequence[Sequence[Any]], chunk_size: Optional[int]
+) -> Tuple[np.ndarray, str]:
+    return bundle.predict_rows(rows, chunk_size=chunk_size), bundle.version
+
+
+class InferenceExecutor:
+    """
+    Runs model inference off the event loop with bounded admission.
+
+    At most ``max_workers`` jobs run at once and at most ``queue_depth`` more
+    wait for a worker; anything beyond that is rejected with
+    InferenceQueueFull so the API can shed load instead of piling up requests.
+    In "process" mode each worker loads its own copy of the model at start-up,
+    and the parent keeps only a schema-only bundle for encoding and cache keys.
+    Predictions come back with the version of the model that produced them,
+    which after a hot-swap may not be the bundle that was active when the
+    call was made.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        queue_depth: int,
+        mode: str = "thread",
+        model_path: Optional[str] = None,
+        schema_path: Optional[str] = None,
+        dataset_path: Optional[str] = None,
+        version: Optional[str] = None,
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown inference executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        if max_workers < 1 or queue_depth < 0:
+            raise ValueError("Inference executor needs max_workers >= 1 and queue_depth >= 0")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._in_flight = 0
+
+        self.dataset_path = dataset_path
+        if mode == "process":
+            self._pool: Executor = self._process_pool(model_path, schema_path, version)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+    def _process_pool(
+        self, model_path: Optional[str], schema_path: Optional[str], version: Optional[str]
+    ) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_process_worker,
+            initargs=(model_path, schema_path, self.dataset_path, version),
+        )
+
+    def reload(self, model_path: str, schema_path: Optional[str] = None, version: Optional[str] = None) -> None:
+        """
+        Point the pool at a new model artifact. Thread workers always use the
+        active bundle, so this only matters in "process" mode, where a fresh
+        pool is started and the old one finishes its in-flight jobs.
+        """
+        if self.mode != "process":
+            return
+        old_pool, self._pool = self._pool, self._process_pool(model_path, schema_path, version)
+        old_pool.shutdown(wait=False)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_depth
+
+    async def predict(
+        self, rows: Sequence[Sequence[Any]], chunk_size: Optional[int] = None
+    ) -> Tuple[np.ndarray, str]:
+        """
+        Encode and predict rows on the pool, rejecting the call if it is
+        saturated. Returns the predictions and the version of the model that
+        made them.
+        """
+        if self._in_flight >= self.capacity:
+            raise InferenceQueueFull(
+                f"Inference queue is full ({self._in_flight}/{self.capacity} jobs in flight)"
+            )
+
+        bundle = get_active_bundle()
+        if self.mode == "process":
+            job = partial(_process_predict, rows, chunk_size)
+        else:
+            if bundle is None:
+                raise RuntimeError("Model is not loaded")
+            job = partial(_thread_predict, bundle, rows, chunk_size)
+
+        # Only touched from the event loop thread, so a plain counter is enough
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            predictions, version = await asyncio.get_running_loop().run_in_executor(self._pool, job)
+        finally:
+            self._in_flight -= 1
+        elapsed = time.perf_counter() - started
+        # Queueing plus encode and predict on the pool, seen from the event loop
+        record_span("inference", elapsed)
+        inference_batch_rows.observe(len(rows))
+        model_metrics.record_latency(version, elapsed, len(rows))
+        return predictions, version
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_executor: Optional[InferenceExecutor] = None
+
+
+def set_inference_executor(executor: Optional[InferenceExecutor]) -> None:
+    global _executor
+    _executor = executor
+
+
+def get_inference_executor() -> Optional[InferenceExecutor]:
+    return _executor
@@ -0,0 +1,150 @@
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Files making up a flat forest artifact directory
+META_FILE = "meta.json"
+ARRAY_FILES = ("left", "right", "feature", "threshold", "value", "roots")
+FORMAT = "flat-forest/1"
+
+
+def is_flat_forest(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+class FlatForest:
+    """
+    A fitted tree-ensemble regressor stored as a handful of flat NumPy arrays.
+
+    Every tree's nodes are concatenated into shared ``left``/``right``/
+    ``feature``/``threshold``/``value`` arrays, with ``roots`` holding the
+    offset of each tree. Saved as plain .npy files the arrays can be loaded
+    with ``mmap_mode="r"``, so every worker process maps the same read-only
+    pages from the OS page cache instead of unpickling its own copy of the
+    trees. Predictions match scikit-learn's (float32 feature comparison,
+    trees averaged in order).
+    """
+
+    def __init__(
+        self,
+        left: np.ndarray,
+        right: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        n_features: int,
+        max_depth: int,
+    ):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.left)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_FILES)
+
+    @classmethod
+    def from_estimator(cls, estimator: Any) -> "FlatForest":
+        """
+        Flatten a fitted single-output DecisionTreeRegressor or forest regressor.
+        """
+        trees = [est.tree_ for est in getattr(estimator, "estimators_", [estimator])]
+        if not trees or not all(hasattr(tree, "children_left") for tree in trees):
+            raise ValueError(f"{type(estimator).__name__} is not a fitted tree ensemble")
+        if any(tree.value.shape[1:] != (1, 1) for tree in trees):
+            raise ValueError("Only single-output regression trees can be flattened")
+
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            left = tree.children_left.astype(np.int32)
+            right = tree.children_right.astype(np.int32)
+            leaf = left < 0
+            # Leaves point at themselves so traversal can run a fixed number of steps
+            own = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+            lefts.append(np.where(leaf, own, left + offset))
+            rights.append(np.where(leaf, own, right + offset))
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold).astype(np.float64))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            n_features=int(estimator.n_features_in_),
+            max_depth=max(int(tree.max_depth) for tree in trees),
+        )
+
+    def predict(self, X: Any) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2-D array with {self.n_features_in_} features")
+
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(len(X), dtype=np.intp) * self.n_features_in_)[:, None]
+        nodes = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_values = self.value[nodes]
+        # Sum tree by tree, as scikit-learn does, so results agree to the last bit
+        total = np.zeros(len(X), dtype=np.float64)
+        for tree in range(self.n_trees):
+            total += leaf_values[:, tree]
+        return total / self.n_trees
+
+    def save(self, path: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the arrays and a metadata file into directory ``path``.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                **(meta or {}),
+                "format": FORMAT,
+                "n_features": self.n_features_in_,
+                "max_depth": self.max_depth,
+                "n_trees": self.n_trees,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> Tuple["FlatForest", Dict[str, Any]]:
+        """
+        Load a saved forest and its metadata, memory-mapping the arrays read-only.
+        """
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"Unsupported flat forest format {meta.get('format')!r} in {path}")
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in ARRAY_FILES
+        }
+        forest = cls(**arrays, n_features=meta["n_features"], max_depth=meta["max_depth"])
+        return forest, meta
+
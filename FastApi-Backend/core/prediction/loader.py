@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from core.prediction.artifact import ModelBundle, get_active_bundle, load_model_bundle, set_active_bundle
+from core.startup import startup_profile
+
+logger = logging.getLogger(__name__)
+
+# eager: load before serving; background: start loading at startup; lazy: load on first prediction
+LOADING_MODES = ("eager", "background", "lazy")
+
+
+class ModelLoader:
+    """
+    Loads the model artifact off the event loop, once, and publishes it as the
+    active bundle. Unpickling the forest also pulls in scikit-learn, which is
+    most of the cold-start cost, so CRUD traffic is served while it happens.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        schema_path: Optional[str] = None,
+        dataset_path: Optional[str] = None,
+        version: Optional[str] = None,
+        keep_estimator: bool = True,
+    ):
+        self.model_path = model_path
+        self.schema_path = schema_path
+        self.dataset_path = dataset_path
+        # Overrides the artifact's own version, e.g. for registry entries
+        self.version = version
+        # False when process-pool workers hold the model: the loaded estimator is
+        # only validated here, then released, keeping the schema and encoder
+        self.keep_estimator = keep_estimator
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _load(self) -> ModelBundle:
+        with startup_profile.phase("model_load"):
+            bundle = load_model_bundle(
+                self.model_path,
+                schema_path=self.schema_path,
+                dataset_path=self.dataset_path,
+            )
+        if self.version:
+            bundle.version = self.version
+        if not self.keep_estimator:
+            bundle = bundle.schema_only()
+        return bundle
+
+    async def _run(self) -> ModelBundle:
+        self.state = "loading"
+        # A retry starts clean; only the outcome of this attempt is reported
+        self.error = None
+        try:
+            bundle = await asyncio.to_thread(self._load)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Model loading failed: {e}", exc_info=True)
+            raise
+        current = get_active_bundle()
+        if current is None:
+            set_active_bundle(bundle)
+        else:
+            # A model activated from the registry while this one loaded is newer; keep it
+            logger.info(f"Model {current.version} was activated during startup, discarding loaded {bundle.version}")
+            bundle = current
+        self.state = "ready"
+        startup_profile.mark("model_ready")
+        return bundle
+
+    def start(self) -> asyncio.Task:
+        """
+        Begin loading in the background if it has not started yet, or start
+        over if the last attempt failed, so a transient error is retried by
+        the next caller instead of being re-raised until restart.
+        """
+        if self._task is None or (self._task.done() and self.state != "ready"):
+            self._task = asyncio.create_task(self._run())
+            # Failures are reported through state; keep the task from logging "never retrieved"
+            self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._task
+
+    async def ensure_loaded(self) -> ModelBundle:
+        """
+        Return the active bundle, loading it first if needed. Concurrent
+        callers share the same load.
+        """
+        bundle = get_active_bundle()
+        if bundle is not None:
+            return bundle
+        return await asyncio.shield(self.start())
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            # to_thread work cannot be interrupted; wait so teardown does not race it
+            await asyncio.wait([self._task])
+
+    def status(self) -> Dict[str, Any]:
+        return {"state": self.state, "error": self.error, "model": self.model_path, "version": self.version}
+
+
+_loader: Optional[ModelLoader] = None
+
+
+def set_model_loader(loader: Optional[ModelLoader]) -> None:
+    global _loader
+    _loader = loader
+
+
+def get_model_loader() -> Optional[ModelLoader]:
+    return _loader
+
+
+async def ensure_model_loaded() -> Optional[ModelBundle]:
+    """
+    Active bundle for a prediction request, loading it on first use.
+    Returns None if no loader is configured.
+    """
+    bundle = get_active_bundle()
+    if bundle is not None or _loader is None:
+        return bundle
+    return await _loader.ensure_loaded()
@@ -1,50 +1,211 @@
-import pandas as pd
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
 
-# Transform a single crop_yield-style row into the full dataset format
-import pandas as pd
+import numpy as np
 
-def transform_user_input(row, expected_columns):
+from core.telemetry.spans import traced
+
+# Numeric features, in the order they are read from a crop_yield-style row
+NUMERIC_FEATURES = ['Crop_Year', 'Annual_Rainfall', 'Fertilizer', 'Pesticide']
+
+CROP_PREFIX = 'Crop_'
+SEASON_PREFIX = 'Season_'
+
+# Crop document fields that influence the model output
+MODEL_INPUT_FIELDS = (
+    'crop_name', 'crop_year', 'season', 'annual_rainfall',
+    'fertilizer_n', 'fertilizer_p', 'fertilizer_k', 'pesticide',
+)
+CATEGORICAL_INPUT_FIELDS = ('crop_name', 'season')
+
+ROW_FORMAT_ERROR = ("Row must contain exactly 10 elements: "
+                    "[Crop, Crop_Year, Season, soil_type, Area, Annual_Rainfall, "
+                    "fertilizer_n, fertilizer_p, fertilizer_k, Pesticide]")
+
+
+def normalize_category(value: Any) -> str:
+    """
+    Normalize a crop/season label so that padded or differently cased values
+    ("Kharif     ", "Black pepper") resolve to the same one-hot column.
+    """
+    return str(value).strip().casefold()
+
+
+class FeatureEncoder:
+    """
+    Encodes crop_yield-style rows straight into the model's feature layout.
+
+    Column positions are resolved once from the expected column list, so
+    encoding a row only writes a handful of values into a preallocated array.
+    Unknown crops or seasons leave their one-hot block at zero.
+
+    This is not a drop-in copy of the old pandas.get_dummies transform. That
+    one only one-hot encoded the crop, so every Season_* column was served as
+    zero even though the model was trained with them set; the season column
+    is now set. Crop and season labels are also matched after strip and
+    casefold, so "Kharif     " and "kharif" hit the same column where the old
+    exact match silently dropped them. Predictions for rows that relied on
+    either quirk differ from the old transform's.
+    """
+
+    def __init__(self, expected_columns: Sequence[str]):
+        self.columns: List[str] = list(expected_columns)
+        positions = {col: i for i, col in enumerate(self.columns)}
+
+        missing = [col for col in NUMERIC_FEATURES if col not in positions]
+        if missing:
+            raise ValueError(f"Expected columns are missing numeric features: {missing}")
+
+        self._numeric_idx = np.array([positions[col] for col in NUMERIC_FEATURES], dtype=np.intp)
+        self._crop_idx: Dict[str, int] = {}
+        self._season_idx: Dict[str, int] = {}
+
+        for i, col in enumerate(self.columns):
+            if col in NUMERIC_FEATURES:
+                continue
+            if col.startswith(CROP_PREFIX):
+                self._crop_idx[normalize_category(col[len(CROP_PREFIX):])] = i
+            elif col.startswith(SEASON_PREFIX):
+                self._season_idx[normalize_category(col[len(SEASON_PREFIX):])] = i
+
+    @property
+    def n_features(self) -> int:
+        return len(self.columns)
 
-    # Check correct input format
-    if not isinstance(row, list) or len(row) != 10:
-        raise ValueError("Row must contain exactly 10 elements: "
-                         "[Crop, Crop_Year, Season, soil_type, Area, Annual_Rainfall, "
-                         "fertilizer_n, fertilizer_p, fertilizer_k, Pesticide]")
+    def crop_index(self, crop: Any) -> int:
+        return self._crop_idx.get(normalize_category(crop), -1)
 
-    # Unpack values
-    crop, crop_year, season, soil_type, area, rainfall, fert_n, fert_p, fert_k, pesticide = row
+    def season_index(self, season: Any) -> int:
+        return self._season_idx.get(normalize_category(season), -1)
 
-    # Combine fertilizers
-    total_fertilizer = fert_n + fert_p + fert_k
+    def encode(self, row: Sequence[Any]) -> np.ndarray:
+        """
+        Encode a single row into a (1, n_features) array.
+        """
+        if not isinstance(row, (list, tuple)) or len(row) != 10:
+            raise ValueError(ROW_FORMAT_ERROR)
 
-    # Create simplified row (excluding soil_type and separate fertilizers)
-    transformed_row = [crop, crop_year, season, area, rainfall, total_fertilizer, pesticide]
+        crop, crop_year, season, _soil_type, _area, rainfall, fert_n, fert_p, fert_k, pesticide = row
 
-    # Column names for simplified row
-    columns = ['Crop', 'Crop_Year', 'Season', 'Area', 'Annual_Rainfall', 'Fertilizer', 'Pesticide']
+        encoded = np.zeros((1, self.n_features), dtype=np.float64)
+        encoded[0, self._numeric_idx] = (crop_year, rainfall, fert_n + fert_p + fert_k, pesticide)
 
-    # Create DataFrame
-    df = pd.DataFrame([transformed_row], columns=columns)
+        crop_col = self.crop_index(crop)
+        if crop_col >= 0:
+            encoded[0, crop_col] = 1.0
+        season_col = self.season_index(season)
+        if season_col >= 0:
+            encoded[0, season_col] = 1.0
 
-    # Select relevant features
-    features = df[['Crop_Year', 'Annual_Rainfall', 'Fertilizer', 'Pesticide', 'Crop']]
+        return encoded
+
+    def encode_many(self, records: Sequence[Sequence[Any]]) -> np.ndarray:
+        """
+        Encode many rows into a single (len(records), n_features) matrix.
+        """
+        n_rows = len(records)
+        encoded = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        if n_rows == 0:
+            return encoded
+
+        for row in records:
+            if not isinstance(row, (list, tuple)) or len(row) != 10:
+                raise ValueError(ROW_FORMAT_ERROR)
+
+        crops, crop_years, seasons, _soil, _area, rainfall, fert_n, fert_p, fert_k, pesticide = zip(*records)
+
+        numeric = np.column_stack([
+            np.asarray(crop_years, dtype=np.float64),
+            np.asarray(rainfall, dtype=np.float64),
+            np.asarray(fert_n, dtype=np.float64)
+            + np.asarray(fert_p, dtype=np.float64)
+            + np.asarray(fert_k, dtype=np.float64),
+            np.asarray(pesticide, dtype=np.float64),
+        ])
+        encoded[:, self._numeric_idx] = numeric
+
+        rows = np.arange(n_rows)
+        crop_cols = np.fromiter((self.crop_index(c) for c in crops), dtype=np.intp, count=n_rows)
+        known = crop_cols >= 0
+        encoded[rows[known], crop_cols[known]] = 1.0
+
+        season_cols = np.fromiter((self.season_index(s) for s in seasons), dtype=np.intp, count=n_rows)
+        known = season_cols >= 0
+        encoded[rows[known], season_cols[known]] = 1.0
+
+        return encoded
+
+
+@lru_cache(maxsize=8)
+def _encoder_for(columns: tuple) -> FeatureEncoder:
+    return FeatureEncoder(columns)
+
+
+def get_encoder(expected_columns: Sequence[str]) -> FeatureEncoder:
+    """
+    Return a cached encoder for the given column layout.
+    """
+    return _encoder_for(tuple(expected_columns))
+
+
+def crop_to_row(crop: Dict[str, Any]) -> list:
+    """
+    Build the 10-element model input row from a stored crop document.
+    """
+    return [
+        crop["crop_name"],
+        crop["crop_year"],
+        crop["season"],
+        crop["soil_type"],
+        crop["area"],
+        crop["annual_rainfall"],
+        crop["fertilizer_n"],
+        crop["fertilizer_p"],
+        crop["fertilizer_k"],
+        crop["pesticide"],
+    ]
+
+
+# Transform a single crop_yield-style row into the full dataset format
+@traced()
+def transform_user_input(row, expected_columns):
+    return get_encoder(expected_columns).encode(row)
 
-    # One-hot encode Crop
-    crop_dummies = pd.get_dummies(features['Crop'], prefix='Crop')
 
-    # Concatenate final DataFrame
-    transformed = pd.concat([
-        features[['Crop_Year', 'Annual_Rainfall', 'Fertilizer', 'Pesticide']],
-        crop_dummies
-    ], axis=1)
+def input_fingerprint(crop: Dict[str, Any]) -> str:
+    """
+    Stable hash of the model-relevant fields of a crop document.
+    """
+    values = tuple(
+        normalize_category(crop[name]) if name in CATEGORICAL_INPUT_FIELDS else float(crop[name])
+        for name in MODEL_INPUT_FIELDS
+    )
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
 
-    # Add any missing columns and set them to 0
-    for col in expected_columns:
-        if col not in transformed.columns:
-            transformed[col] = 0
 
-    # Reorder to match expected column order
-    transformed = transformed[expected_columns]
+def prediction_record(crop: Dict[str, Any], value: float, model_version: str) -> Dict[str, Any]:
+    """
+    Fields stored on a crop document for a prediction made from its current inputs.
+    """
+    return {
+        "predicted_yield": value,
+        "prediction_fingerprint": input_fingerprint(crop),
+        "prediction_model_version": model_version,
+    }
 
-    return transformed
 
+def stored_prediction(crop: Dict[str, Any], model_version: str) -> Optional[float]:
+    """
+    Return the prediction saved on a crop document if it is still valid for
+    the current inputs and model version, otherwise None.
+    """
+    value = crop.get("predicted_yield")
+    if value is None or crop.get("prediction_model_version") != model_version:
+        return None
+    try:
+        if crop.get("prediction_fingerprint") != input_fingerprint(crop):
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    return value
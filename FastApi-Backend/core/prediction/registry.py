@@ -0,0 +1,255 @@
+"""
+Versioned model artifacts on disk, and switching the served model at runtime.
+
+Layout of the registry directory:
+
+    <root>/ACTIVE                    version currently served
+    <root>/<version>/manifest.json   artifact name, metrics, source, created_at
+    <root>/<version>/schema.json     feature columns
+    <root>/<version>/<artifact>      pickle file or flat forest directory
+
+Register an artifact with
+
+    python -m core.prediction.registry register MODEL [--version V] [--metrics FILE] [--activate]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.prediction.artifact import (
+    ModelBundle, get_active_bundle, load_model_bundle, set_active_bundle,
+)
+from core.prediction.executor import get_inference_executor
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "ACTIVE"
+MANIFEST_FILE = "manifest.json"
+SCHEMA_FILE = "schema.json"
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+class RegistryError(RuntimeError):
+    """Raised for unknown versions or malformed registry entries."""
+
+
+@dataclass
+class ModelEntry:
+    version: str
+    artifact: str
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    source: Optional[str] = None
+    created_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ModelRegistry:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _entry_dir(self, version: str) -> str:
+        if not VERSION_PATTERN.match(version):
+            raise RegistryError(f"Invalid model version '{version}'")
+        return os.path.join(self.root, version)
+
+    def entries(self) -> List[ModelEntry]:
+        if not os.path.isdir(self.root):
+            return []
+        versions = sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+        return [self.get(version) for version in versions]
+
+    def get(self, version: str) -> ModelEntry:
+        path = os.path.join(self._entry_dir(version), MANIFEST_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise RegistryError(f"Model version '{version}' is not registered")
+        return ModelEntry(version=version, **{k: v for k, v in manifest.items() if k != "version"})
+
+    def artifact_paths(self, version: str) -> Tuple[str, str]:
+        """
+        (model path, schema path) for load_model_bundle and inference workers.
+        """
+        entry = self.get(version)
+        directory = self._entry_dir(version)
+        return os.path.join(directory, entry.artifact), os.path.join(directory, SCHEMA_FILE)
+
+    def load(self, version: str) -> ModelBundle:
+        model_path, schema_path = self.artifact_paths(version)
+        bundle = load_model_bundle(model_path, schema_path=schema_path)
+        # The registry version is authoritative, whatever the artifact embeds
+        bundle.version = version
+        return bundle
+
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_active(self, version: str) -> None:
+        """
+        Point ACTIVE at ``version``. Written to a temp file and renamed, so
+        workers polling the registry never read a partial value.
+        """
+        self.get(version)
+        tmp_path = os.path.join(self.root, f".{ACTIVE_FILE}.{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, ACTIVE_FILE))
+
+    def register(
+        self,
+        model_path: str,
+        version: Optional[str] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        schema_path: Optional[str] = None,
+        dataset_path: Optional[str] = None,
+    ) -> ModelEntry:
+        """
+        Validate an artifact and copy it, with its resolved schema, into the registry.
+        """
+        bundle = load_model_bundle(model_path, schema_path=schema_path, dataset_path=dataset_path)
+        version = version or bundle.version
+        directory = self._entry_dir(version)
+        if os.path.exists(directory):
+            raise RegistryError(f"Model version '{version}' is already registered")
+
+        artifact = os.path.basename(os.path.normpath(model_path))
+        staging = os.path.join(self.root, f".{version}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        if os.path.isdir(model_path):
+            shutil.copytree(model_path, os.path.join(staging, artifact))
+        else:
+            shutil.copy2(model_path, os.path.join(staging, artifact))
+        with open(os.path.join(staging, SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump({"version": version, "columns": bundle.columns}, f, indent=2)
+
+        entry = ModelEntry(
+            version=version,
+            artifact=artifact,
+            metrics=metrics or {},
+            source=os.path.abspath(model_path),
+            created_at=datetime.utcnow().isoformat(),
+        )
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(entry.to_dict(), f, indent=2)
+        os.replace(staging, directory)
+        logger.info(f"Registered model {version} from {model_path}")
+        return entry
+
+
+_registry: Optional[ModelRegistry] = None
+_swap_lock = asyncio.Lock()
+
+
+def set_model_registry(registry: Optional[ModelRegistry]) -> None:
+    global _registry
+    _registry = registry
+
+
+def get_model_registry() -> Optional[ModelRegistry]:
+    return _registry
+
+
+async def activate_model(registry: ModelRegistry, version: str, persist: bool = True) -> ModelBundle:
+    """
+    Load ``version`` off the event loop, then swap it in. Requests already
+    holding the previous bundle finish with it; new requests get the new one.
+    With ``persist`` the registry's ACTIVE pointer is updated so other
+    workers and restarts follow.
+    """
+    async with _swap_lock:
+        bundle = await asyncio.to_thread(registry.load, version)
+        executor = get_inference_executor()
+        if executor is not None:
+            executor.reload(*registry.artifact_paths(version), version=version)
+            if executor.mode == "process":
+                # The new workers load their own copies; keep only what encoding needs
+                bundle = bundle.schema_only()
+        set_active_bundle(bundle)
+        if persist:
+            registry.set_active(version)
+    logger.info(f"Activated model {version}")
+    return bundle
+
+
+async def follow_registry(registry: ModelRegistry, interval: float) -> None:
+    """
+    Poll the ACTIVE pointer and swap in whatever another worker activated.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            version = registry.active_version()
+            current = get_active_bundle()
+            if version and current is not None and version != current.version:
+                await activate_model(registry, version, persist=False)
+        except Exception as e:
+            logger.error(f"Failed to follow model registry: {e}", exc_info=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the model registry")
+    parser.add_argument("--root", default=os.environ.get("MODEL_REGISTRY_DIR"), help="registry directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="copy a model artifact into the registry")
+    register.add_argument("model")
+    register.add_argument("--version")
+    register.add_argument("--schema")
+    register.add_argument("--dataset")
+    register.add_argument("--metrics", help="JSON file of evaluation metrics to store with the model")
+    register.add_argument("--activate", action="store_true", help="make it the served model")
+
+    commands.add_parser("list", help="show registered versions")
+
+    activate = commands.add_parser("activate", help="set the served model version")
+    activate.add_argument("version")
+
+    args = parser.parse_args(argv)
+    if not args.root:
+        parser.error("--root or MODEL_REGISTRY_DIR is required")
+    registry = ModelRegistry(args.root)
+
+    try:
+        if args.command == "register":
+            metrics = None
+            if args.metrics:
+                with open(args.metrics, "r", encoding="utf-8") as f:
+                    metrics = json.load(f)
+            entry = registry.register(args.model, args.version, metrics, args.schema, args.dataset)
+            if args.activate:
+                registry.set_active(entry.version)
+            print(json.dumps(entry.to_dict(), indent=2))
+        elif args.command == "activate":
+            registry.set_active(args.version)
+            print(f"Active model: {args.version}")
+        else:
+            active = registry.active_version()
+            for entry in registry.entries():
+                print(f"{'*' if entry.version == active else ' '} {entry.version}  {entry.created_at}  {entry.metrics}")
+    except RegistryError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
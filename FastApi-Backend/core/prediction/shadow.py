@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from core.prediction.artifact import ModelBundle
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per model version for percentiles
+LATENCY_WINDOW = 2048
+
+
+class LatencyStats:
+    """Call count, rows and a sliding window of latencies for one model version."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self._samples: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, rows: int) -> None:
+        self.calls += 1
+        self.rows += rows
+        self.total_seconds += seconds
+        self._samples.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = np.fromiter(self._samples, dtype=np.float64) * 1000
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0.0, 0.0, 0.0)
+        return {
+            "calls": self.calls,
+            "rows": self.rows,
+            "mean_ms": 1000 * self.total_seconds / self.calls if self.calls else 0.0,
+            "mean_ms_per_row": 1000 * self.total_seconds / self.rows if self.rows else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+
+
+class DivergenceStats:
+    """How far a candidate model's outputs are from the active model's on the same rows."""
+
+    def __init__(self):
+        self.rows = 0
+        self.total_abs = 0.0
+        self.total_rel = 0.0
+        self.max_abs = 0.0
+
+    def record(self, primary: np.ndarray, candidate: np.ndarray) -> None:
+        diff = np.abs(candidate - primary)
+        self.rows += len(diff)
+        self.total_abs += float(diff.sum())
+        self.total_rel += float((diff / np.maximum(np.abs(primary), 1e-9)).sum())
+        self.max_abs = max(self.max_abs, float(diff.max(initial=0.0)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "mean_abs_diff": self.total_abs / self.rows if self.rows else 0.0,
+            "mean_rel_diff": self.total_rel / self.rows if self.rows else 0.0,
+            "max_abs_diff": self.max_abs,
+        }
+
+
+class ModelMetrics:
+    """Per-version latency of live and shadow scoring, and shadow divergence."""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyStats] = {}
+        self.divergence: Dict[str, DivergenceStats] = {}
+
+    def record_latency(self, version: str, seconds: float, rows: int) -> None:
+        self.latency.setdefault(version, LatencyStats()).record(seconds, rows)
+
+    def record_divergence(self, version: str, primary: np.ndarray, candidate: np.ndarray) -> None:
+        self.divergence.setdefault(version, DivergenceStats()).record(primary, candidate)
+
+    def snapshot(self) -> Dict[str, Any]:
+        versions = sorted(set(self.latency) | set(self.divergence))
+        return {
+            version: {
+                "latency": self.latency[version].snapshot() if version in self.latency else None,
+                "divergence": self.divergence[version].snapshot() if version in self.divergence else None,
+            }
+            for version in versions
+        }
+
+
+model_metrics = ModelMetrics()
+
+
+class ShadowScorer:
+    """
+    Scores a candidate model on rows the active model has just predicted,
+    in the background on its own thread, and records latency and divergence.
+
+    Shadow work never delays a response: at most ``max_pending`` batches may
+    be queued and anything beyond that is dropped and counted.
+    """
+
+    def __init__(self, bundle: ModelBundle, max_pending: int = 4):
+        self.bundle = bundle
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._tasks: set = set()
+
+    @property
+    def version(self) -> str:
+        return self.bundle.version
+
+    def submit(self, rows: Sequence[Sequence[Any]], primary: Sequence[float]) -> None:
+        if not rows:
+            return
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            return
+        task = asyncio.get_running_loop().create_task(self._score(list(rows), np.asarray(primary, dtype=np.float64)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _predict(self, rows):
+        started = time.perf_counter()
+        values = self.bundle.predict_rows(rows)
+        return values, time.perf_counter() - started
+
+    async def _score(self, rows, primary: np.ndarray) -> None:
+        try:
+            values, seconds = await asyncio.get_running_loop().run_in_executor(self._pool, self._predict, rows)
+        except Exception as e:
+            logger.warning(f"Shadow scoring with model {self.version} failed: {e}")
+            return
+        model_metrics.record_latency(self.version, seconds, len(rows))
+        model_metrics.record_divergence(self.version, primary, values)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "pending": len(self._tasks), "dropped": self.dropped}
+
+    async def close(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_shadow: Optional[ShadowScorer] = None
+
+
+def set_shadow_scorer(scorer: Optional[ShadowScorer]) -> None:
+    global _shadow
+    _shadow = scorer
+
+
+def get_shadow_scorer() -> Optional[ShadowScorer]:
+    return _shadow
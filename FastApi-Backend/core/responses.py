@@ -0,0 +1,22 @@
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for payloads that are already shaped for the API (see
+    models/adapters.py). Returning it from an endpoint skips FastAPI's
+    response_model validation and encoding, and uses orjson when installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,56 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """
+    Wall-clock timings of the startup phases, measured from when this module
+    was first imported (the top of main.py).
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._phases: List[Dict[str, Any]] = []
+        self._marks: Dict[str, float] = {}
+
+    def _since_origin(self) -> float:
+        return round(time.perf_counter() - self._origin, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a named block. Phases may overlap (e.g. background model loading).
+        """
+        started = time.perf_counter()
+        offset = self._since_origin()
+        try:
+            yield
+        finally:
+            self._phases.append({
+                "name": name,
+                "started_at": offset,
+                "seconds": round(time.perf_counter() - started, 4),
+            })
+
+    def mark(self, name: str) -> None:
+        """
+        Record a milestone, such as the app accepting traffic.
+        """
+        self._marks[name] = self._since_origin()
+        logger.info(f"Startup milestone '{name}' reached after {self._marks[name]:.3f}s")
+
+    def marked(self, name: str) -> Optional[float]:
+        return self._marks.get(name)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases": sorted(self._phases, key=lambda phase: phase["started_at"]),
+            "milestones": dict(self._marks),
+        }
+
+
+startup_profile = StartupProfile()
@@ -0,0 +1,166 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; covers cache hits and Mongo round trips up to slow batch predictions
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Rows per inference call
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, 4096, 16384)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set. Observations may come from
+    inference threads as well as the event loop, so updates take a lock.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Labels, List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def snapshot(self) -> Dict[Labels, Tuple[List[int], float]]:
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def render(self) -> Iterable[str]:
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_label_text(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.label_names, labels)} {_number(total)}"
+            yield f"{self.name}_count{_label_text(self.label_names, labels)} {cumulative}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_label_text(self.label_names, labels)} {_number(value)}"
+
+
+class Gauge:
+    """
+    Read at scrape time from a callback returning {label values: value}, for
+    state other components already track (pool occupancy, cache counters).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        collect: Callable[[], Dict[Labels, float]],
+        label_names: Sequence[str] = (),
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._collect = collect
+
+    def render(self) -> Iterable[str]:
+        for labels, value in sorted(self._collect().items()):
+            if value is not None:
+                yield f"{self.name}{_label_text(self.label_names, labels)} {_number(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Dict[Labels, float]],
+              label_names: Sequence[str] = (), kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, help_text, collect, label_names, kind))
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            samples = list(metric.render())
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by method, route template and status code",
+    ("method", "route", "status"),
+)
+span_duration = registry.histogram(
+    "span_duration_seconds", "Time spent in named spans (Mongo calls, encoding, model.predict)", ("span",),
+)
+inference_batch_rows = registry.histogram(
+    "inference_batch_rows", "Rows per call to the inference pool", buckets=SIZE_BUCKETS,
+)
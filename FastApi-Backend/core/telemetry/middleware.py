@@ -0,0 +1,55 @@
+import time
+from typing import Dict
+
+from starlette.datastructures import MutableHeaders
+
+from core.telemetry.metrics import http_request_duration
+from core.telemetry.spans import request_spans
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware recording http_request_duration_seconds by route
+    template (not raw path, so IDs do not explode the label set).
+
+    With ``server_timing`` each response also carries a Server-Timing header
+    summing the spans recorded while handling it, e.g.
+    ``mongo.get_crop_by_id;dur=1.204, inference;dur=3.877``. Spans recorded
+    after the response started (streamed bodies) only reach the histograms.
+    """
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        spans = []
+        token = request_spans.set(spans)
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    totals: Dict[str, float] = {}
+                    for name, seconds in spans:
+                        totals[name] = totals.get(name, 0.0) + seconds
+                    totals["app"] = time.perf_counter() - started
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_spans.reset(token)
+            # The router stores the matched route in the scope it was handed
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route, str(status_code))
@@ -0,0 +1,112 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler that can be switched on and off in a
+    running worker.
+
+    A daemon thread snapshots the Python stack of every other thread (the
+    event loop and the inference threads) every ``interval`` seconds and
+    counts identical stacks. ``collapsed()`` returns them in the folded
+    format ("thread;outer;...;inner count") that flamegraph.pl, speedscope
+    and inferno render directly. Process-mode inference workers are separate
+    processes and are not sampled.
+    """
+
+    def __init__(self, max_stacks: int = 50000):
+        self.max_stacks = max_stacks
+        self.interval = 0.005
+        self.samples = 0
+        self.dropped = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.005, duration: Optional[float] = None) -> None:
+        """
+        Start sampling, discarding the previous profile. Stops by itself
+        after ``duration`` seconds when given.
+        """
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        with self._lock:
+            self._stacks.clear()
+            self.samples = self.dropped = 0
+        self.interval = interval
+        self.started_at, self.stopped_at = time.time(), None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started (interval {interval * 1000:.1f} ms, duration {duration or 'unbounded'})")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, duration: Optional[float]) -> None:
+        deadline = time.monotonic() + duration if duration else None
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._record(names.get(thread_id, str(thread_id)), frame)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.stopped_at = time.time()
+        logger.info(f"Sampling profiler stopped after {self.samples} samples")
+
+    def _record(self, thread_name: str, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        key = ";".join(reversed(stack))
+        with self._lock:
+            self.samples += 1
+            if key in self._stacks or len(self._stacks) < self.max_stacks:
+                self._stacks[key] += 1
+            else:
+                self.dropped += 1
+
+    def collapsed(self) -> str:
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            distinct = len(self._stacks)
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "distinct_stacks": distinct,
+            "dropped": self.dropped,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+        }
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,61 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+
+from core.telemetry.metrics import span_duration
+
+# Spans finished while handling the current request, for its Server-Timing header.
+# None outside a request; work handed to executor threads does not inherit it.
+request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+
+def record_span(name: str, seconds: float) -> None:
+    span_duration.observe(seconds, name)
+    spans = request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a block into span_duration_seconds{span=name}.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator timing every call of a function or coroutine function as a span.
+    The default name is "<module>.<function>", e.g. "mongo.get_crop_by_id".
+    """
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    record_span(span_name, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_span(span_name, time.perf_counter() - started)
+        return wrapper
+
+    return decorate
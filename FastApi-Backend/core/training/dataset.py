@@ -0,0 +1,102 @@
+import csv
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.prediction.predict import (
+    CROP_PREFIX, NUMERIC_FEATURES, SEASON_PREFIX, FeatureEncoder, normalize_category,
+)
+
+logger = logging.getLogger(__name__)
+
+TARGET_COLUMN = "Yield"
+
+
+@dataclass
+class TrainingData:
+    """Encoded features and targets, in the exact layout the API predicts with."""
+    X: np.ndarray
+    y: np.ndarray
+    columns: List[str]
+    skipped: int = 0
+
+    def split(self, test_fraction: float, seed: int) -> Tuple["TrainingData", "TrainingData"]:
+        order = np.random.default_rng(seed).permutation(len(self.y))
+        n_test = int(round(len(order) * test_fraction))
+        test, train = order[:n_test], order[n_test:]
+        return (
+            TrainingData(self.X[train], self.y[train], self.columns),
+            TrainingData(self.X[test], self.y[test], self.columns),
+        )
+
+
+def crop_yield_row(record: dict) -> list:
+    """
+    Map a crop_yield.csv record onto the 10-element row the API encodes.
+    The file only has total fertilizer, which the encoder sums from N, P and K.
+    """
+    return [
+        record["Crop"],
+        int(record["Crop_Year"]),
+        record["Season"],
+        "",
+        float(record["Area"]),
+        float(record["Annual_Rainfall"]),
+        float(record["Fertilizer"]),
+        0.0,
+        0.0,
+        float(record["Pesticide"]),
+    ]
+
+
+def feature_columns(crops: List[str], seasons: List[str]) -> List[str]:
+    """
+    Model column layout: numeric features, then one crop and one season
+    indicator per distinct label, sorted for reproducibility. Labels that
+    only differ in padding or case share a column, as they do at inference.
+    """
+    def distinct(labels: List[str]) -> List[str]:
+        by_key = {}
+        for label in labels:
+            by_key.setdefault(normalize_category(label), label.strip())
+        return sorted(by_key.values())
+
+    return (
+        list(NUMERIC_FEATURES)
+        + [CROP_PREFIX + crop for crop in distinct(crops)]
+        + [SEASON_PREFIX + season for season in distinct(seasons)]
+    )
+
+
+def load_crop_yield(path: str, limit: Optional[int] = None) -> TrainingData:
+    """
+    Read crop_yield.csv and encode it with the same FeatureEncoder the API
+    uses, so training and inference cannot drift apart.
+    """
+    rows, targets = [], []
+    skipped = 0
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for record in csv.DictReader(f):
+            try:
+                row = crop_yield_row(record)
+                target = float(record[TARGET_COLUMN])
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+            if not np.isfinite(target):
+                skipped += 1
+                continue
+            rows.append(row)
+            targets.append(target)
+            if limit and len(rows) >= limit:
+                break
+    if skipped:
+        logger.warning(f"Skipped {skipped} unreadable rows in {path}")
+    if not rows:
+        raise ValueError(f"No usable rows in {path}")
+
+    columns = feature_columns([row[0] for row in rows], [row[2] for row in rows])
+    X = FeatureEncoder(columns).encode_many(rows)
+    return TrainingData(X=X, y=np.asarray(targets, dtype=np.float64), columns=columns, skipped=skipped)
@@ -0,0 +1,250 @@
+"""
+Train the yield model from crop_yield.csv.
+
+    python -m core.training.train --data ../Model/crop_yield.csv --output models/ \\
+        [--n-estimators 50 100] [--max-depth 12 none] [--n-jobs -1] [--format pickle|flat] \\
+        [--latency-budget-ms 5] [--registry DIR [--activate]]
+
+Every combination of --n-estimators and --max-depth is trained on the same
+split. Each run writes a versioned artifact, its schema manifest and a
+metrics file with accuracy, training time, model size and single-row and
+batch latency through the serving code path. The runs are then summarised
+so a model that meets the latency budget can be picked.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from core.prediction.artifact import ModelBundle, write_manifest
+from core.prediction.flat_forest import FlatForest
+from core.training.dataset import TrainingData, crop_yield_row, load_crop_yield
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMATS = ("pickle", "flat")
+
+
+@dataclass
+class TrainingConfig:
+    n_estimators: int = 100
+    max_depth: Optional[int] = None
+    min_samples_leaf: int = 1
+    n_jobs: Optional[int] = None
+    random_state: int = 42
+    test_fraction: float = 0.2
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_version(config: TrainingConfig, data_digest: str) -> str:
+    """
+    Hash of the data and hyperparameters, so retraining the same model gives
+    the same version and keeps its cached and stored predictions valid.
+    n_jobs does not change the fitted model, so it is left out; when the
+    model was trained is recorded in its metrics instead.
+    """
+    params = {k: v for k, v in asdict(config).items() if k != "n_jobs"}
+    key = hashlib.sha256((data_digest + json.dumps(params, sort_keys=True)).encode("utf-8")).hexdigest()
+    return f"rf-{key[:16]}"
+
+
+def _latency_ms(bundle: ModelBundle, rows: List[list], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        bundle.predict_rows(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    return {"p50_ms": float(p50), "p95_ms": float(p95)}
+
+
+def measure_latency(bundle: ModelBundle, rows: List[list], batch_size: int = 1000, repeat: int = 50) -> Dict[str, Any]:
+    """
+    Latency of ModelBundle.predict_rows, the call the API makes, for one row and one batch.
+    """
+    batch = (rows * (batch_size // max(len(rows), 1) + 1))[:batch_size]
+    return {
+        "single_row": _latency_ms(bundle, rows[:1], repeat),
+        "batch": {"rows": batch_size, **_latency_ms(bundle, batch, max(repeat // 10, 3))},
+    }
+
+
+def evaluate(estimator: Any, data: TrainingData) -> Dict[str, float]:
+    predicted = np.asarray(estimator.predict(data.X), dtype=np.float64)
+    residual = data.y - predicted
+    total = np.sum((data.y - data.y.mean()) ** 2)
+    return {
+        "r2": float(1 - np.sum(residual ** 2) / total) if total else 0.0,
+        "mae": float(np.mean(np.abs(residual))),
+        "rmse": float(np.sqrt(np.mean(residual ** 2))),
+    }
+
+
+def train_model(
+    config: TrainingConfig,
+    train: TrainingData,
+    test: TrainingData,
+    sample_rows: List[list],
+    version: str,
+    artifact_format: str = "pickle",
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Fit one forest and measure it. Returns the artifact object (a dict bundle
+    for pickling, or a FlatForest) and its metrics.
+    """
+    estimator = RandomForestRegressor(
+        n_estimators=config.n_estimators,
+        max_depth=config.max_depth,
+        min_samples_leaf=config.min_samples_leaf,
+        n_jobs=config.n_jobs,
+        random_state=config.random_state,
+    )
+    started = time.perf_counter()
+    estimator.fit(train.X, train.y)
+    fit_seconds = time.perf_counter() - started
+    # Serving predicts one row or one small batch per call; fan-out only adds overhead
+    estimator.n_jobs = None
+
+    if artifact_format == "flat":
+        artifact = FlatForest.from_estimator(estimator)
+        size_bytes = artifact.nbytes
+        served = artifact
+    else:
+        artifact = {"estimator": estimator, "columns": train.columns, "version": version}
+        buffer = io.BytesIO()
+        pickle.dump(artifact, buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        size_bytes = buffer.tell()
+        served = estimator
+
+    bundle = ModelBundle(estimator=served, columns=train.columns, version=version)
+    metrics = {
+        "version": version,
+        "trained_at": datetime.utcnow().isoformat(),
+        "config": asdict(config),
+        "format": artifact_format,
+        "train_rows": len(train.y),
+        "test_rows": len(test.y),
+        "fit_seconds": round(fit_seconds, 3),
+        "model_bytes": size_bytes,
+        "node_count": int(sum(tree.tree_.node_count for tree in estimator.estimators_)),
+        "test": evaluate(served, test),
+        "latency": measure_latency(bundle, sample_rows),
+    }
+    return artifact, metrics
+
+
+def save_artifact(artifact: Any, metrics: Dict[str, Any], columns: List[str], output_dir: str) -> str:
+    """
+    Write the artifact, its schema manifest and metrics; returns the artifact path.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    version = metrics["version"]
+    if isinstance(artifact, FlatForest):
+        path = os.path.join(output_dir, f"model-{version}")
+        artifact.save(path, {"columns": columns, "version": version})
+    else:
+        path = os.path.join(output_dir, f"model-{version}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        write_manifest(ModelBundle(estimator=artifact["estimator"], columns=columns, version=version),
+                       os.path.join(output_dir, f"model-{version}.schema.json"))
+    with open(os.path.join(output_dir, f"model-{version}.metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    return path
+
+
+def _depth(value: str) -> Optional[int]:
+    return None if value.lower() == "none" else int(value)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Train the crop yield model")
+    parser.add_argument("--data", required=True, help="crop_yield.csv")
+    parser.add_argument("--output", required=True, help="directory for artifacts and metrics")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[100])
+    parser.add_argument("--max-depth", type=_depth, nargs="+", default=[None], help="integer or 'none'")
+    parser.add_argument("--min-samples-leaf", type=int, default=1)
+    parser.add_argument("--n-jobs", type=int, default=None, help="cores used for fitting (-1 for all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--format", choices=ARTIFACT_FORMATS, default="pickle")
+    parser.add_argument("--latency-budget-ms", type=float, help="flag models whose single-row p95 exceeds this")
+    parser.add_argument("--registry", help="also register every model in this model registry")
+    parser.add_argument("--activate", action="store_true",
+                        help="activate the most accurate model within the latency budget")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    data = load_crop_yield(args.data)
+    data_digest = _file_digest(args.data)
+    base = TrainingConfig(
+        min_samples_leaf=args.min_samples_leaf,
+        n_jobs=args.n_jobs,
+        random_state=args.seed,
+        test_fraction=args.test_fraction,
+    )
+    train, test = data.split(base.test_fraction, base.random_state)
+    # Raw API-style rows, so latency includes feature encoding
+    with open(args.data, "r", newline="", encoding="utf-8-sig") as f:
+        sample_rows = [crop_yield_row(record) for record in itertools.islice(csv.DictReader(f), 1000)]
+
+    results = []
+    for n_estimators, max_depth in itertools.product(args.n_estimators, args.max_depth):
+        config = TrainingConfig(**{**asdict(base), "n_estimators": n_estimators, "max_depth": max_depth})
+        version = model_version(config, data_digest)
+        logger.info(f"Training {version}: n_estimators={n_estimators} max_depth={max_depth}")
+        artifact, metrics = train_model(config, train, test, sample_rows, version, args.format)
+        single_p95 = metrics["latency"]["single_row"]["p95_ms"]
+        metrics["within_budget"] = args.latency_budget_ms is None or single_p95 <= args.latency_budget_ms
+        metrics["artifact"] = save_artifact(artifact, metrics, data.columns, args.output)
+        results.append(metrics)
+
+    print(f"{'version':22} {'trees':>5} {'depth':>5} {'fit s':>7} {'MB':>7} {'R2':>7} "
+          f"{'1-row p95':>10} {'1k-row p50':>11}")
+    for m in results:
+        print(f"{m['version']:22} {m['config']['n_estimators']:>5} {str(m['config']['max_depth']):>5} "
+              f"{m['fit_seconds']:>7.2f} {m['model_bytes'] / 1e6:>7.2f} {m['test']['r2']:>7.4f} "
+              f"{m['latency']['single_row']['p95_ms']:>8.2f}ms {m['latency']['batch']['p50_ms']:>9.2f}ms"
+              f"{'' if m['within_budget'] else '  over budget'}")
+
+    if args.registry:
+        from core.prediction.registry import ModelRegistry, RegistryError
+        registry = ModelRegistry(args.registry)
+        for m in results:
+            try:
+                registry.register(m["artifact"], version=m["version"], metrics=m)
+            except RegistryError as e:
+                logger.warning(str(e))
+        eligible = [m for m in results if m["within_budget"]]
+        if args.activate:
+            if not eligible:
+                print("No model meets the latency budget; nothing activated", file=sys.stderr)
+                return 1
+            best = max(eligible, key=lambda m: m["test"]["r2"])
+            registry.set_active(best["version"])
+            print(f"Activated {best['version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
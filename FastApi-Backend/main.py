@@ -1,13 +1,133 @@
+import asyncio
 import os
+from core.startup import startup_profile
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from api import api_router
 from config import settings
+from core.db.mongo import connect_mongo, close_mongo, ensure_indexes, backfill_crop_name_lower, ensure_yield_summary
+from core.baselines.index import BaselineIndex, set_baseline_index
+from core.enrichment.rainfall import RainfallService, create_provider, set_rainfall_service
+from core.prediction.artifact import set_active_bundle
+from core.responses import FastJSONResponse
+from core.prediction.loader import LOADING_MODES, ModelLoader, set_model_loader
+from core.prediction.executor import InferenceExecutor, set_inference_executor
+from core.prediction.batcher import MicroBatcher, set_micro_batcher
+from core.prediction.cache import PredictionCache, set_prediction_cache
+from core.prediction.registry import ModelRegistry, follow_registry, set_model_registry
+from core.prediction.shadow import get_shadow_scorer, set_shadow_scorer
+from core.telemetry.middleware import TimingMiddleware
+from core.telemetry.profiler import profiler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.MODEL_LOADING not in LOADING_MODES:
+        raise ValueError(f"Unknown MODEL_LOADING '{settings.MODEL_LOADING}', expected one of {LOADING_MODES}")
+    with startup_profile.phase("mongo_connect"):
+        connect_mongo()
+    with startup_profile.phase("ensure_indexes"):
+        await ensure_indexes()
+    with startup_profile.phase("backfill_crop_name_lower"):
+        await backfill_crop_name_lower()
+    summary_task = None
+    if settings.YIELD_SUMMARY_ENABLED:
+        # A first build scans every crop; analytics read crops until it is done
+        summary_task = asyncio.create_task(ensure_yield_summary())
+    if settings.PREDICTION_CACHE_ENABLED:
+        set_prediction_cache(PredictionCache(
+            max_entries=settings.PREDICTION_CACHE_SIZE,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+            persistent=settings.PREDICTION_CACHE_PERSIST,
+        ))
+    if settings.BASELINE_DATASET:
+        with startup_profile.phase("baselines"):
+            set_baseline_index(await asyncio.to_thread(BaselineIndex.from_csv, settings.BASELINE_DATASET))
+    rainfall_dataset = settings.RAINFALL_DATASET or settings.BASELINE_DATASET
+    if settings.RAINFALL_PROVIDER and (settings.RAINFALL_PROVIDER != "dataset" or rainfall_dataset):
+        with startup_profile.phase("rainfall"):
+            provider = await asyncio.to_thread(create_provider, settings.RAINFALL_PROVIDER, rainfall_dataset)
+        set_rainfall_service(RainfallService(
+            provider,
+            max_entries=settings.RAINFALL_CACHE_SIZE,
+            ttl_seconds=settings.RAINFALL_CACHE_TTL_SECONDS,
+        ))
+    model_path, schema_path, version = settings.MODEL, settings.MODEL_SCHEMA, None
+    registry = None
+    if settings.MODEL_REGISTRY_DIR:
+        registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+        set_model_registry(registry)
+        version = registry.active_version()
+        if version:
+            model_path, schema_path = registry.artifact_paths(version)
+    loader = ModelLoader(
+        model_path,
+        schema_path=schema_path,
+        dataset_path=settings.DATASET,
+        version=version,
+        keep_estimator=settings.INFERENCE_EXECUTOR != "process",
+    )
+    set_model_loader(loader)
+    if settings.MODEL_LOADING == "eager":
+        # Load and validate the model before serving; a bad artifact aborts startup
+        await loader.ensure_loaded()
+    elif settings.MODEL_LOADING == "background":
+        loader.start()
+    with startup_profile.phase("inference_pool"):
+        executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_WORKERS,
+            queue_depth=settings.INFERENCE_QUEUE_DEPTH,
+            mode=settings.INFERENCE_EXECUTOR,
+            model_path=model_path,
+            schema_path=schema_path,
+            dataset_path=settings.DATASET,
+            version=version,
+        )
+    set_inference_executor(executor)
+    batcher = None
+    if settings.MICROBATCH_ENABLED:
+        batcher = MicroBatcher(
+            executor,
+            max_batch_size=settings.MICROBATCH_MAX_SIZE,
+            max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS,
+        )
+        set_micro_batcher(batcher)
+    follower = None
+    if registry is not None and settings.MODEL_REGISTRY_POLL_SECONDS > 0:
+        follower = asyncio.create_task(follow_registry(registry, settings.MODEL_REGISTRY_POLL_SECONDS))
+    startup_profile.mark("serving")
+    yield
+    if follower is not None:
+        follower.cancel()
+    if summary_task is not None:
+        summary_task.cancel()
+    shadow = get_shadow_scorer()
+    if shadow is not None:
+        set_shadow_scorer(None)
+        await shadow.close()
+    if batcher is not None:
+        set_micro_batcher(None)
+        await batcher.close()
+    set_inference_executor(None)
+    executor.shutdown()
+    await loader.close()
+    set_model_loader(None)
+    set_model_registry(None)
+    set_active_bundle(None)
+    set_prediction_cache(None)
+    set_baseline_index(None)
+    set_rainfall_service(None)
+    profiler.stop()
+    close_mongo()
+
 
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -18,10 +138,14 @@ app.add_middleware(
     allow_methods=settings.ALLOW_METHODS,
     allow_headers=settings.ALLOW_HEADERS,
 )
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and times everything, CORS included
+    app.add_middleware(TimingMiddleware, server_timing=settings.METRICS_SERVER_TIMING)
 
 
 # Include API routes
 app.include_router(api_router)
+startup_profile.mark("imports")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Iterable, List
+
+from models.schemas import CropProjectionResponse
+
+# Every field of CropProjectionResponse; unrequested ones are returned as null
+PROJECTION_FIELDS = list(CropProjectionResponse.model_fields)
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+def crop_response(crop: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a stored crop document as a CropResponse payload.
+
+    This is the one place documents are mapped to the API shape; the output
+    is already JSON-ready, so list endpoints can serialize it without
+    re-validating every row.
+    """
+    updated_at = crop.get("updated_at")
+    return {
+        "status": "success",
+        "message": None,
+        "id": str(crop["_id"]),
+        "crop_name": crop["crop_name"],
+        "crop_year": crop["crop_year"],
+        "season": crop["season"],
+        "soil_type": crop["soil_type"],
+        "area": crop["area"],
+        "annual_rainfall": crop["annual_rainfall"],
+        "fertilizer_n": crop["fertilizer_n"],
+        "fertilizer_p": crop["fertilizer_p"],
+        "fertilizer_k": crop["fertilizer_k"],
+        "pesticide": crop["pesticide"],
+        "predicted_yield": crop.get("predicted_yield"),
+        "created_at": crop["created_at"].isoformat(),
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "tags": crop.get("tags", []),
+        "version": crop.get("version", 0),
+    }
+
+
+def crop_projection(crop: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    Shape a projected crop document as a CropProjectionResponse payload.
+    """
+    item: Dict[str, Any] = dict.fromkeys(PROJECTION_FIELDS)
+    item["id"] = str(crop["_id"])
+    for field in fields:
+        value = crop.get(field)
+        if field in DATETIME_FIELDS and value is not None:
+            value = value.isoformat()
+        item[field] = value
+    return item
+
+
+def crop_responses(crops: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [crop_response(crop) for crop in crops]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
 # Base response model
@@ -63,13 +63,55 @@ class CropResponse(SuccessResponse):
     created_at: str
     updated_at: Optional[str] = None
     tags: List[str] = []
+    version: int = 0
+
+# Partial crop returned when the list endpoint is asked for specific fields
+class CropProjectionResponse(BaseModel):
+    id: str
+    crop_name: Optional[str] = None
+    crop_year: Optional[int] = None
+    season: Optional[str] = None
+    soil_type: Optional[str] = None
+    area: Optional[float] = None
+    annual_rainfall: Optional[float] = None
+    fertilizer_n: Optional[float] = None
+    fertilizer_p: Optional[float] = None
+    fertilizer_k: Optional[float] = None
+    pesticide: Optional[float] = None
+    predicted_yield: Optional[float] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    tags: Optional[List[str]] = None
+    version: Optional[int] = None
 
 # Response model for listing multiple crops
 class CropsListResponse(SuccessResponse):
-    crops: List[CropResponse]
+    crops: List[Union[CropResponse, CropProjectionResponse]]
+    count: int
+    next_cursor: Optional[str] = None
+
+
+# Response model for crop name autocomplete
+class CropNameSearchResponse(SuccessResponse):
+    names: List[str]
     count: int
 
 
+# Per-row failure reported by bulk ingestion
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+# Response model for bulk ingestion
+class BulkIngestResponse(SuccessResponse):
+    received: int
+    inserted: int
+    failed: int
+    scored: int = 0
+    errors: List[BulkRowError] = []
+    errors_truncated: bool = False
+
+
 class ClimateInput(BaseModel):
     Crop: str
     Crop_Year: int
@@ -83,4 +125,76 @@ class ClimateInput(BaseModel):
     Pesticide: float
 #Crop Prediction Request
 class CropPredictionRequest(BaseModel):
-    crop_id: str  # ID of the crop in MongoDB
\ No newline at end of file
+    crop_id: str  # ID of the crop in MongoDB
+    state: Optional[str] = Field(None, description="Compare with this state's history instead of all states")
+
+
+#Batch Prediction Request
+class BatchPredictionRequest(BaseModel):
+    crop_ids: Optional[List[str]] = Field(None, description="IDs of the crops to score")
+    tag: Optional[str] = Field(None, description="Score every crop carrying this tag")
+    cursor: Optional[str] = Field(None, description="next_cursor of a truncated tag batch, to continue it")
+    write_back: bool = Field(False, description="Store predicted_yield on each scored crop")
+    state: Optional[str] = Field(None, description="Compare with this state's history instead of all states")
+    historical_rainfall: bool = Field(
+        False, description="Predict with the state's recorded annual rainfall for each crop_year (needs state)"
+    )
+
+# Where a predicted yield falls among historical records of the same crop and season
+class YieldBaseline(BaseModel):
+    percentile: float
+    state: Optional[str] = None  # None when compared across all states
+    records: int
+    mean_yield: float
+    median_yield: float
+
+class BatchPredictionItem(BaseModel):
+    crop_id: str
+    predicted_yield: Optional[float] = None
+    baseline: Optional[YieldBaseline] = None
+    annual_rainfall: Optional[float] = None  # Only with historical_rainfall
+    model_version: Optional[str] = None  # Model that produced predicted_yield
+    error: Optional[str] = None
+
+class BatchPredictionResponse(SuccessResponse):
+    results: List[BatchPredictionItem]
+    count: int
+    failed: int
+    updated: int = 0
+    model_version: Optional[str] = None
+    truncated: bool = False  # Tag batch stopped at PREDICT_BATCH_MAX_ITEMS; continue with next_cursor
+    next_cursor: Optional[str] = None
+
+class AnalyticsSeriesResponse(SuccessResponse):
+    series: List[Dict[str, Any]]
+    count: int
+
+class AnalyticsHistogramResponse(SuccessResponse):
+    field: str
+    boundaries: List[float]
+    series: List[Dict[str, Any]]
+    count: int
+
+class AnalyticsSummaryResponse(SuccessResponse):
+    summary: Dict[str, Any]
+
+class RainfallLocation(BaseModel):
+    state: str = Field(..., description="State name, e.g. Assam")
+    year: int = Field(..., description="Crop year")
+
+class RainfallBatchRequest(BaseModel):
+    locations: List[RainfallLocation] = Field(..., max_length=10000)
+
+class RainfallResult(BaseModel):
+    state: str
+    year: int
+    annual_rainfall: Optional[float] = None
+    source: Optional[str] = None  # observed, state_mean, stub or a custom provider's label
+
+class RainfallResponse(SuccessResponse, RainfallResult):
+    pass
+
+class RainfallBatchResponse(SuccessResponse):
+    results: List[RainfallResult]
+    count: int
+    resolved: int
@@ -0,0 +1,124 @@
+"""
+Shared fixtures. The app runs with its real lifespan against mongomock-motor
+instead of a MongoDB server, driven by httpx.AsyncClient over
+ASGITransport. Needs the dev-only packages listed in requirement.txt.
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+import pickle
+import tempfile
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+_MODEL_DIR = tempfile.mkdtemp(prefix="farmsight-tests-")
+MODEL_PATH = os.path.join(_MODEL_DIR, "model.pkl")
+MODEL_VERSION = "test-v1"
+
+# Settings are read when config is first imported, so this has to run before any app import
+os.environ.update({
+    "MONGODB_CONNECTION_STRING": "mongodb://tests.invalid",
+    "MODEL": MODEL_PATH,
+    "MODEL_REGISTRY_DIR": "",
+    "BASELINE_DATASET": "",
+    "RAINFALL_PROVIDER": "",
+})
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+from pymongo import UpdateOne  # noqa: E402
+from sklearn.linear_model import LinearRegression  # noqa: E402
+
+import core.db.mongo as mongo  # noqa: E402
+from core.training.dataset import feature_columns  # noqa: E402
+
+CROPS = ["Rice", "Wheat", "Maize"]
+SEASONS = ["Kharif", "Rabi", "Whole Year"]
+
+
+async def _bulk_write_supported() -> bool:
+    collection = AsyncMongoMockClient()["probe"]["probe"]
+    try:
+        await collection.bulk_write([UpdateOne({"_id": 1}, {"$set": {"x": 1}}, upsert=True)])
+    except TypeError:
+        # Older mongomock builders reject options (sort) that newer pymongo always passes
+        return False
+    return True
+
+
+BULK_WRITE_SUPPORTED = asyncio.run(_bulk_write_supported())
+# For tests that depend on bulk_write: yield_summary upkeep, unfenced prediction write-back
+requires_bulk_write = pytest.mark.skipif(
+    not BULK_WRITE_SUPPORTED, reason="installed mongomock does not support bulk_write with this pymongo"
+)
+
+
+def build_model(path: str, version: str, scale: float = 1.0) -> None:
+    """
+    Pickle a small linear model in the artifact format load_model_bundle reads.
+    Yield grows with rainfall, so tests can tell inputs apart by their prediction.
+    """
+    columns = feature_columns(CROPS, SEASONS)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, size=(200, len(columns)))
+    X[:, 0] = rng.integers(1997, 2020, size=200)
+    X[:, 1] = rng.uniform(300, 3000, size=200)
+    y = scale * (X[:, 1] / 1000.0 + X[:, 4:].sum(axis=1))
+    estimator = LinearRegression().fit(X, y)
+    with open(path, "wb") as f:
+        pickle.dump({"estimator": estimator, "columns": columns, "version": version}, f)
+
+
+build_model(MODEL_PATH, MODEL_VERSION)
+
+
+def crop_payload(**overrides):
+    payload = {
+        "crop_name": "Rice", "crop_year": 2005, "season": "Kharif", "soil_type": "Loamy",
+        "area": 100.0, "annual_rainfall": 1200.0, "fertilizer_n": 1000.0, "fertilizer_p": 10.0,
+        "fertilizer_k": 10.0, "pesticide": 50.0, "tags": [],
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@asynccontextmanager
+async def running_app():
+    """
+    Start the app's lifespan on a fresh in-memory database and yield a client for it.
+    """
+    import main
+
+    memory_client = AsyncMongoMockClient()
+    create_client = mongo.create_client
+    mongo.create_client = lambda: memory_client
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://tests") as client:
+                yield client
+    finally:
+        mongo.create_client = create_client
+
+
+@pytest.fixture
+async def client(anyio_backend):
+    async with running_app() as client:
+        yield client
+
+
+async def create_crops(client, count: int = 1, **overrides):
+    ids = []
+    for i in range(count):
+        response = await client.post("/api/crops", json=crop_payload(**overrides))
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
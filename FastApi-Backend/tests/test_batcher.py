@@ -0,0 +1,44 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from core.prediction.batcher import MicroBatcher
+from core.prediction.executor import InferenceQueueFull
+
+pytestmark = pytest.mark.anyio
+
+
+class RowExecutor:
+    """Predicts each row's first value, and fails any matrix holding a row that is not a number."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def predict(self, rows, chunk_size=None):
+        self.calls.append(len(rows))
+        if self.error is not None:
+            raise self.error
+        return np.array([float(row[0]) for row in rows]), "v1"
+
+
+async def test_bad_row_only_fails_its_own_caller(anyio_backend):
+    executor = RowExecutor()
+    batcher = MicroBatcher(executor, max_batch_size=3, max_wait_ms=50)
+    results = await asyncio.gather(
+        batcher.predict([1.0]), batcher.predict(["not a number"]), batcher.predict([3.0]),
+        return_exceptions=True
+    )
+    assert results[0] == (1.0, "v1")
+    assert isinstance(results[1], ValueError)
+    assert results[2] == (3.0, "v1")
+    assert executor.calls == [3, 1, 1, 1]
+
+
+async def test_full_queue_fails_the_batch_without_retrying(anyio_backend):
+    executor = RowExecutor(error=InferenceQueueFull("busy"))
+    batcher = MicroBatcher(executor, max_batch_size=2, max_wait_ms=50)
+    results = await asyncio.gather(batcher.predict([1.0]), batcher.predict([2.0]), return_exceptions=True)
+    assert all(isinstance(result, InferenceQueueFull) for result in results)
+    assert executor.calls == [2]
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import core.db.mongo as mongo
+from config import settings
+from conftest import MODEL_VERSION, crop_payload, running_app
+
+pytestmark = pytest.mark.anyio
+
+
+def ndjson(count):
+    return "".join(json.dumps(crop_payload(area=float(i + 1))) + "\n" for i in range(count))
+
+
+async def ingest(client, body, **params):
+    return await client.post(
+        "/api/crops/bulk", params=params, content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+
+async def test_bulk_ingest_reports_bad_rows(client):
+    body = ndjson(2) + "not json\n" + json.dumps(crop_payload(crop_year="soon")) + "\n"
+    response = (await ingest(client, body)).json()
+    assert (response["received"], response["inserted"], response["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in response["errors"]] == [3, 4]
+
+
+async def test_lazy_model_is_loaded_before_scoring(monkeypatch, anyio_backend):
+    monkeypatch.setattr(settings, "MODEL_LOADING", "lazy")
+    monkeypatch.setattr(settings, "BULK_INGEST_CHUNK_SIZE", 2)
+    async with running_app() as client:
+        response = await ingest(client, ndjson(5), score="true")
+        assert response.status_code == 200
+        assert response.json()["scored"] == 5
+        docs = await mongo.crop_collection.find({}).to_list(length=None)
+        assert {doc["prediction_model_version"] for doc in docs} == {MODEL_VERSION}
+
+
+async def test_rows_are_ingested_unscored_without_a_model(monkeypatch, anyio_backend):
+    monkeypatch.setattr(settings, "MODEL_LOADING", "lazy")
+    monkeypatch.setattr(settings, "MODEL", "/nonexistent/model.pkl")
+    monkeypatch.setattr(settings, "BULK_INGEST_CHUNK_SIZE", 2)
+    async with running_app() as client:
+        response = await ingest(client, ndjson(3), score="true")
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["inserted"], body["scored"]) == (3, 0)
+        assert await mongo.crop_collection.count_documents({"predicted_yield": {"$exists": True}}) == 0
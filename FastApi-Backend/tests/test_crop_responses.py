@@ -0,0 +1,31 @@
+import pytest
+
+from models.schemas import CropResponse
+from conftest import crop_payload
+
+pytestmark = pytest.mark.anyio
+
+
+def assert_crop_response(response, status_code):
+    assert response.status_code == status_code, response.text
+    body = response.json()
+    # Rendered straight from the adapter, but still exactly the documented shape
+    assert CropResponse.model_validate(body).model_dump(mode="json") == body
+    assert response.headers["ETag"] == f'"{body["version"]}"'
+    return body
+
+
+async def test_single_crop_endpoints_match_crop_response(client):
+    created = assert_crop_response(await client.post("/api/crops", json=crop_payload(tags=["north"])), 201)
+    fetched = assert_crop_response(await client.get(f"/api/crops/{created['id']}"), 200)
+    assert fetched["id"] == created["id"] and fetched["tags"] == ["north"]
+
+    updated = assert_crop_response(await client.put(f"/api/crops/{created['id']}", json={"area": 5.0}), 200)
+    assert updated["area"] == 5.0
+    assert updated["version"] == created["version"] + 1
+    assert updated["updated_at"] is not None
+
+
+async def test_missing_crop_is_still_404(client):
+    assert (await client.get("/api/crops/64b64c2f9f1b2c3d4e5f6a7b")).status_code == 404
+    assert (await client.put("/api/crops/64b64c2f9f1b2c3d4e5f6a7b", json={"area": 5.0})).status_code == 404
@@ -0,0 +1,46 @@
+import pytest
+
+from conftest import create_crops
+
+pytestmark = pytest.mark.anyio
+
+
+async def etag(client, crop_id):
+    return (await client.get(f"/api/crops/{crop_id}")).headers["ETag"]
+
+
+async def test_if_match_rejects_stale_version(client):
+    crop_id, = await create_crops(client)
+    first = await etag(client, crop_id)
+    updated = await client.put(f"/api/crops/{crop_id}", json={"area": 5.0}, headers={"If-Match": first})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != first
+
+    stale = await client.put(f"/api/crops/{crop_id}", json={"area": 6.0}, headers={"If-Match": first})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == updated.headers["ETag"]
+    deleted = await client.delete(f"/api/crops/{crop_id}", headers={"If-Match": first})
+    assert deleted.status_code == 412
+
+
+async def test_stored_prediction_changes_etag(client):
+    crop_id, = await create_crops(client)
+    before = await etag(client, crop_id)
+    await client.post("/api/model/predict", json={"crop_id": crop_id})
+    after = await etag(client, crop_id)
+    assert after != before
+    stale = await client.put(f"/api/crops/{crop_id}", json={"area": 5.0}, headers={"If-Match": before})
+    assert stale.status_code == 412
+
+    # Reusing the stored prediction writes nothing
+    await client.post("/api/model/predict", json={"crop_id": crop_id})
+    assert await etag(client, crop_id) == after
+
+
+async def test_batch_write_back_changes_etag(client):
+    ids = await create_crops(client, 2)
+    before = [await etag(client, crop_id) for crop_id in ids]
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+    assert body["updated"] == 2
+    after = [await etag(client, crop_id) for crop_id in ids]
+    assert all(new != old for new, old in zip(after, before))
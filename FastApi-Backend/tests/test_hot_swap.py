@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+import core.db.mongo as mongo
+from core.prediction.artifact import get_active_bundle, load_model_bundle, set_active_bundle
+from core.prediction.cache import get_prediction_cache, prediction_key
+from config import settings
+from core.prediction.executor import InferenceExecutor, get_inference_executor, set_inference_executor
+from core.prediction.predict import crop_to_row
+from core.prediction.registry import ModelRegistry, activate_model
+from conftest import MODEL_PATH, MODEL_VERSION, build_model, create_crops, running_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def swap_during_inference(client, tmp_path, monkeypatch):
+    """
+    Activate a second model after the endpoint has read the active bundle but
+    before the pool predicts, as a registry hot-swap can, once armed.
+    """
+    path = str(tmp_path / "newer.pkl")
+    build_model(path, "newer", scale=2.0)
+    swap = SimpleNamespace(newer=load_model_bundle(path), armed=True)
+    executor = get_inference_executor()
+    predict = executor.predict
+
+    async def swap_then_predict(rows, chunk_size=None):
+        if swap.armed:
+            set_active_bundle(swap.newer)
+        return await predict(rows, chunk_size=chunk_size)
+
+    monkeypatch.setattr(executor, "predict", swap_then_predict)
+    return swap
+
+
+async def test_predict_reports_the_model_that_scored(client, swap_during_inference):
+    crop_id, = await create_crops(client)
+    crop = await mongo.crop_collection.find_one({"_id": ObjectId(crop_id)})
+    old_bundle = get_active_bundle()
+    response = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+
+    expected = float(swap_during_inference.newer.predict_rows([crop_to_row(crop)])[0])
+    assert response["model_version"] == "newer"
+    assert response["predicted_yield"] == pytest.approx(expected)
+    stored = await mongo.crop_collection.find_one({"_id": crop["_id"]})
+    assert stored["prediction_model_version"] == "newer"
+    # Nothing was cached under the old model's key
+    old_key = prediction_key(old_bundle.encoder.encode(crop_to_row(crop)), MODEL_VERSION)
+    assert await get_prediction_cache().get_many([old_key]) == {}
+
+
+async def test_batch_does_not_mix_models(client, swap_during_inference):
+    swap_during_inference.armed = False
+    cached_id, = await create_crops(client, annual_rainfall=900.0)
+    await client.post("/api/model/predict/batch", json={"crop_ids": [cached_id]})
+    # Now an old-model cache hit sits next to a miss the newer model scores
+    fresh_id, = await create_crops(client, annual_rainfall=2500.0)
+    swap_during_inference.armed = True
+    ids = [cached_id, fresh_id]
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+
+    assert body["model_version"] == "newer"
+    crops = [await mongo.crop_collection.find_one({"_id": ObjectId(crop_id)}) for crop_id in ids]
+    expected = swap_during_inference.newer.predict_rows([crop_to_row(crop) for crop in crops]).tolist()
+    assert [item["predicted_yield"] for item in body["results"]] == pytest.approx(expected)
+    assert {crop["prediction_model_version"] for crop in crops} == {"newer"}
+
+
+async def test_process_pool_reports_its_own_model(tmp_path, anyio_backend):
+    first, second = str(tmp_path / "first.pkl"), str(tmp_path / "second.pkl")
+    build_model(first, "first")
+    build_model(second, "second", scale=2.0)
+    executor = InferenceExecutor(max_workers=1, queue_depth=1, mode="process", model_path=first, version="v1")
+    try:
+        row = [["Rice", 2005, "Kharif", "Loamy", 1.0, 1200.0, 100.0, 0.0, 0.0, 10.0]]
+        _, version = await executor.predict(row)
+        assert version == "v1"
+        executor.reload(second, version="v2")
+        predicted, version = await executor.predict(row)
+        assert version == "v2"
+        assert predicted.tolist() == pytest.approx(load_model_bundle(second).predict_rows(row).tolist())
+    finally:
+        executor.shutdown()
+
+
+async def test_process_mode_keeps_only_the_schema_in_the_api_process(monkeypatch, anyio_backend):
+    monkeypatch.setattr(settings, "INFERENCE_EXECUTOR", "process")
+    monkeypatch.setattr(settings, "INFERENCE_WORKERS", 1)
+    async with running_app() as client:
+        bundle = get_active_bundle()
+        assert bundle.estimator is None and bundle.version == MODEL_VERSION
+        crop_id, = await create_crops(client)
+        response = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+        crop = await mongo.crop_collection.find_one({"_id": ObjectId(crop_id)})
+        expected = load_model_bundle(MODEL_PATH).predict_rows([crop_to_row(crop)])[0]
+        assert response["predicted_yield"] == pytest.approx(expected)
+
+
+async def test_activating_in_process_mode_drops_the_estimator(tmp_path, anyio_backend):
+    path = str(tmp_path / "model.pkl")
+    build_model(path, "registered")
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    registry.register(path, version="v2")
+    executor = SimpleNamespace(mode="process", reloaded=[])
+    executor.reload = lambda *args, **kwargs: executor.reloaded.append(kwargs["version"])
+    set_inference_executor(executor)
+    try:
+        bundle = await activate_model(registry, "v2", persist=False)
+    finally:
+        set_inference_executor(None)
+        set_active_bundle(None)
+    assert executor.reloaded == ["v2"]
+    assert bundle.estimator is None and bundle.version == "v2"
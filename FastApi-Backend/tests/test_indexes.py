@@ -0,0 +1,21 @@
+import pytest
+
+from core.db.indexes import INDEXES, QUERY_PATTERNS
+
+pytestmark = pytest.mark.anyio
+
+
+def test_no_index_is_a_prefix_of_another():
+    for spec in INDEXES:
+        for other in INDEXES:
+            if other is spec or other.collection != spec.collection or spec.options:
+                continue
+            assert other.keys[:len(spec.keys)] != spec.keys, f"{spec.name} duplicates the prefix of {other.name}"
+
+
+async def test_report_lists_every_declared_index(client):
+    report = (await client.get("/api/admin/indexes")).json()
+    crops = report["collections"]["crops"]
+    assert crops["missing"] == []
+    assert crops["undeclared"] == []
+    assert {query["name"] for query in report["queries"]} == {pattern.name for pattern in QUERY_PATTERNS}
@@ -0,0 +1,96 @@
+import pickle
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from config import settings
+from core.prediction.artifact import ModelArtifactError, get_active_bundle, load_model_bundle, set_active_bundle
+from core.prediction.loader import ModelLoader
+from core.training.dataset import feature_columns
+from conftest import CROPS, MODEL_VERSION, SEASONS, build_model, running_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def no_active_bundle():
+    set_active_bundle(None)
+    yield
+    set_active_bundle(None)
+
+
+async def test_failed_load_is_retried(tmp_path, no_active_bundle):
+    path = str(tmp_path / "model.pkl")
+    loader = ModelLoader(path)
+    with pytest.raises(Exception):
+        await loader.ensure_loaded()
+    assert loader.state == "failed"
+    assert loader.status()["error"]
+
+    build_model(path, MODEL_VERSION)
+    bundle = await loader.ensure_loaded()
+    assert bundle.version == MODEL_VERSION
+    assert loader.state == "ready"
+    assert loader.status()["error"] is None
+    assert get_active_bundle() is bundle
+
+
+async def test_concurrent_callers_share_one_load(tmp_path, no_active_bundle):
+    path = str(tmp_path / "model.pkl")
+    build_model(path, MODEL_VERSION)
+    loader = ModelLoader(path)
+    first = loader.start()
+    assert loader.start() is first
+    await loader.ensure_loaded()
+    # A finished, successful load is not repeated
+    assert loader.start() is first
+
+
+async def test_load_does_not_replace_a_model_activated_meanwhile(tmp_path, no_active_bundle):
+    startup_path, newer_path = str(tmp_path / "startup.pkl"), str(tmp_path / "newer.pkl")
+    build_model(startup_path, "startup")
+    build_model(newer_path, "newer", scale=2.0)
+    loader = ModelLoader(startup_path)
+    task = loader.start()
+    # What activate_model does when the registry swaps a model in before the startup load finishes
+    newer = load_model_bundle(newer_path)
+    set_active_bundle(newer)
+    assert await task is newer
+    assert get_active_bundle() is newer
+    assert loader.ready
+
+
+async def test_startup_fails_when_model_and_schema_disagree(tmp_path, monkeypatch, anyio_backend):
+    path = str(tmp_path / "mismatched.pkl")
+    estimator = LinearRegression().fit(np.ones((4, 3)), np.ones(4))
+    with open(path, "wb") as f:
+        pickle.dump({"estimator": estimator, "columns": feature_columns(CROPS, SEASONS), "version": "bad"}, f)
+    monkeypatch.setattr(settings, "MODEL", path)
+    with pytest.raises(ModelArtifactError):
+        async with running_app():
+            pass
+
+
+@pytest.mark.parametrize("content", [b"", b"\x80\x04\x95", pickle.dumps(ModelLoader)[:-1],
+                                     b"cno_such_module\nThing\n."])
+def test_unreadable_artifacts_raise_model_artifact_error(tmp_path, content):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(content)
+    with pytest.raises(ModelArtifactError):
+        load_model_bundle(str(path))
+
+
+def test_model_fitted_with_feature_names_predicts_arrays_without_warnings(tmp_path):
+    pandas = pytest.importorskip("pandas")
+    columns = feature_columns(CROPS, SEASONS)
+    frame = pandas.DataFrame(np.random.default_rng(0).uniform(0, 1, size=(20, len(columns))), columns=columns)
+    path = tmp_path / "named.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(LinearRegression().fit(frame, frame.iloc[:, 1]), f)
+    bundle = load_model_bundle(str(path))
+    assert bundle.columns == columns
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        bundle.predict_rows([["Rice", 2005, "Kharif", "Loamy", 1.0, 1200.0, 100.0, 0.0, 0.0, 10.0]])
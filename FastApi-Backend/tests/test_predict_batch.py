@@ -0,0 +1,101 @@
+import pytest
+from bson import ObjectId
+
+import core.db.mongo as mongo
+from config import settings
+from conftest import MODEL_VERSION, create_crops, requires_bulk_write
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_keeps_order_and_reports_bad_ids(client):
+    ids = await create_crops(client, 2)
+    missing = str(ObjectId())
+    response = await client.post("/api/model/predict/batch", json={"crop_ids": [ids[1], "nope", missing, ids[0]]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["crop_id"] for item in body["results"]] == [ids[1], "nope", missing, ids[0]]
+    assert body["failed"] == 2
+    assert "Invalid Crop ID" in body["results"][1]["error"]
+    assert body["results"][2]["error"] == "Crop not found in the database"
+    assert body["model_version"] == MODEL_VERSION
+
+
+async def test_batch_matches_single_predictions(client):
+    ids = await create_crops(client, 1, annual_rainfall=900.0) + await create_crops(client, 1, annual_rainfall=2500.0)
+    batch = (await client.post("/api/model/predict/batch", json={"crop_ids": ids})).json()["results"]
+    for item in batch:
+        single = (await client.post("/api/model/predict", json={"crop_id": item["crop_id"]})).json()
+        assert single["predicted_yield"] == pytest.approx(item["predicted_yield"])
+    assert batch[0]["predicted_yield"] != pytest.approx(batch[1]["predicted_yield"])
+
+
+async def test_batch_by_tag(client):
+    tagged = await create_crops(client, 3, tags=["north"])
+    await create_crops(client, 2, tags=["south"])
+    body = (await client.post("/api/model/predict/batch", json={"tag": "north"})).json()
+    assert sorted(item["crop_id"] for item in body["results"]) == sorted(tagged)
+
+
+async def test_tag_batch_is_chunked_and_continues_from_its_cursor(client, monkeypatch):
+    tagged = await create_crops(client, 7, tags=["north"])
+    monkeypatch.setattr(settings, "PREDICT_BATCH_MAX_ITEMS", 5)
+    monkeypatch.setattr(settings, "PREDICT_BATCH_CHUNK_SIZE", 2)
+    first = (await client.post("/api/model/predict/batch", json={"tag": "north"})).json()
+    assert first["count"] == 5
+    assert first["truncated"] and first["next_cursor"]
+
+    rest = (await client.post("/api/model/predict/batch",
+                              json={"tag": "north", "cursor": first["next_cursor"]})).json()
+    assert rest["count"] == 2
+    assert not rest["truncated"] and rest["next_cursor"] is None
+    ids = [item["crop_id"] for item in first["results"] + rest["results"]]
+    assert sorted(ids) == sorted(tagged)
+    assert {item["model_version"] for item in first["results"] + rest["results"]} == {MODEL_VERSION}
+
+
+async def test_tag_batch_of_exactly_the_limit_is_not_truncated(client, monkeypatch):
+    await create_crops(client, 4, tags=["north"])
+    monkeypatch.setattr(settings, "PREDICT_BATCH_MAX_ITEMS", 4)
+    monkeypatch.setattr(settings, "PREDICT_BATCH_CHUNK_SIZE", 2)
+    body = (await client.post("/api/model/predict/batch", json={"tag": "north"})).json()
+    assert body["count"] == 4
+    assert not body["truncated"]
+
+
+async def test_crop_id_batches_are_chunked_in_order(client, monkeypatch):
+    ids = await create_crops(client, 5)
+    monkeypatch.setattr(settings, "PREDICT_BATCH_CHUNK_SIZE", 2)
+    requested = [ids[4], "nope", ids[0], ids[3], ids[1], ids[2]]
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": requested})).json()
+    assert [item["crop_id"] for item in body["results"]] == requested
+    assert body["failed"] == 1
+
+
+async def test_cursor_needs_a_tag_and_must_be_valid(client):
+    ids = await create_crops(client)
+    response = await client.post("/api/model/predict/batch", json={"crop_ids": ids, "cursor": "x"})
+    assert response.status_code == 400
+    response = await client.post("/api/model/predict/batch", json={"tag": "north", "cursor": "x"})
+    assert response.status_code == 400
+
+
+async def test_batch_needs_ids_or_tag(client):
+    response = await client.post("/api/model/predict/batch", json={})
+    assert response.status_code == 400
+
+
+@requires_bulk_write
+async def test_write_back_without_summary_uses_one_bulk_write(client, monkeypatch):
+    monkeypatch.setattr(settings, "YIELD_SUMMARY_ENABLED", False)
+    ids = await create_crops(client, 3)
+    stale = ObjectId(ids[0])
+    await mongo.crop_collection.update_one({"_id": stale}, {"$inc": {"version": 1}})
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+    assert body["updated"] == 3
+
+    crops = {str(crop["_id"]): crop for crop in await mongo.get_crops_by_ids([ObjectId(i) for i in ids])}
+    predictions = {ObjectId(i): {"predicted_yield": 1.0} for i in ids}
+    versions = {ObjectId(i): crops[i]["version"] for i in ids}
+    versions[stale] -= 1
+    assert await mongo.bulk_set_predictions(predictions, versions) == 2
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from core.enrichment.rainfall import (
+    DatasetRainfallProvider, RainfallProvider, RainfallService, create_provider, rainfall_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingProvider(RainfallProvider):
+    name = "counting"
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def lookup_many(self, keys):
+        self.calls.append(list(keys))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("provider down")
+        return {key: {"annual_rainfall": 1000.0 + key[1], "source": "test"} for key in keys if key[0] != "nowhere"}
+
+
+def test_provider_without_lookup_many_fails_when_created():
+    class Incomplete(RainfallProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+async def test_concurrent_lookups_share_one_provider_call(anyio_backend):
+    provider = CountingProvider()
+    service = RainfallService(provider)
+    results = await asyncio.gather(*(service.get("Assam", 2005) for _ in range(20)))
+    assert len(provider.calls) == 1
+    assert all(result["annual_rainfall"] == 3005.0 for result in results)
+    assert service.stats()["coalesced"] == 19
+
+
+async def test_get_many_sends_only_misses(anyio_backend):
+    provider = CountingProvider()
+    service = RainfallService(provider)
+    await service.get("Assam", 2005)
+    values = await service.get_many([("Assam", 2005), ("Kerala", 2001), ("Nowhere", 2001)])
+    assert provider.calls[-1] == [rainfall_key("Kerala", 2001), rainfall_key("Nowhere", 2001)]
+    assert values[rainfall_key("Nowhere", 2001)] is None
+    # Known gaps are cached as well
+    await service.get("Nowhere", 2001)
+    assert len(provider.calls) == 2
+
+
+async def test_failures_are_not_cached(anyio_backend):
+    provider = CountingProvider(fail=True)
+    service = RainfallService(provider)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await service.get("Assam", 2005)
+    assert len(provider.calls) == 2
+    assert service.stats()["entries"] == 0
+
+
+async def test_entries_expire_and_are_evicted(anyio_backend):
+    provider = CountingProvider()
+    service = RainfallService(provider, max_entries=2, ttl_seconds=0.05)
+    await service.get_many([("a", 1), ("b", 1), ("c", 1)])
+    assert service.stats()["entries"] == 2
+    await asyncio.sleep(0.06)
+    await service.get("c", 1)
+    assert provider.calls[-1] == [rainfall_key("c", 1)]
+
+
+async def test_dataset_provider_falls_back_to_state_mean(tmp_path, anyio_backend):
+    path = tmp_path / "crop_yield.csv"
+    path.write_text(
+        "Crop,Crop_Year,Season,State,Area,Production,Annual_Rainfall,Fertilizer,Pesticide,Yield\n"
+        "Rice,2000,Kharif,Assam,1,1,1000,1,1,1\n"
+        "Wheat,2000,Rabi,Assam ,1,1,1000,1,1,1\n"
+        "Rice,2001,Kharif,Assam,1,1,2000,1,1,1\n"
+    )
+    provider = create_provider("dataset", str(path))
+    assert isinstance(provider, DatasetRainfallProvider)
+    values = await provider.lookup_many([rainfall_key("assam", 2000), rainfall_key("Assam", 1990),
+                                         rainfall_key("Kerala", 2000)])
+    assert values[rainfall_key("Assam", 2000)] == {"annual_rainfall": 1000.0, "source": "observed"}
+    assert values[rainfall_key("Assam", 1990)] == {"annual_rainfall": 1500.0, "source": "state_mean"}
+    assert values[rainfall_key("Kerala", 2000)] is None
+
+
+async def test_endpoint_needs_a_configured_provider(client):
+    response = await client.get("/api/enrichment/rainfall", params={"state": "Assam", "year": 2005})
+    assert response.status_code == 503
@@ -0,0 +1,69 @@
+import pytest
+from bson import ObjectId
+
+import api.endpoints.modelPredict as model_predict
+import core.db.mongo as mongo
+from models.database import CropUpdateModel
+from conftest import create_crops
+
+pytestmark = pytest.mark.anyio
+
+
+async def stored(crop_id):
+    return await mongo.crop_collection.find_one({"_id": ObjectId(crop_id)})
+
+
+async def test_prediction_is_stored_and_reused(client):
+    crop_id, = await create_crops(client)
+    first = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+    doc = await stored(crop_id)
+    assert doc["predicted_yield"] == pytest.approx(first["predicted_yield"])
+
+    # A stored value that is no longer what the model would say proves the second call reused it
+    await mongo.crop_collection.update_one({"_id": doc["_id"]}, {"$set": {"predicted_yield": -1.0}})
+    second = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+    assert second["predicted_yield"] == -1.0
+
+
+async def test_input_change_drops_stored_prediction(client):
+    crop_id, = await create_crops(client, annual_rainfall=900.0)
+    before = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+    await client.put(f"/api/crops/{crop_id}", json={"annual_rainfall": 2500.0})
+    assert "predicted_yield" not in await stored(crop_id)
+    after = (await client.post("/api/model/predict", json={"crop_id": crop_id})).json()
+    assert after["predicted_yield"] != pytest.approx(before["predicted_yield"])
+
+
+async def test_prediction_not_stored_over_concurrent_update(client, monkeypatch):
+    crop_id, = await create_crops(client, annual_rainfall=900.0)
+    read = model_predict.get_crop_by_id
+
+    async def read_then_update(crop_id):
+        crop = await read(crop_id)
+        # Lands between the endpoint's read and its write
+        await mongo.update_crop(crop_id, CropUpdateModel(annual_rainfall=2500.0))
+        return crop
+
+    monkeypatch.setattr(model_predict, "get_crop_by_id", read_then_update)
+    response = await client.post("/api/model/predict", json={"crop_id": crop_id})
+    assert response.status_code == 200
+    doc = await stored(crop_id)
+    assert doc["annual_rainfall"] == 2500.0
+    assert "predicted_yield" not in doc
+    assert "prediction_fingerprint" not in doc
+
+
+async def test_batch_write_back_skips_concurrently_updated_crops(client, monkeypatch):
+    ids = await create_crops(client, 2, annual_rainfall=900.0)
+    read = model_predict.get_crops_by_ids
+
+    async def read_then_update(object_ids):
+        crops = await read(object_ids)
+        await mongo.update_crop(ids[0], CropUpdateModel(annual_rainfall=2500.0))
+        return crops
+
+    monkeypatch.setattr(model_predict, "get_crops_by_ids", read_then_update)
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+    assert body["updated"] == 1
+    assert "predicted_yield" not in await stored(ids[0])
+    assert (await stored(ids[1]))["predicted_yield"] == pytest.approx(body["results"][1]["predicted_yield"])
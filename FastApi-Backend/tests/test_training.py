@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from core.training import train
+from core.training.train import TrainingConfig, model_version
+
+
+def test_model_version_depends_only_on_config_and_data(monkeypatch):
+    config = TrainingConfig(n_estimators=50)
+    version = model_version(config, "digest")
+
+    class Tomorrow(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2100, 1, 1)
+
+    monkeypatch.setattr(train, "datetime", Tomorrow)
+    assert model_version(config, "digest") == version
+    assert model_version(TrainingConfig(n_estimators=50, n_jobs=-1), "digest") == version
+    assert model_version(TrainingConfig(n_estimators=60), "digest") != version
+    assert model_version(config, "other digest") != version
@@ -0,0 +1,76 @@
+import pytest
+
+import core.db.mongo as mongo
+from models.database import CropUpdateModel
+from conftest import create_crops, requires_bulk_write
+
+# Summary upkeep applies its deltas with bulk_write
+pytestmark = [pytest.mark.anyio, requires_bulk_write]
+
+
+async def assert_summary_consistent():
+    report = await mongo.check_yield_summary()
+    assert report["consistent"], report
+
+
+class InterferingCollection:
+    """
+    The crops collection, with one extra write slipped in just before the
+    first crop write issued through it.
+    """
+
+    def __init__(self, collection, interfere):
+        self._collection = collection
+        self._interfere = interfere
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in ("find_one_and_update", "bulk_write") or self._interfere is None:
+            return attribute
+
+        async def write(*args, **kwargs):
+            interfere, self._interfere = self._interfere, None
+            await interfere()
+            return await attribute(*args, **kwargs)
+        return write
+
+
+async def test_summary_follows_every_write_path(client):
+    ids = await create_crops(client, 3, annual_rainfall=900.0)
+    await create_crops(client, 2, crop_name="Wheat", season="Rabi")
+    await client.put(f"/api/crops/{ids[0]}", json={"crop_name": "Maize", "annual_rainfall": 2000.0})
+    await client.delete(f"/api/crops/{ids[1]}")
+    await client.post("/api/model/predict", json={"crop_id": ids[2]})
+    await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})
+    await assert_summary_consistent()
+
+
+async def test_batch_write_back_with_concurrent_update(client, monkeypatch):
+    ids = await create_crops(client, 3, annual_rainfall=900.0)
+    crops = mongo.crop_collection
+
+    async def update_one_crop():
+        # Moves the crop to another group and drops its stored prediction while the batch writes
+        await mongo.update_crop(ids[1], CropUpdateModel(crop_name="Wheat", annual_rainfall=2500.0))
+
+    monkeypatch.setattr(mongo, "crop_collection", InterferingCollection(crops, update_one_crop))
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+    monkeypatch.setattr(mongo, "crop_collection", crops)
+
+    assert body["updated"] == 2
+    await assert_summary_consistent()
+
+
+async def test_batch_write_back_with_concurrent_delete(client, monkeypatch):
+    ids = await create_crops(client, 2, annual_rainfall=900.0)
+    crops = mongo.crop_collection
+
+    async def delete_one_crop():
+        await mongo.delete_crop(ids[0])
+
+    monkeypatch.setattr(mongo, "crop_collection", InterferingCollection(crops, delete_one_crop))
+    body = (await client.post("/api/model/predict/batch", json={"crop_ids": ids, "write_back": True})).json()
+    monkeypatch.setattr(mongo, "crop_collection", crops)
+
+    assert body["updated"] == 1
+    await assert_summary_consistent()